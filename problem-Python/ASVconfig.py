@@ -1,4 +1,4 @@
-import math
+import numpy as np
 
 class ASVConfig:
     """
@@ -14,20 +14,42 @@ class ASVConfig:
         """
             Implements either constructor from the java 'cause you don't need lend
 
-            @param coords either a list of tuples (x,y)
+            @param coords either a list of tuples (x,y), a (k, 2) array,
+                another ASVConfig (copied)
                 or a space-separated string containing x y coords
                 doing it with a list of [x,y,x,y] seems silly, if you need it just use the string method except check if the list contains tuples or floats
                 I don't understand what the cfg thing is, some Java object? If you need it, use the same method!
         """
-        if isinstance(coords, str):
-            coordsList = coords.split(' ')
-            coords = []
-            for i in range(len(coordsList)/2):
-                coords.append(( coordsList[i*2], coordsList[(i*2)+1] ))
+        if isinstance(coords, ASVConfig):
+            coords = coords.coords
+        elif isinstance(coords, str):
+            coords = coords.split()
 
         #Now that input is homogenised, we can continue
+        #One contiguous (k, 2) float64 block instead of a list of tuples: row i is ASV i
 
-        self.asvPositions = coords
+        self.coords = np.array(coords, dtype=np.float64).reshape(-1, 2)
+
+    @classmethod
+    def fromArray(cls, array):
+        """
+            Wraps an existing (k, 2) float64 array without copying it, e.g. one row
+            of a whole-path array
+
+            @param array the (k, 2) float64 array of ASV positions
+
+            @return an ASVConfig sharing memory with array
+        """
+        cfg = cls.__new__(cls)
+        cfg.coords = array
+        return(cfg)
+
+    @property
+    def asvPositions(self):
+        """
+            The positions as a list of (x,y) tuples, as the list-backed version stored them
+        """
+        return([tuple(p) for p in self.coords.tolist()])
 
     def __str__(self):
         """
@@ -35,10 +57,7 @@ class ASVConfig:
 
             @return a space-separated string x y x y for all asv units
         """
-        string = ""
-        for i in self.asvPositions:
-            string += i[0] + " " + i[1] + " "
-        return(string)
+        return(" ".join([repr(v) for v in self.coords.ravel().tolist()]))
 
     def __add__(self, coord):
         """
@@ -46,18 +65,19 @@ class ASVConfig:
 
             @param coord a tuple coordinate (x,y)
         """
-        self.asvPositions.append(coord)
+        self.coords = np.vstack((self.coords, np.asarray(coord, dtype=np.float64).reshape(1, 2)))
+        return(self)
 
     def __len__(self):
         """
             Enables the use of len(asvConfig) to get the number of asvs
 
-            @return the length of the asvPositions list
+            @return the number of asvs
         """
-        return(len(self.asvPositions))
+        return(self.coords.shape[0])
 
     def getASVCount(self):
-        return(len(self.asvPositions))
+        return(self.coords.shape[0])
 
     def getPosition(self, asvNo):
         """
@@ -67,7 +87,7 @@ class ASVConfig:
 
             @return the position of the asv with the given index
         """
-        return(self.asvPositions[asvNo])
+        return(tuple(self.coords[asvNo].tolist()))
 
     def getASVPositions(self):
         """
@@ -75,7 +95,17 @@ class ASVConfig:
 
             @return the list of (x,y) tuples representing ASVs
         """
-        return(self.asvPositions[:]) #Slice to actually copy the list as opposed to unsafe access
+        return(self.asvPositions) #Built fresh each call, so safe to modify
+
+    def getArray(self):
+        """
+            Returns the positions as a read-only (k, 2) float64 view, without copying
+
+            @return the read-only array view, row i being (x,y) of ASV i
+        """
+        view = self.coords.view()
+        view.flags.writeable = False
+        return(view)
 
     def maxDistance(self, otherState):
         """
@@ -86,18 +116,11 @@ class ASVConfig:
 
             @return the maximum straight-line distance for any ASV
         """
-        if len(self.asvPositions) != len(otherState):
+        if len(self) != len(otherState):
             return(-1)
 
-        maxDistance = 0
-        for i in range(len(self.asvPositions)):
-            p1 = self.asvPositions[i]
-            p2 = otherState.getPos(i)
-            distance = math.sqrt( abs(p2[0] - p1[0])**2 + abs(p2[1] - p1[1])**2 )
-
-            maxDistance = max([distance, maxDistance])
-
-        return(maxDistance)
+        d = otherState.coords - self.coords
+        return(float(np.hypot(d[:, 0], d[:, 1]).max(initial=0.0)))
 
     def totalDistance(self, otherState):
         """
@@ -108,15 +131,8 @@ class ASVConfig:
 
             @return the total straight-line distance over all ASVs.
         """
-        if len(self.asvPositions) != len(otherState):
+        if len(self) != len(otherState):
             return(-1)
 
-        totalDistance = 0
-        for i in range(len(self.asvPositions)):
-            p1 = self.asvPositions[i]
-            p2 = otherState.getPos(i)
-            distance = math.sqrt( abs(p2[0] - p1[0])**2 + abs(p2[1] - p1[1])**2 )
-            #TODO: remove unnecesary variable when tested
-            totalDistance += distance
-
-        return(totalDistance)
+        d = otherState.coords - self.coords
+        return(float(np.hypot(d[:, 0], d[:, 1]).sum()))
@@ -0,0 +1,268 @@
+"""
+    Validation of many problem/solution pairs on a pool of worker processes, in python.
+
+    The pairs come from a manifest or a directory:
+
+    - a manifest is a text file with one pair per line, "problem-file [solution-file]",
+      paths relative to the manifest; blank lines and lines starting with # are skipped
+    - in a directory, each problem file pairs with every solution file whose name
+      starts with the problem's name (without extension), e.g. 3ASV.txt with
+      3ASV-rrt.txt and 3ASV.out.bin; files are told apart by their contents
+
+    As on the command line, a problem with no solution has its direct path checked.
+
+    Each task is one problem with all of its solutions, so a problem is parsed, and
+    its lenient obstacles compiled (see Tester.getObstacleSet), by only one worker,
+    which checks every solution for it in turn. With -c problems are loaded through
+    the ProblemCache so later runs don't parse them again either.
+
+    Run as a script:
+        python -m BatchValidator [-e maxError] [-c] [-j summary.json] [-p workers]
+            manifest-or-directory
+
+    @author Loreith
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+import FusedValidator
+import SolutionFormat
+import Tester
+
+#(problem file, maxError, useCache) -> Tester, in each worker
+testers = {}
+
+def isSolutionFile(filename):
+    """
+        @return whether the file looks like a solution (binary, compressed, or a text
+            file whose first line holds more than one number) rather than a problem
+    """
+    if SolutionFormat.isBinary(filename):
+        return(True)
+    try:
+        with SolutionFormat.openText(filename) as f:
+            return(len(f.readline().split()) > 1)
+    except (IOError, UnicodeDecodeError):
+        return(False)
+
+def readManifest(filename):
+    """
+        @return the list of (problem, solution or None) pairs in a manifest file
+    """
+    base = os.path.dirname(os.path.abspath(filename))
+    pairs = []
+    with open(filename, 'r') as inputFile:
+        for line in inputFile:
+            tokens = line.split()
+            if not tokens or tokens[0].startswith("#"):
+                continue
+            paths = [os.path.join(base, token) for token in tokens[:2]]
+            pairs.append((paths[0], paths[1] if len(paths) > 1 else None))
+    return(pairs)
+
+def scanDirectory(directory):
+    """
+        @return the list of (problem, solution or None) pairs in a directory, pairing
+            each solution with the problem whose name is the longest prefix of its own
+    """
+    problems = []
+    solutions = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            (solutions if isSolutionFile(path) else problems).append(path)
+
+    stems = dict((os.path.splitext(os.path.basename(p))[0], p) for p in problems)
+    matched = dict((p, []) for p in problems)
+    for solution in solutions:
+        name = os.path.basename(solution)
+        candidates = [stem for stem in stems if name.startswith(stem)]
+        if candidates:
+            matched[stems[max(candidates, key=len)]].append(solution)
+
+    pairs = []
+    for problem in problems:
+        for solution in matched[problem] or [None]:
+            pairs.append((problem, solution))
+    return(pairs)
+
+def getTester(problem, maxError, useCache=False):
+    """
+        @return this process's Tester for the problem, loading it the first time
+            (through the ProblemCache if useCache)
+    """
+    key = (os.path.abspath(problem), maxError, useCache)
+    if key not in testers:
+        tester = Tester.Tester(maxError)
+        tester.ps.loadProblem(problem, useCache=useCache)
+        testers[key] = tester
+    return(testers[key])
+
+def describe(error):
+    """
+        @return the exception's type and message, e.g. "ValueError: ..."
+    """
+    return(type(error).__name__ + ": " + str(error))
+
+def checkPair(task):
+    """
+        Runs in a worker: validates one pair
+
+        @param task (problem, solution or None, maxError, useCache)
+
+        @return a JSON-ready dict of the pair, its timings and its FusedValidator
+            summary, or the error that stopped it being checked; no exception
+            escapes, so one bad pair can't stop the rest
+    """
+    problem, solution, maxError, useCache = task
+    result = {"problem": problem, "solution": solution}
+    started = time.perf_counter()
+    try:
+        tester = getTester(problem, maxError, useCache)
+    except IOError as e:
+        result.update({"passed": False, "error": "Invalid problem file: " + str(e)})
+        return(result)
+    except Exception as e:
+        #Anything else is still this pair's failure, not the whole batch's
+        result.update({"passed": False, "error": "Could not load problem: " + describe(e)})
+        return(result)
+    try:
+        if solution is None:
+            tester.ps.assumeDirectSolution()
+        else:
+            tester.ps.loadSolution(solution)
+        loaded = time.perf_counter()
+
+        validator = FusedValidator.FusedValidator(tester)
+        validator.validate(tester.ps.getPath())
+        result.update(validator.summary(solutionTests=solution is not None))
+    except IOError as e:
+        result.update({"passed": False, "error": "Invalid solution file: " + str(e)})
+        return(result)
+    except Exception as e:
+        result.update({"passed": False, "error": "Could not check solution: " + describe(e)})
+        return(result)
+    finally:
+        #Don't keep the last solution alive in the worker between tasks
+        tester.ps.setPath([])
+    result["loadSeconds"] = loaded - started
+    result["validateSeconds"] = time.perf_counter() - loaded
+    return(result)
+
+def checkProblem(task):
+    """
+        Runs in a worker: validates every solution for one problem
+
+        @param task (problem, list of solutions or None, maxError, useCache)
+
+        @return the checkPair result for each solution, in order
+    """
+    problem, solutions, maxError, useCache = task
+    return([checkPair((problem, solution, maxError, useCache)) for solution in solutions])
+
+def validateAll(pairs, maxError=Tester.Tester.DEFAULT_MAX_ERROR, workers=None, useCache=False):
+    """
+        Validates every pair on a pool of processes
+
+        @param pairs a list of (problem, solution or None) pairs
+
+        @param workers the number of processes, by default one per CPU
+
+        @param useCache load the problems through the on-disk ProblemCache
+
+        @return the checkPair result for each pair, in the order given
+    """
+    #Indices of the pairs for each problem, in the order the problems first appear
+    groups = {}
+    for i, (problem, solution) in enumerate(pairs):
+        groups.setdefault(os.path.abspath(problem), []).append(i)
+    tasks = [(pairs[group[0]][0], [pairs[i][1] for i in group], maxError, useCache)
+             for group in groups.values()]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+
+    if workers == 1:
+        done = [checkProblem(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            done = pool.map(checkProblem, tasks, chunksize=1)
+
+    results = [None] * len(pairs)
+    for group, groupResults in zip(groups.values(), done):
+        for i, result in zip(group, groupResults):
+            #As the pair named it, if other pairs named the same file another way
+            result["problem"] = pairs[i][0]
+            results[i] = result
+    return(results)
+
+def printSummary(results, elapsed):
+    """
+        Prints a line per pair and the totals
+    """
+    for result in results:
+        name = os.path.basename(result["problem"])
+        if result["solution"] is not None:
+            name += " " + os.path.basename(result["solution"])
+        if "error" in result:
+            print("%-40s ERROR   %s" % (name, result["error"]))
+            continue
+        verdict = "passed" if result["passed"] else "FAILED"
+        failed = [test["name"] for test in result["tests"] if not test["passed"]]
+        print("%-40s %-7s %10d configs  load %8.3fs  check %8.3fs  %s" % (
+            name, verdict, result["configs"], result["loadSeconds"], result["validateSeconds"],
+            ", ".join(failed)))
+
+    passed = sum(1 for result in results if result["passed"])
+    errors = sum(1 for result in results if "error" in result)
+    print("%d pair(s): %d passed, %d failed, %d could not be read; %.3fs" % (
+        len(results), passed, len(results) - passed - errors, errors, elapsed))
+
+def main(args):
+    """
+        The command line batch validator
+
+        @return the number of pairs that didn't pass, which is the exit status
+    """
+    maxError = Tester.Tester.DEFAULT_MAX_ERROR
+    jsonPath = None
+    workers = None
+    useCache = False
+    source = None
+    i = 0
+    while i < len(args):
+        arg = args[i].strip()
+        if arg in ("-e", "-j", "-p"):
+            i += 1
+            if i < len(args):
+                if arg == "-e":
+                    maxError = float(args[i])
+                elif arg == "-j":
+                    jsonPath = args[i]
+                else:
+                    workers = int(args[i])
+        elif arg == "-c":
+            useCache = True
+        else:
+            source = arg
+        i += 1
+    if source is None:
+        print("Usage: BatchValidator [-e maxError] [-c] [-j summary.json] [-p workers] "
+              + "manifest-or-directory")
+        return(1)
+
+    pairs = scanDirectory(source) if os.path.isdir(source) else readManifest(source)
+    started = time.perf_counter()
+    results = validateAll(pairs, maxError, workers, useCache)
+    elapsed = time.perf_counter() - started
+    printSummary(results, elapsed)
+
+    if jsonPath is not None:
+        with open(jsonPath, 'w') as outputFile:
+            json.dump({"maxError": maxError, "seconds": elapsed, "pairs": results}, outputFile, indent=2)
+            outputFile.write("\n")
+    return(sum(1 for result in results if not result["passed"]))
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
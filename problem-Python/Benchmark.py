@@ -0,0 +1,208 @@
+"""
+    Benchmarks of every Tester check, and of loading and saving, over a range of
+    workload sizes, in python.
+
+    Each size is a synthetic workload (see Workloads) of some number of ASVs, steps
+    and obstacles, written to a scratch directory. Every check is timed on its own
+    and reported as seconds and configs per second; the vectorised checks are
+    quick enough to take the best of REPEATS runs. The swept collision check, which
+    still goes step by step in python near obstacles, is timed on the first
+    SAMPLE_LIMIT configs only, so the large sizes finish; the number of configs
+    each timing covers is recorded with it. ConfigSampler is timed drawing
+    SAMPLE_LIMIT valid configs for the workload's problem.
+
+    Results are written as JSON, and can be compared against an earlier run:
+
+        python -m Benchmark [-o results.json] [-c baseline.json] [-s sizes] [--full]
+
+    where sizes is a list like 3x1e4x10,7x1e6x1000 (ASVs x steps x obstacles).
+    Comparing prints the ratio of each timing to the baseline's and flags those
+    slower by more than REGRESSION_RATIO.
+
+    @author Loreith
+"""
+
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import ConfigSampler
+import FusedValidator
+import ProblemSpec
+import Tester
+import Workloads
+
+#(ASVs, steps, obstacles) run by default, and with --full
+SIZES = [(3, 10**4, 10), (7, 10**5, 100), (7, 10**6, 1000)]
+FULL_SIZES = SIZES + [(7, 10**7, 10**4), (7, 10**6, 10**5)]
+#Configs the swept collision check is timed on, and the sampler is timed drawing
+SAMPLE_LIMIT = 20000
+#Fast checks are run this many times and the best time kept, to cut out noise
+REPEATS = 3
+#Timings this much slower than the baseline are flagged
+REGRESSION_RATIO = 1.25
+
+def timed(function, *args):
+    """
+        @return (seconds taken, result) for function(*args)
+    """
+    started = time.perf_counter()
+    result = function(*args)
+    return(time.perf_counter() - started, result)
+
+def bestOf(repeats, function, *args):
+    """
+        @return the fastest of repeats timed runs of function(*args), as timed
+    """
+    return(min((timed(function, *args) for i in range(repeats)), key=lambda run: run[0]))
+
+def sample(tester, limit):
+    """
+        @return a Tester sharing tester's problem with only its first limit configs
+    """
+    sampled = Tester.Tester(tester.maxError)
+    ps = sampled.ps
+    ps.asvCount, ps.initialState, ps.goalState, ps.obstacles = (
+        tester.ps.asvCount, tester.ps.initialState, tester.ps.goalState, tester.ps.obstacles)
+    ps.problemLoaded = True
+    ps.setPath(tester.ps.getPath()[:limit])
+    return(sampled)
+
+def benchmarkSize(directory, asvCount, steps, obstacles):
+    """
+        Generates one workload size and times everything on it
+
+        @return a list of result dicts, one per timing
+    """
+    results = []
+    def record(name, seconds, configs):
+        results.append({"name": name, "asvCount": asvCount, "steps": steps, "obstacles": obstacles,
+                        "configs": configs, "seconds": seconds,
+                        "configsPerSecond": configs / seconds if seconds > 0 else None})
+        print("  %-12s %10d configs %10.4fs %14.0f configs/s" % (name, configs, seconds,
+                                                                  configs / seconds if seconds > 0 else 0))
+
+    name = "k%d-n%d-m%d" % (asvCount, steps, obstacles)
+    seconds, (problemFile, textFile) = timed(Workloads.writeWorkload, directory, name, asvCount, steps, obstacles)
+    record("generate", seconds, steps + 1)
+
+    tester = Tester.Tester()
+    seconds, _ = timed(tester.ps.loadProblem, problemFile)
+    record("loadProblem", seconds, 1)
+    seconds, _ = timed(tester.ps.loadSolution, textFile)
+    record("loadText", seconds, steps + 1)
+    binaryFile = os.path.join(directory, name + "-solution.bin")
+    seconds, _ = timed(tester.ps.saveSolution, binaryFile, True)
+    record("saveBinary", seconds, steps + 1)
+    seconds, _ = timed(tester.ps.saveSolution, os.path.join(directory, name + "-saved.txt"))
+    record("saveText", seconds, steps + 1)
+    seconds, _ = timed(tester.ps.loadSolution, binaryFile)
+    record("loadBinary", seconds, steps + 1)
+
+    path = tester.ps.getPath()
+    configs = len(path)
+    tester.getObstacleGrid()
+    def cost():
+        tester.ps.stepCosts = None
+        return(tester.ps.calculateTotalCost())
+    for check, function in (("steps", tester.getInvalidSteps), ("cost", cost),
+                            ("booms", tester.getInvalidBoomStates), ("convexity", tester.getNonConvexStates),
+                            ("areas", tester.getInvalidAreaStates), ("bounds", tester.getOutOfBoundsStates),
+                            ("collisions", tester.getCollidingStates)):
+        seconds, _ = bestOf(REPEATS, function)
+        record(check, seconds, configs)
+    validator = FusedValidator.FusedValidator(tester)
+    seconds, _ = timed(validator.validate, path)
+    record("fused", seconds, configs)
+
+    sampled = sample(tester, SAMPLE_LIMIT)
+    sampledConfigs = len(sampled.ps.getPath())
+    seconds, _ = timed(sampled.sweptCollisionMask, sampled.ps.getPath().data)
+    record("sweep", seconds, sampledConfigs)
+    sampler = ConfigSampler.ConfigSampler(tester, seed=0)
+    seconds, _ = timed(sampler.sample, SAMPLE_LIMIT)
+    record("sampler", seconds, SAMPLE_LIMIT)
+    return(results)
+
+def compare(results, baseline):
+    """
+        Prints each timing against the baseline run's timing for the same check and size
+
+        @return the number of timings slower than the baseline by more than REGRESSION_RATIO
+    """
+    key = lambda r: (r["name"], r["asvCount"], r["steps"], r["obstacles"])
+    previous = dict((key(r), r) for r in baseline["results"])
+    regressions = 0
+    for result in results:
+        old = previous.get(key(result))
+        if old is None or not old["configsPerSecond"] or not result["configsPerSecond"]:
+            continue
+        ratio = old["configsPerSecond"] / result["configsPerSecond"]
+        flag = ""
+        if ratio > REGRESSION_RATIO:
+            flag = "  SLOWER"
+            regressions += 1
+        print("%-12s k%d n%d m%d  %8.2fx the baseline time%s" % (key(result) + (ratio, flag)))
+    return(regressions)
+
+def parseSizes(text):
+    """
+        @return the (ASVs, steps, obstacles) tuples in text like 3x1e4x10,7x1e6x1000
+    """
+    return([tuple(int(float(v)) for v in size.split("x")) for size in text.split(",") if size])
+
+def main(args):
+    """
+        Runs the benchmarks
+
+        @return the number of regressions against the baseline, which is the exit status
+    """
+    output = "benchmark-results.json"
+    baselinePath = None
+    sizes = SIZES
+    i = 0
+    while i < len(args):
+        arg = args[i].strip()
+        if arg in ("-o", "-c", "-s") and i + 1 < len(args):
+            i += 1
+            if arg == "-o":
+                output = args[i]
+            elif arg == "-c":
+                baselinePath = args[i]
+            else:
+                sizes = parseSizes(args[i])
+        elif arg == "--full":
+            sizes = FULL_SIZES
+        else:
+            print("Usage: Benchmark [-o results.json] [-c baseline.json] [-s sizes] [--full]")
+            return(1)
+        i += 1
+
+    directory = tempfile.mkdtemp(prefix="asv-benchmark-")
+    results = []
+    try:
+        for asvCount, steps, obstacles in sizes:
+            print("%d ASVs, %d steps, %d obstacles" % (asvCount, steps, obstacles))
+            results.extend(benchmarkSize(directory, asvCount, steps, obstacles))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    run = {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+           "python": platform.python_version(), "numpy": np.__version__,
+           "machine": platform.machine(), "cpus": os.cpu_count(), "results": results}
+    with open(output, 'w') as outputFile:
+        json.dump(run, outputFile, indent=2)
+        outputFile.write("\n")
+
+    if baselinePath is None:
+        return(0)
+    with open(baselinePath, 'r') as inputFile:
+        return(compare(results, json.load(inputFile)))
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,145 @@
+"""
+    Bulk parsing of problem and solution text files, in python.
+
+    Instead of splitting and converting each line on its own, the whole numeric body
+    of a file is handed to numpy's C text reader (loadtxt) in one call and comes back
+    as a float64 array. Any whitespace (spaces, tabs, trailing blanks) separates
+    numbers. Only if the bulk pass doesn't produce exactly the expected shape are the
+    lines walked one at a time, to find the exact line that is malformed - or to drop
+    extra trailing values, which the java Scanner ignores too.
+
+    Errors are IOErrors with the same messages as the java ProblemSpec.
+
+    @author Loreith
+"""
+
+import io
+import itertools
+import warnings
+import numpy as np
+
+def loadRows(lines, rows, width):
+    """
+        The bulk pass: parses an iterable of lines with numpy's C reader
+
+        @return an (rows, width) float64 array, or None if the lines aren't exactly
+            rows lines of width numbers each
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore") #loadtxt warns about empty input
+            values = np.loadtxt(lines, dtype=np.float64, comments=None, ndmin=2)
+    except ValueError:
+        return(None)
+    if values.shape != (rows, width):
+        return(None)
+    return(values)
+
+def parseLines(lines, width, firstLineNo):
+    """
+        Parses lines that each hold (at least) width numbers
+
+        @param lines the lines to parse, as a list of strings
+
+        @param width the number of values to read from each line
+
+        @param firstLineNo the 1-based line number of lines[0] in the file, for errors
+
+        @return an (len(lines), width) float64 array
+
+        @throws IOError naming the first malformed line
+    """
+    values = loadRows(lines, len(lines), width)
+    if values is None:
+        values = parseEachLine(lines, width, firstLineNo)
+    return(values)
+
+def parseEachLine(lines, width, firstLineNo):
+    """
+        The slow path of parseLines: converts line by line, so that errors can name
+        their line and extra values at the end of a line can be ignored
+    """
+    result = np.empty((len(lines), width), dtype=np.float64)
+    for i, line in enumerate(lines):
+        tokens = line.split()
+        if len(tokens) < width:
+            raise IOError("Not enough tokens on line %d" % (firstLineNo + i))
+        try:
+            result[i] = np.array(tokens[:width], dtype=np.float64)
+        except ValueError as e:
+            raise IOError("Invalid number format on line %d: %s" % (firstLineNo + i, e))
+    return(result)
+
+def parseCount(line, lineNo):
+    """
+        @return the integer at the start of line
+
+        @throws IOError if it's missing or not an integer
+    """
+    tokens = line.split()
+    if not tokens:
+        raise IOError("Not enough tokens on line %d" % lineNo)
+    try:
+        return(int(tokens[0]))
+    except ValueError as e:
+        raise IOError("Invalid number format on line %d: %s" % (lineNo, e))
+
+def takeLines(lines, start, count):
+    """
+        @return lines[start:start + count]
+
+        @throws IOError if the file ends before that many lines
+    """
+    if len(lines) < start + count:
+        raise IOError("Line %d expected, but file ended." % (len(lines) + 1))
+    return(lines[start:start + count])
+
+def parseProblem(text):
+    """
+        Parses the contents of a problem file
+
+        @param text the whole file as a string
+
+        @return (asvCount, initial, goal, rects) where initial and goal are (k, 2)
+            arrays and rects is an (M, 4) array of x, y, w, h for each obstacle
+    """
+    lines = text.split('\n')
+    asvCount = parseCount(takeLines(lines, 0, 1)[0], 1)
+    states = parseLines(takeLines(lines, 1, 2), asvCount * 2, 2).reshape(2, asvCount, 2)
+    numObstacles = parseCount(takeLines(lines, 3, 1)[0], 4)
+    corners = parseLines(takeLines(lines, 4, numObstacles), 8, 5).reshape(numObstacles, 4, 2)
+
+    low = corners.min(axis=1)
+    high = corners.max(axis=1)
+    rects = np.hstack((low, high - low))
+    return(asvCount, states[0], states[1], rects)
+
+def parseSolution(text, asvCount):
+    """
+        Parses the contents of a solution file
+
+        @param text the whole file as a string
+
+        @param asvCount the number of ASVs in each config
+
+        @return (steps, cost, path) where path is an (steps + 1, asvCount, 2) array
+    """
+    header, _, body = text.partition('\n')
+    tokens = header.split()
+    if len(tokens) < 2:
+        raise IOError("Not enough tokens on line 1")
+    try:
+        steps = int(tokens[0])
+        cost = float(tokens[1])
+    except ValueError as e:
+        raise IOError("Invalid number format on line 1: %s" % e)
+
+    pathLength = steps + 1
+    width = asvCount * 2
+    #Only the first pathLength lines are read, so trailing lines are ignored and a blank
+    #line inside the path comes out one row short instead of being skipped
+    values = loadRows(itertools.islice(io.StringIO(body), pathLength), pathLength, width)
+    if values is None:
+        lines = takeLines(body.split('\n'), 0, pathLength)
+        values = parseEachLine(lines, width, 2)
+    return(steps, cost, values.reshape(pathLength, asvCount, 2))
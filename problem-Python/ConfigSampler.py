@@ -0,0 +1,131 @@
+import math
+import numpy as np
+
+class ConfigSampler:
+    """
+        Draws random valid configs for a problem in large batches, in python, for
+        sampling-based planners.
+
+        Configs are built boom by boom, so the boom lengths are right by
+        construction: each boom is MIN_BOOM_LENGTH to MAX_BOOM_LENGTH long and turns
+        from the one before by a random angle, all turns the same way. The turns
+        are 2pi/k apart on average - those of the regular polygon, which is convex
+        and has room to spare on area - varied by up to spread of that either way.
+        Each config is then turned to a random heading and its centre placed
+        uniformly in the region. The other rules are checked by rejection, with the
+        Tester's vectorised masks over the whole batch: convexity, area, bounds and
+        collisions with the lenient obstacles.
+
+        A larger spread gives more varied shapes and rejects more of them; 0 gives
+        only regular polygons.
+
+        Usage:
+            sampler = ConfigSampler(tester, seed=0)
+            configs = sampler.sample(10000)
+
+        @author Loreith
+    """
+    DEFAULT_SPREAD = 0.25
+    #Candidates built and checked together
+    BATCH_SIZE = 65536
+    #Batches sample() draws before giving up on a region with no room for a config
+    MAX_BATCHES = 1000
+
+    def __init__(self, tester, spread=DEFAULT_SPREAD, region=None, seed=None):
+        """
+            @param tester the Tester whose loaded problem, limits and checks to use
+
+            @param spread how far each turn may vary from the regular polygon's, as a
+                fraction of it
+
+            @param region the (x, y, w, h) the configs' centres are drawn from;
+                tester.BOUNDS by default
+
+            @param seed a seed for the random numbers, or None
+        """
+        self.tester = tester
+        self.asvCount = tester.ps.getASVCount()
+        self.spread = spread
+        self.region = tuple(tester.BOUNDS if region is None else region)
+        self.rng = np.random.default_rng(seed)
+        self.drawn = 0
+        self.accepted = 0
+
+    def candidates(self, count):
+        """
+            @return an (count, k, 2) array of configs with valid boom lengths, not yet
+                checked against the other rules
+        """
+        k = self.asvCount
+        rng = self.rng
+        tester = self.tester
+        if tester.MIN_BOOM_LENGTH == tester.MAX_BOOM_LENGTH:
+            lengths = tester.MIN_BOOM_LENGTH
+        else:
+            lengths = rng.uniform(tester.MIN_BOOM_LENGTH, tester.MAX_BOOM_LENGTH, (count, k - 1))
+        turns = (2 * math.pi / k) * (1 + self.spread * rng.uniform(-1, 1, (count, k - 1)))
+        #The first boom sets the heading, so its turn is any angle; half turn the other way
+        turns[:, 0] = rng.uniform(0, 2 * math.pi, count)
+        turns *= np.where(rng.random(count) < 0.5, -1.0, 1.0)[:, np.newaxis]
+        headings = np.cumsum(turns, axis=1)
+
+        #x and y apart, as contiguous (count, k) arrays are much quicker to work on
+        x, y, w, h = self.region
+        coords = []
+        for step, low, size in ((np.cos(headings), x, w), (np.sin(headings), y, h)):
+            values = np.zeros((count, k))
+            np.cumsum(lengths * step, axis=1, out=values[:, 1:])
+            values += (rng.uniform(low, low + size, count) - values.mean(axis=1))[:, np.newaxis]
+            coords.append(values)
+        return(np.stack(coords, axis=-1))
+
+    def validMask(self, configs):
+        """
+            @param configs an (N, k, 2) array, e.g. from candidates
+
+            @return a length-N boolean mask, True where the config passes the Tester's
+                convexity, area, bounds and collision tests (boom lengths are right
+                by construction)
+        """
+        tester = self.tester
+        survivors = np.arange(len(configs))
+        #Each only on the configs the ones before passed: the cheap ones first, then
+        #collisions, which reject far more than convexity for about the same cost
+        for check in (tester.fitsBoundsMask, tester.enoughAreaMask, tester.collisionFreeMask, tester.convexMask):
+            survivors = survivors[check(configs[survivors])]
+        mask = np.zeros(len(configs), dtype=bool)
+        mask[survivors] = True
+        return(mask)
+
+    def sampleBatch(self, count=BATCH_SIZE):
+        """
+            @return the valid configs among count new candidates, as an (n, k, 2) array
+        """
+        configs = self.candidates(count)
+        valid = configs[self.validMask(configs)]
+        self.drawn += count
+        self.accepted += len(valid)
+        return(valid)
+
+    def sample(self, count, batchSize=BATCH_SIZE):
+        """
+            @return an (count, k, 2) array of valid configs
+        """
+        batches = []
+        found = 0
+        for i in range(self.MAX_BATCHES):
+            if found >= count:
+                break
+            batch = self.sampleBatch(batchSize)
+            batches.append(batch)
+            found += len(batch)
+        if found < count:
+            raise ValueError("Only %d of %d valid configs found in %d candidates"
+                             % (found, count, self.MAX_BATCHES * batchSize))
+        return(np.concatenate(batches)[:count])
+
+    def getAcceptanceRate(self):
+        """
+            @return the fraction of the candidates drawn so far that were valid
+        """
+        return(self.accepted / self.drawn if self.drawn else 0.0)
@@ -0,0 +1,151 @@
+import numpy as np
+import ObstacleSet
+
+class DistanceField:
+    """
+        The distance to the nearest obstacle, sampled on a regular grid of nodes over
+        a workspace, in python, for clearance queries in O(1) instead of one
+        distance per obstacle.
+
+        Distance to a set of obstacles changes by at most as much as the point moves,
+        so from the four nodes n of the cell a point p falls in
+
+            max(d(n) - |p - n|) <= d(p) <= min(d(n) + |p - n|)
+
+        The lower bound is what lookups return, so they never overstate the
+        clearance. It is within errorBound (the cell diagonal) of the truth, so only
+        points whose bound is below errorBound - where that error is as large as the
+        clearance itself - are measured exactly, through the obstacles' grid.
+
+        The field is plain arrays and the ObstacleSet it was built from, so it saves
+        as arrays (toArrays); Tester.getDistanceField keeps it in the ProblemCache
+        with the problem, so it is built once per scenario and resolution.
+
+        Usage:
+            field = tester.getDistanceField()
+            clearances = field.clearance(points)
+
+        @author Loreith
+    """
+    #Cells per side of the workspace
+    DEFAULT_RESOLUTION = 256
+
+    def __init__(self, obstacles, bounds=(0, 0, 1, 1), resolution=DEFAULT_RESOLUTION):
+        """
+            @param obstacles the ObstacleSet to measure clearance from
+
+            @param bounds the workspace (x, y, w, h) to sample, as Tester.BOUNDS
+
+            @param resolution the number of cells along each side
+        """
+        self.obstacles = obstacles
+        self.origin = np.array(bounds[:2], dtype=np.float64)
+        self.resolution = resolution
+        self.cellSize = np.array(bounds[2:], dtype=np.float64) / resolution
+        self.errorBound = float(np.hypot(*self.cellSize))
+
+        axis = np.arange(resolution + 1)
+        nodes = self.origin + self.cellSize * np.stack(np.meshgrid(axis, axis, indexing="ij"), axis=-1)
+        #Indexed [column, row]
+        self.values = self.exactDistances(nodes.reshape(-1, 2)).reshape(resolution + 1, resolution + 1)
+
+    def toArrays(self):
+        """
+            @return the field and its ObstacleSet as a flat dict of arrays, as the
+                ProblemCache stores it (see fromArrays)
+        """
+        arrays = {"origin": self.origin, "cellSize": self.cellSize, "resolution": np.array(self.resolution),
+                  "values": self.values}
+        for name, value in self.obstacles.toArrays().items():
+            arrays["obstacles." + name] = value
+        return(arrays)
+
+    @classmethod
+    def fromArrays(cls, arrays):
+        """
+            Remakes a field saved with toArrays without measuring any distances
+
+            @param arrays the dict toArrays returned
+
+            @return a DistanceField
+        """
+        field = cls.__new__(cls)
+        obstacles = dict((name[len("obstacles."):], value) for name, value in arrays.items()
+                         if name.startswith("obstacles."))
+        field.obstacles = ObstacleSet.ObstacleSet.fromArrays(obstacles)
+        field.origin = arrays["origin"]
+        field.resolution = int(arrays["resolution"])
+        field.cellSize = arrays["cellSize"]
+        field.errorBound = float(np.hypot(*field.cellSize))
+        field.values = arrays["values"]
+        return(field)
+
+    def exactDistances(self, points):
+        """
+            @param points an (P, 2) array
+
+            @return a length-P array of the distance from each point to the nearest
+                obstacle (inf if there are none), see ObstacleGrid.nearestMany
+        """
+        return(self.obstacles.grid.nearestMany(points)[0])
+
+    def cellCorners(self, points):
+        """
+            @return (nodes, values): the (P, 4, 2) positions and (P, 4) distances of
+                the corners of the cell each point falls in (the nearest cell for
+                points outside the workspace)
+        """
+        cell = np.floor((points - self.origin) / self.cellSize).astype(np.intp)
+        cell = np.clip(cell, 0, self.resolution - 1)
+        index = cell[:, np.newaxis] + np.array([[0, 0], [1, 0], [0, 1], [1, 1]])
+        return(self.origin + self.cellSize * index, self.values[index[..., 0], index[..., 1]])
+
+    def interval(self, points):
+        """
+            @param points an (P, 2) array
+
+            @return (lower, upper) arrays bounding each point's clearance, in O(1) each
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        nodes, values = self.cellCorners(points)
+        offsets = np.hypot(*(points[:, np.newaxis] - nodes).transpose(2, 0, 1))
+        return((values - offsets).max(axis=1), (values + offsets).min(axis=1))
+
+    def lowerBound(self, points):
+        """
+            @return a lower bound on each point's clearance, within errorBound of it
+        """
+        return(self.interval(points)[0])
+
+    def clearance(self, points):
+        """
+            The clearance of each point: the field's lower bound, or the exact distance
+            where that bound is below errorBound
+
+            @param points an (P, 2) array
+
+            @return a length-P array, never more than the true distance to the nearest
+                obstacle (0 on or inside one)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        lower = np.maximum(self.lowerBound(points), 0.0)
+        close = np.flatnonzero(lower < self.errorBound)
+        lower[close] = self.exactDistances(points[close])
+        return(lower)
+
+    def isClear(self, points, required):
+        """
+            @param points an (P, 2) array
+
+            @param required the clearance each point needs
+
+            @return a length-P boolean array, True where the point is at least required
+                from every obstacle; only points whose bounds straddle required are
+                measured exactly
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        lower, upper = self.interval(points)
+        clear = lower >= required
+        unsure = np.flatnonzero(~clear & (upper >= required))
+        clear[unsure] = self.exactDistances(points[unsure]) >= required
+        return(clear)
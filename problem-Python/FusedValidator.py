@@ -0,0 +1,254 @@
+import time
+import numpy as np
+import ASVconfig
+import ProblemSpec
+import Stats
+
+class FusedValidator:
+    """
+        Runs every one of the Tester's checks over a path in a single pass, in python.
+
+        Tester.testByName walks the whole path once per test; this walks it once in
+        total, a chunk at a time, working out every per-config verdict (booms,
+        convexity, areas, bounds, collisions) and every per-step verdict (step sizes,
+        cost) for the chunk while it is at hand. Only the last config of the previous
+        chunk is carried over, so the same object validates an in-memory path or a
+        stream of chunks read from a file.
+
+        The verdicts themselves come from the Tester, so they are exactly the ones
+        testByName would give; report() prints the same per-test reports.
+
+        Usage:
+            validator = FusedValidator(tester)
+            for chunk in chunks:
+                validator.feed(chunk)
+            failures = validator.report(verbose)
+
+        @author Loreith
+    """
+    #Configs checked together when validating a whole in-memory path
+    CHUNK_SIZE = 4096
+
+    def __init__(self, tester):
+        """
+            @param tester the Tester whose problem, maxError and checks to use
+        """
+        self.tester = tester
+        #Built now so its cost isn't charged to the first chunk's collision check
+        tester.getObstacleGrid()
+        self.maxStep = tester.MAX_STEP + tester.maxError
+
+        #Test name -> failing path indices (for steps, the index the step starts at)
+        self.bad = dict((name, []) for name in tester.STATE_TESTS + ["steps"])
+        self.first = None
+        self.last = None
+        self.count = 0
+        self.cost = 0.0
+        #Test name -> seconds spent on it, for the machine-readable summary
+        self.times = dict((name, 0.0) for name in tester.SOLUTION_TESTS + tester.STATE_TESTS)
+
+    def feed(self, chunk):
+        """
+            Checks the next chunk of the path
+
+            @param chunk a PathArray holding the configs following those already fed
+        """
+        if len(chunk) == 0:
+            return(None)
+        tester = self.tester
+        bad = self.bad
+
+        if self.last is None:
+            self.first = ASVconfig.ASVConfig(chunk[0])
+            joined = chunk
+            start = 0
+        else:
+            #Carry the previous chunk's last config over so the boundary step is checked
+            joined = ProblemSpec.PathArray.fromArray(np.concatenate((self.last.coords[np.newaxis], chunk.data)))
+            start = self.count - 1
+        times = self.times
+        clock = [time.perf_counter()]
+        def lap(name):
+            #Charges the time since the last lap to the named check
+            now = time.perf_counter()
+            times[name] += now - clock[0]
+            if Stats.enabled:
+                Stats.addSpan("check:" + name, clock[0], now)
+            clock[0] = now
+
+        distances = joined.stepDistances()
+        bad["steps"].extend((start + np.flatnonzero(distances.max(axis=1, initial=0.0) > self.maxStep)).tolist())
+        lap("steps")
+        self.cost += float(distances.sum())
+        lap("cost")
+
+        #Every check covers the whole chunk at once
+        for name, check in (("booms", tester.validBoomMask),
+                            ("convexity", tester.convexMask),
+                            ("areas", tester.enoughAreaMask),
+                            ("bounds", tester.fitsBoundsMask),
+                            ("collisions", tester.collisionFreeMask)):
+            bad[name].extend((self.count + np.flatnonzero(~check(chunk.data))).tolist())
+            lap(name)
+
+        self.last = ASVconfig.ASVConfig(chunk[-1])
+        self.count += len(chunk)
+
+    def startAt(self, index, previous):
+        """
+            Sets the validator up to check a part of a path that doesn't begin at the
+            start, as for one worker's share of a parallel validation (see
+            ParallelValidator); indices it reports are then path indices
+
+            @param index the path index of the first config that will be fed
+
+            @param previous the config at index - 1, so the step into this part is
+                checked, or None if index is 0
+        """
+        self.count = index
+        self.last = None if previous is None else ASVconfig.ASVConfig(previous)
+
+    def getResults(self):
+        """
+            @return the verdicts so far as a plain dict, small enough to pass between
+                processes (only failures are listed)
+        """
+        return({"bad": self.bad, "first": self.first, "last": self.last,
+                "count": self.count, "cost": self.cost, "times": self.times})
+
+    def merge(self, results):
+        """
+            Adds on the verdicts for the part of the path that follows the configs
+            already fed or merged
+
+            @param results getResults() of a validator that was started at this one's count
+        """
+        for name, indices in results["bad"].items():
+            self.bad[name].extend(indices)
+        if self.first is None:
+            self.first = results["first"]
+        self.last = results["last"]
+        self.count = results["count"]
+        self.cost += results["cost"]
+        for name, seconds in results["times"].items():
+            self.times[name] += seconds
+
+    def validate(self, path, chunkSize=CHUNK_SIZE):
+        """
+            Feeds a whole in-memory path through, chunk by chunk
+
+            @param path a PathArray
+        """
+        for start in range(0, len(path), chunkSize):
+            self.feed(path[start:start + chunkSize])
+
+    def getFailures(self, testName):
+        """
+            @return the failing path indices for a per-config or per-step test
+        """
+        return(self.bad[testName])
+
+    def outcomes(self, claimedCost=None, solutionTests=True):
+        """
+            Works out the verdict of each test, in the order the java tester runs them
+
+            @param claimedCost the cost the solution claims; defaults to the problem's
+                solution cost
+
+            @param solutionTests whether to include the initial, goal, steps and cost
+                tests, as when a solution file was given
+
+            @return a list of (name, passed, failing indices or None, number checked,
+                message args) for each test
+        """
+        tester = self.tester
+        if self.count == 0:
+            raise IOError("Solution contains no configs")
+        if claimedCost is None:
+            claimedCost = tester.ps.getSolutionCost()
+
+        names = (tester.SOLUTION_TESTS if solutionTests else []) + tester.STATE_TESTS
+        results = []
+        for name in names:
+            if name == "initial":
+                passed = self.first.maxDistance(tester.ps.getInitialState()) <= tester.maxError
+                results.append((name, passed, None, 1, ()))
+            elif name == "goal":
+                passed = self.last.maxDistance(tester.ps.getGoalState()) <= tester.maxError
+                results.append((name, passed, None, 1, ()))
+            elif name == "cost":
+                passed = abs(claimedCost - self.cost) <= tester.maxError
+                results.append((name, passed, None, self.count - 1, (claimedCost, self.cost)))
+            else:
+                total = self.count - 1 if name == "steps" else self.count
+                results.append((name, not self.bad[name], self.bad[name], total, ()))
+        return(results)
+
+    def report(self, verbose, firstTestNo=1, claimedCost=None, solutionTests=True):
+        """
+            Prints the report for each test, in the order the java tester runs them
+
+            @param verbose whether to list the failing lines
+
+            @param firstTestNo the number of the first test printed
+
+            @param claimedCost the cost the solution claims; defaults to the problem's
+                solution cost
+
+            @param solutionTests whether to include the initial, goal, steps and cost
+                tests, as when a solution file was given
+
+            @return the number of tests that failed
+        """
+        tester = self.tester
+        failures = 0
+        testNo = firstTestNo
+        for name, passed, badList, total, messageArgs in self.outcomes(claimedCost, solutionTests):
+            if badList is None:
+                passed = tester.report(name, testNo, verbose, passed, messageArgs)
+            else:
+                passed = tester.reportList(name, testNo, verbose, badList, total)
+            if not passed:
+                failures += 1
+            testNo += 1
+        return(failures)
+
+    def summary(self, claimedCost=None, solutionTests=True):
+        """
+            The verdicts as a JSON-ready dict, for CI and other tools
+
+            Times are the seconds spent on each check (summed over workers for a
+            parallel validation); the steps and cost tests share the step distances,
+            which are counted under steps. Failing configs are given as inclusive
+            [first, last] ranges of path indices, which are 2 less than the line
+            numbers the text report lists.
+
+            @return {"passed", "failures", "configs", "cost", "tests": [...]}
+        """
+        tests = []
+        for name, passed, badList, total, messageArgs in self.outcomes(claimedCost, solutionTests):
+            seconds = self.times[name]
+            test = {"name": name, "title": self.tester.REPORTS[name][0], "passed": bool(passed),
+                    "checked": total, "seconds": seconds,
+                    "configsPerSecond": self.count / seconds if seconds > 0 else None}
+            if badList is not None:
+                test["failing"] = len(badList)
+                test["failingRanges"] = indexRanges(badList)
+            tests.append(test)
+        failures = sum(1 for test in tests if not test["passed"])
+        return({"passed": failures == 0, "failures": failures, "configs": self.count,
+                "cost": self.cost, "tests": tests})
+
+def indexRanges(indices):
+    """
+        @param indices increasing path indices
+
+        @return the indices as a list of inclusive [first, last] runs
+    """
+    ranges = []
+    for i in indices:
+        if ranges and ranges[-1][1] == i - 1:
+            ranges[-1][1] = i
+        else:
+            ranges.append([i, i])
+    return(ranges)
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 class Obstacle:
     """
@@ -27,6 +28,12 @@ class Obstacle:
             outcode(coord) where coord = (x,y)
                 Vector (x,y,dx,dy) of mag (dx,dy) from closest point (x,y) of the obstacle
 
+            distances(points) where points is an (..., 2) array
+                distance for every point at once
+
+            outcodes(points) where points is an (..., 2) array
+                outcode for every point at once, as an (..., 4) array
+
         @Author Loreith
     """
 
@@ -75,27 +82,20 @@ class Obstacle:
           	    rectangle.
 
             @param string the string describing the obstacle
-        """
-        #xs = []
-        #yx = []
 
-        xMin = 0
-        xMax = 0
-        yMin = 0
-        yMax = 0
-
-        stringList = string.split(' ')
-
-        for i in range(4):
-            #xs.append(stringList[i*2])
-            #ys.append(stringList[(i*2) + 1])
+            @return self, so that Obstacle().construct(string) can be used inline
+        """
+        values = [float(v) for v in string.split()[:8]]
+        xs = values[0::2]
+        ys = values[1::2]
 
-            xMin = stringList[i*2] if stringList[i*2] < xMin else xMin
-            xMax = stringList[i*2] if stringList[i*2] > xMax else xMax
-            yMin = stringList[(i*2) + 1] if stringList[(i*2) + 1] < yMin else yMin
-            yMax = stringList[(i*2) + 1] if stringList[(i*2) + 1] > yMax else yMax
+        xMin = min(xs)
+        xMax = max(xs)
+        yMin = min(ys)
+        yMax = max(ys)
 
         self.rect = [xMin, yMin, xMax - xMin, yMax - yMin]
+        return(self)
 
     def getRect(self):
         """
@@ -128,14 +128,14 @@ class Obstacle:
 
         if (x > ownX and x < ownX + ownW):
             #If a perpendicular line is possible it is the shortest something something dot product
-            return( min([ abs(y-ownY), abs(y-(ownY + ownH)) ]) )
+            return( min(abs(y-ownY), abs(y-(ownY + ownH))) )
         elif (y > ownY and y < ownY + ownH):
-            return( min([ abs(x-ownX), abs(x-(ownX + ownW)) ]) )
+            return( min(abs(x-ownX), abs(x-(ownX + ownW))) )
 
         else:
             #If we are past a corner, return the pythagorean distance from said corner
-            cornerX = min([ abs(x-ownX), abs(x-(ownX + ownW)) ])
-            cornerY = min([ abs(y-ownY), abs(y-(ownY + ownH)) ])
+            cornerX = ownX if abs(x-ownX) < abs(x-(ownX + ownW)) else ownX + ownW
+            cornerY = ownY if abs(y-ownY) < abs(y-(ownY + ownH)) else ownY + ownH
 
             dx = abs(x-cornerX)
             dy = abs(y-cornerY)
@@ -167,23 +167,70 @@ class Obstacle:
             #If a perpendicular line is possible it is the shortest something something dot product
 
             sideY   = ownY if abs(y-ownY) < abs(y-(ownY + ownH)) else ownY + ownH
-            dy      = min( [ abs(y-ownY), abs(y-(ownY + ownH)) ] )
+            dy      = min(abs(y-ownY), abs(y-(ownY + ownH)))
 
             return( [x, sideY, 0, dy ] )
 
         elif (y > ownY and y < ownY + ownH):
 
             sideX   = ownX if abs(x-ownX) < abs(x-(ownX + ownW)) else ownX + ownW
-            dx      = min( [ abs(x-ownX), abs(x-(ownX + ownW)) ] )
+            dx      = min(abs(x-ownX), abs(x-(ownX + ownW)))
 
             return( [sideX, y, dx, 0] )
 
         else:
             #If we are past a corner, return the pythagorean distance from said corner
-            cornerX = min([ abs(x-ownX), abs(x-(ownX + ownW)) ])
-            cornerY = min([ abs(y-ownY), abs(y-(ownY + ownH)) ])
+            cornerX = ownX if abs(x-ownX) < abs(x-(ownX + ownW)) else ownX + ownW
+            cornerY = ownY if abs(y-ownY) < abs(y-(ownY + ownH)) else ownY + ownH
 
             dx = abs(x-cornerX)
             dy = abs(y-cornerY)
 
             return( [cornerX, cornerY, dx, dy] )
+
+    def distances(self, points):
+        """
+            distance for many points at once
+
+            @param points an (..., 2) array of (x,y)
+
+            @return an array of the distance from each point to the closest point of
+                the obstacle (0 inside it)
+        """
+        x, y, w, h = self.rect
+        return(nearestPoints(points, (x, y, x + w, y + h))[0])
+
+    def outcodes(self, points):
+        """
+            outcode for many points at once
+
+            @param points an (..., 2) array of (x,y)
+
+            @return an (..., 4) array of the closest point (x,y) of the obstacle to each
+                point and the absolute offsets (dx,dy) from it; a point inside gets
+                itself and offsets of 0
+        """
+        x, y, w, h = self.rect
+        distances, nearest, displacements = nearestPoints(points, (x, y, x + w, y + h))
+        return(np.concatenate((nearest, np.abs(displacements)), axis=-1))
+
+def nearestPoints(points, bounds):
+    """
+        The closest point of each rectangle to each point, for arrays of both
+
+        @param points an (..., 2) array of (x,y)
+
+        @param bounds an (..., 4) array of rectangle xMin, yMin, xMax, yMax (see
+            ObstacleSet.bounds); for every point against every rectangle pass
+            points[:, np.newaxis] and an (M, 4) array
+
+        @return (distances, nearest, displacements) arrays of the broadcast shape of
+            the two (without their last axes): the distance, the closest point (x,y)
+            and the vector (dx,dy) from it to the point; 0, the point itself and
+            (0,0) for a point on or inside its rectangle
+    """
+    points = np.asarray(points, dtype=np.float64)
+    bounds = np.asarray(bounds, dtype=np.float64)
+    nearest = np.minimum(np.maximum(points, bounds[..., :2]), bounds[..., 2:])
+    displacements = points - nearest
+    return(np.hypot(displacements[..., 0], displacements[..., 1]), nearest, displacements)
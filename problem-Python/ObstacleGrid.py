@@ -0,0 +1,288 @@
+import math
+import numpy as np
+import line2D
+import Obstacle
+
+class ObstacleGrid:
+    """
+        A uniform grid over a problem's obstacle rectangles, in python, so collision
+        and distance queries only look at the obstacles near them instead of all M.
+
+        The grid covers the bounding box of the obstacles with about one cell per
+        obstacle (at most MAX_CELLS_PER_AXIS a side), and each cell lists the
+        obstacles that overlap it, stored flat: the obstacles of cell c are
+        items[cellStart[c]:cellStart[c + 1]]. It only depends on the rectangles, so
+        one grid serves every config and every solution of a problem (each
+        ObstacleSet builds one).
+
+        Rectangles are given as an (M, 4) array of xMin, yMin, xMax, yMax (see
+        ObstacleSet.bounds). Those shrunk to nothing (xMax <= xMin or yMax <= yMin)
+        are left out of the cells, as every query ignores them: they never collide,
+        and are no distance from anything.
+
+        @author Loreith
+    """
+    MAX_CELLS_PER_AXIS = 1024
+    #Configs whose booms are checked together by firstCollisions
+    CHUNK_SIZE = 16384
+    #Rectangles up to which firstCollisions checks them all rather than use the grid;
+    #line2D.firstCollisions' bounding box test keeps up with the grid until about 768
+    DENSE_LIMIT = 512
+
+    def __init__(self, bounds):
+        """
+            @param bounds an (M, 4) array of rectangle xMin, yMin, xMax, yMax
+        """
+        self.bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        #Indices of the rectangles with some area, the only ones in the cells
+        self.solid = np.flatnonzero((self.bounds[:, 2] > self.bounds[:, 0]) & (self.bounds[:, 3] > self.bounds[:, 1]))
+        solid = self.bounds[self.solid]
+        count = len(solid)
+        if count:
+            self.origin = solid[:, :2].min(axis=0)
+            extent = np.maximum(solid[:, 2:].max(axis=0) - self.origin, 1e-12)
+        else:
+            self.origin = np.zeros(2)
+            extent = np.ones(2)
+        cells = min(self.MAX_CELLS_PER_AXIS, max(1, int(math.ceil(math.sqrt(count)))))
+        self.shape = (cells, cells)
+        self.cellSize = extent / cells
+
+        low = self.cellIndex(solid[:, :2])
+        high = self.cellIndex(solid[:, 2:])
+        rects, cellIds = self.expand(low, high)
+        rects = self.solid[rects]
+        order = np.argsort(cellIds, kind="stable")
+        self.items = rects[order]
+        self.cellStart = np.zeros(cells * cells + 1, dtype=np.intp)
+        np.cumsum(np.bincount(cellIds, minlength=cells * cells), out=self.cellStart[1:])
+        #The same as python lists, one per cell, made on the first call to candidates
+        self.cellLists = None
+
+    def toArrays(self):
+        """
+            @return the grid's cells as a dict of arrays, without the bounds (see
+                fromArrays)
+        """
+        return({"origin": self.origin, "cellSize": self.cellSize, "shape": np.array(self.shape),
+                "solid": self.solid, "items": self.items, "cellStart": self.cellStart})
+
+    @classmethod
+    def fromArrays(cls, bounds, arrays):
+        """
+            Remakes a grid saved with toArrays, without rebuilding its cells
+
+            @param bounds the (M, 4) rectangles the grid was built over
+
+            @param arrays the dict toArrays returned
+
+            @return an ObstacleGrid
+        """
+        grid = cls.__new__(cls)
+        grid.bounds = bounds
+        grid.origin = arrays["origin"]
+        grid.cellSize = arrays["cellSize"]
+        grid.shape = tuple(arrays["shape"].tolist())
+        grid.solid = arrays["solid"]
+        grid.items = arrays["items"]
+        grid.cellStart = arrays["cellStart"]
+        grid.cellLists = None
+        return(grid)
+
+    def cellIndex(self, points):
+        """
+            @return the (..., 2) integer cell column and row of each point, clamped to
+                the grid
+        """
+        index = np.floor((np.asarray(points, dtype=np.float64) - self.origin) / self.cellSize).astype(np.intp)
+        return(np.clip(index, 0, np.array(self.shape) - 1))
+
+    def expand(self, low, high):
+        """
+            Lists every cell of each range of cells
+
+            @param low an (B, 2) array of the first column and row of each range
+
+            @param high an (B, 2) array of the last column and row
+
+            @return (owner, cell id) arrays: the index of the range each cell came from,
+                and the cell's id (row * columns + column)
+        """
+        widths = high[:, 0] - low[:, 0] + 1
+        counts = widths * (high[:, 1] - low[:, 1] + 1)
+        owner = np.repeat(np.arange(len(low)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        column = low[owner, 0] + offset % widths[owner]
+        row = low[owner, 1] + offset // widths[owner]
+        return(owner, row * self.shape[0] + column)
+
+    def candidatePairs(self, boxes):
+        """
+            The broad phase for many query boxes at once
+
+            @param boxes an (B, 4) array of query box xMin, yMin, xMax, yMax
+
+            @return (box, rect) index arrays, each pair once, of every rectangle that
+                shares a cell with each box
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if len(self.bounds) == 0 or len(boxes) == 0:
+            return(np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+        top = self.origin + self.cellSize * np.array(self.shape)
+        #Boxes wholly outside the grid can't be near anything
+        inside = np.flatnonzero((boxes[:, 2] >= self.origin[0]) & (boxes[:, 0] <= top[0])
+                                & (boxes[:, 3] >= self.origin[1]) & (boxes[:, 1] <= top[1]))
+        owner, cells = self.expand(self.cellIndex(boxes[inside, :2]), self.cellIndex(boxes[inside, 2:]))
+        starts = self.cellStart[cells]
+        counts = self.cellStart[cells + 1] - starts
+        box = np.repeat(inside[owner], counts)
+        item = self.items[np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())]
+        #Sorting and dropping repeats is many times faster than np.unique's hashing
+        pairs = np.sort(box * len(self.bounds) + item)
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+        return(pairs // len(self.bounds), pairs % len(self.bounds))
+
+    def candidates(self, xMin, yMin, xMax, yMax):
+        """
+            The broad phase for a single query box, on plain python numbers, as numpy's
+            per-call overhead would dwarf the work for one box
+
+            @return the sorted indices of the rectangles that share a cell with the box
+        """
+        ox, oy = self.origin.tolist()
+        cw, ch = self.cellSize.tolist()
+        columns, rows = self.shape
+        if len(self.bounds) == 0 or xMax < ox or yMax < oy or xMin > ox + cw * columns or yMin > oy + ch * rows:
+            return([])
+        if self.cellLists is None:
+            starts = self.cellStart.tolist()
+            items = self.items.tolist()
+            self.cellLists = [items[starts[c]:starts[c + 1]] for c in range(columns * rows)]
+        c0 = min(max(int((xMin - ox) // cw), 0), columns - 1)
+        c1 = min(max(int((xMax - ox) // cw), 0), columns - 1)
+        r0 = min(max(int((yMin - oy) // ch), 0), rows - 1)
+        r1 = min(max(int((yMax - oy) // ch), 0), rows - 1)
+        found = set()
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                found.update(self.cellLists[r * columns + c])
+        return(sorted(found))
+
+    def firstCollisions(self, path, chunkSize=CHUNK_SIZE):
+        """
+            line2D.firstCollisions, but only clipping each boom against the rectangles
+            that share a cell with its bounding box. With DENSE_LIMIT rectangles or
+            fewer the grid saves nothing, and all of them are checked.
+
+            @param path an (N, k, 2) array
+
+            @return a length-N integer array: the index of the first rectangle some
+                boom of the config intersects, or -1 if none
+        """
+        if len(self.bounds) <= self.DENSE_LIMIT:
+            return(line2D.firstCollisions(path, self.bounds))
+        first = np.full(len(path), -1, dtype=np.intp)
+        booms = path.shape[1] - 1
+        if booms <= 0:
+            return(first)
+        for start in range(0, len(path), chunkSize):
+            chunk = path[start:start + chunkSize]
+            starts = chunk[:, :-1].reshape(-1, 2)
+            ends = chunk[:, 1:].reshape(-1, 2)
+            boxes = np.hstack((np.minimum(starts, ends), np.maximum(starts, ends)))
+            boom, rect = self.candidatePairs(boxes)
+            hits = line2D.segmentsIntersectRects(starts[boom], ends[boom], self.bounds[rect])
+            lowest = np.full(len(chunk), len(self.bounds), dtype=np.intp)
+            np.minimum.at(lowest, boom[hits] // booms, rect[hits])
+            first[start:start + len(chunk)] = np.where(lowest < len(self.bounds), lowest, -1)
+        return(first)
+
+    def collidingMask(self, path, chunkSize=CHUNK_SIZE):
+        """
+            @param path an (N, k, 2) array
+
+            @return a length-N mask, True where some boom of the config intersects
+                a rectangle (as line2D.segmentIntersectsRect)
+        """
+        return(self.firstCollisions(path, chunkSize) >= 0)
+
+    def nearest(self, point):
+        """
+            Finds the rectangle nearest a point, searching outwards a ring of cells at a
+            time and stopping once no unsearched cell could hold anything nearer
+
+            @param point (x, y)
+
+            @return (distance, index) of the nearest rectangle (distance 0 if the point
+                is inside or on it), or (inf, -1) if there are none
+        """
+        if len(self.solid) == 0:
+            return(math.inf, -1)
+        x, y = point
+        top = self.origin + self.cellSize * np.array(self.shape)
+        if not (self.origin[0] <= x <= top[0] and self.origin[1] <= y <= top[1]):
+            #Outside the grid the rings say nothing useful; check everything
+            return(self.nearestOf(point, self.solid))
+
+        column, row = self.cellIndex((x, y)).tolist()
+        step = float(self.cellSize.min())
+        best = (math.inf, -1)
+        for ring in range(max(self.shape)):
+            cells = [(c, r) for c in range(column - ring, column + ring + 1)
+                     for r in range(row - ring, row + ring + 1)
+                     if max(abs(c - column), abs(r - row)) == ring
+                     and 0 <= c < self.shape[0] and 0 <= r < self.shape[1]]
+            items = [self.items[self.cellStart[r * self.shape[0] + c]:self.cellStart[r * self.shape[0] + c + 1]]
+                     for c, r in cells]
+            if items:
+                best = min(best, self.nearestOf(point, np.concatenate(items)))
+            #Anything not yet seen is in a cell at least ring whole cells away
+            if best[0] <= ring * step:
+                break
+        return(best)
+
+    def nearestOf(self, point, indices):
+        """
+            @return (distance, index) of the nearest of the given rectangles
+        """
+        if len(indices) == 0:
+            return(math.inf, -1)
+        distances = Obstacle.nearestPoints(point, self.bounds[indices])[0]
+        best = int(np.argmin(distances))
+        return(float(distances[best]), int(indices[best]))
+
+    def nearestMany(self, points):
+        """
+            nearest for many points at once: each round looks for rectangles within a
+            radius of the points still unresolved, and doubles the radius for those
+            that had nothing that close
+
+            @param points an (P, 2) array
+
+            @return (distances, indices) length-P arrays of the distance to and index of
+                each point's nearest rectangle; inf and -1 if there are none
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        distances = np.full(len(points), np.inf)
+        indices = np.full(len(points), -1, dtype=np.intp)
+        if len(self.solid) == 0:
+            return(distances, indices)
+        left = np.arange(len(points))
+        radius = float(self.cellSize.max())
+        while len(left):
+            near = points[left]
+            point, rect = self.candidatePairs(np.hstack((near - radius, near + radius)))
+            d = Obstacle.nearestPoints(near[point], self.bounds[rect])[0]
+            found = np.full(len(left), np.inf)
+            np.minimum.at(found, point, d)
+            #The lowest index of those at that distance, as nearestOf picks
+            winners = d == found[point]
+            which = np.full(len(left), len(self.bounds), dtype=np.intp)
+            np.minimum.at(which, point[winners], rect[winners])
+            #Anything within radius overlaps the query box, so these are final
+            done = found <= radius
+            distances[left[done]] = found[done]
+            indices[left[done]] = which[done]
+            left = left[~done]
+            radius *= 2
+        return(distances, indices)
@@ -0,0 +1,132 @@
+import numpy as np
+import Obstacle
+import ObstacleGrid
+import Rectangle2D
+
+class ObstacleSet:
+    """
+        A problem's obstacles, grown by -tolerance, compiled into arrays once for
+        the whole run, in python.
+
+        The lenient bounds are stored struct-of-arrays: xMin, yMin, xMax and yMax are
+        each a contiguous length-M array (the rows of columns), and bounds is the
+        (M, 4) view of the same memory that line2D's kernels take. The corners of
+        every rectangle, their overall bounding box and an ObstacleGrid over them
+        are built at the same time, so collision and distance code never has to
+        grow an Obstacle or allocate a Rectangle2D per call.
+
+        A rectangle with a side of 2 * tolerance or less shrinks to nothing; it is
+        kept, with xMax < xMin or yMax < yMin, and never collides with anything.
+
+        Usage:
+            obstacles = ObstacleSet(ps.getObstacles(), maxError)
+            hits = line2D.segmentsIntersectRects(starts, ends, obstacles.bounds)
+
+        @author Loreith
+    """
+
+    def __init__(self, obstacles, tolerance=0.0):
+        """
+            @param obstacles a list of Obstacles (or anything with getRect() giving
+                x, y, w, h)
+
+            @param tolerance how far to shrink each one on every side, as Tester.grow
+                with -tolerance
+        """
+        rects = np.array([o.getRect() for o in obstacles], dtype=np.float64).reshape(-1, 4)
+        self.tolerance = tolerance
+        #Rows xMin, yMin, xMax, yMax; grown as x, y, w, h first, as java does, so the
+        #bounds round exactly as the java tester's do
+        columns = np.empty((4, len(rects)))
+        columns[:2] = rects[:, :2].T + tolerance
+        columns[2:] = columns[:2] + (rects[:, 2:].T - 2 * tolerance)
+        self.setColumns(columns)
+        self.grid = ObstacleGrid.ObstacleGrid(self.bounds)
+
+    def setColumns(self, columns):
+        """
+            Makes the views of the (4, M) lenient bounds, and the corners and box
+        """
+        self.columns = columns
+        self.xMin, self.yMin, self.xMax, self.yMax = self.columns
+        self.bounds = self.columns.T
+
+        #As Rectangle2D.getCorners: (xMin, yMin), (xMin, yMax), (xMax, yMin), (xMax, yMax)
+        self.corners = np.stack((self.columns[[0, 0, 2, 2]], self.columns[[1, 3, 1, 3]]), axis=-1).transpose(1, 0, 2)
+        if self.columns.shape[1]:
+            self.box = (float(self.xMin.min()), float(self.yMin.min()),
+                        float(self.xMax.max()), float(self.yMax.max()))
+        else:
+            self.box = None
+
+    def toArrays(self):
+        """
+            @return the set, grid included, as a flat dict of arrays, as the
+                ProblemCache stores it (see fromArrays)
+        """
+        arrays = {"columns": self.columns, "tolerance": np.array(self.tolerance)}
+        for name, value in self.grid.toArrays().items():
+            arrays["grid." + name] = value
+        return(arrays)
+
+    @classmethod
+    def fromArrays(cls, arrays):
+        """
+            Remakes a set saved with toArrays, without regrowing the obstacles or
+            rebuilding the grid
+
+            @param arrays the dict toArrays returned
+
+            @return an ObstacleSet
+        """
+        obstacles = cls.__new__(cls)
+        obstacles.tolerance = float(arrays["tolerance"])
+        obstacles.setColumns(np.ascontiguousarray(arrays["columns"], dtype=np.float64))
+        grid = dict((name[len("grid."):], value) for name, value in arrays.items() if name.startswith("grid."))
+        obstacles.grid = ObstacleGrid.ObstacleGrid.fromArrays(obstacles.bounds, grid)
+        return(obstacles)
+
+    def __len__(self):
+        return(len(self.xMin))
+
+    def getRectangles(self):
+        """
+            @return the lenient obstacles as a new list of Rectangle2Ds
+        """
+        return([Rectangle2D.Rectangle2D(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in self.bounds.tolist()])
+
+    def firstCollisions(self, path):
+        """
+            @param path an (N, k, 2) array
+
+            @return a length-N integer array of the index of the first obstacle each
+                config collides with, or -1 where it doesn't (see
+                ObstacleGrid.firstCollisions)
+        """
+        return(self.grid.firstCollisions(path))
+
+    def nearest(self, point):
+        """
+            @return (distance, index) of the obstacle nearest point (see
+                ObstacleGrid.nearest)
+        """
+        return(self.grid.nearest(point))
+
+    def nearestPoints(self, points):
+        """
+            Scores many points against the whole set at once
+
+            @param points an (P, 2) array of (x,y)
+
+            @return (distances, nearest, displacements, indices): for each point, the
+                distance to the nearest obstacle, the closest point (x,y) of that
+                obstacle, the vector (dx,dy) from there to the point, and the
+                obstacle's index (see Obstacle.nearestPoints); inf, nan and -1 if the
+                set is empty
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        distances, indices = self.grid.nearestMany(points)
+        nearest = np.full(points.shape, np.nan)
+        found = indices >= 0
+        nearest[found] = Obstacle.nearestPoints(points[found], self.bounds[indices[found]])[1]
+        return(distances, nearest, points - nearest, indices)
@@ -0,0 +1,200 @@
+import math
+import PathChecks
+import line2D
+import SweptCollision
+
+class OnlineValidator:
+    """
+        Validates a path one config at a time, as a planner builds it, in python.
+
+        push(cfg) checks the config and the step to it from the previous config
+        straight away, and returns the tests it failed, so a bad extension can be
+        rejected before it is added. Only running totals are kept (configs pushed,
+        cost, failures per test) - no per-config history - so memory use stays flat
+        however long the path grows.
+
+        The obstacles are shrunk by maxError once, when the validator is made. The
+        checks are done on plain floats rather than numpy arrays: for a single config
+        of a few ASVs numpy's per-call overhead would cost far more than the
+        arithmetic. Their verdicts are those of the Tester's checks (with convexity
+        as in PathChecks.convexMask).
+
+        Usage:
+            validator = OnlineValidator(tester)
+            failed = validator.push(cfg)
+            if failed:
+                ...reject cfg...
+
+        @author Loreith
+    """
+    #Obstacles above which hasCollision asks the ObstacleGrid for the nearby ones
+    GRID_THRESHOLD = 64
+
+    def __init__(self, tester, swept=False):
+        """
+            @param tester the Tester whose loaded problem, maxError and limits to use
+
+            @param swept whether to also check the motion of each step for collisions
+                (see SweptCollision), reported as the "sweep" test
+        """
+        self.tester = tester
+        self.maxError = tester.maxError
+        self.asvCount = tester.ps.getASVCount()
+        self.maxStep = tester.MAX_STEP + tester.maxError
+        self.minBoom = tester.MIN_BOOM_LENGTH - tester.maxError
+        self.maxBoom = tester.MAX_BOOM_LENGTH + tester.maxError
+        self.sinError2 = math.sin(tester.maxError) ** 2
+        self.requiredArea = PathChecks.minimumArea(tester.ps.getASVCount()) - tester.maxError
+        x, y, w, h = tester.lenientBounds
+        self.bounds = (x, y, x + w, y + h)
+
+        obstacles = tester.getObstacleSet()
+        self.grid = obstacles.grid
+        self.rectBounds = obstacles.bounds
+        #(xMin, yMin, xMax, yMax) of each lenient obstacle, as floats
+        self.rects = [tuple(b) for b in self.rectBounds.tolist()]
+        self.swept = swept
+        self.reset()
+
+    def reset(self):
+        """
+            Forgets every config pushed, to start a new path
+        """
+        self.previous = None
+        self.count = 0
+        self.cost = 0.0
+        self.failures = dict((name, 0) for name in ["steps"] + self.tester.STATE_TESTS + ["sweep"])
+
+    def push(self, cfg):
+        """
+            Checks the next config of the path and the step to it
+
+            @param cfg an ASVConfig, (k, 2) array or list of (x,y) tuples
+
+            @return the names of the tests it failed, in the order the tester runs
+                them; empty if it passed them all
+
+            @throws ValueError if cfg doesn't have one position per ASV of the problem;
+                nothing is recorded for it
+        """
+        if hasattr(cfg, "coords"):
+            cfg = cfg.coords
+        rows = cfg.tolist() if hasattr(cfg, "tolist") else list(cfg)
+        if len(rows) != self.asvCount or not all(isinstance(p, (tuple, list)) and len(p) == 2 for p in rows):
+            raise ValueError("Config must have an (x,y) position for each of the problem's "
+                             + str(self.asvCount) + " ASVs, not " + repr(rows))
+        points = [tuple(p) for p in rows]
+        failed = []
+
+        if self.previous is not None:
+            step = max(math.hypot(p[0] - q[0], p[1] - q[1]) for p, q in zip(points, self.previous))
+            self.cost += sum(math.hypot(p[0] - q[0], p[1] - q[1]) for p, q in zip(points, self.previous))
+            if step > self.maxStep:
+                failed.append("steps")
+
+        if not self.hasValidBoomLengths(points):
+            failed.append("booms")
+        if not self.isConvex(points):
+            failed.append("convexity")
+        if not self.hasEnoughArea(points):
+            failed.append("areas")
+        if not self.fitsBounds(points):
+            failed.append("bounds")
+        if self.hasCollision(points):
+            failed.append("collisions")
+        if self.swept and self.previous is not None:
+            if SweptCollision.stepCollides(self.previous, points, self.rectBounds, self.maxError):
+                failed.append("sweep")
+
+        for name in failed:
+            self.failures[name] += 1
+        self.previous = points
+        self.count += 1
+        return(failed)
+
+    def hasValidBoomLengths(self, points):
+        for p0, p1 in zip(points, points[1:]):
+            length = math.hypot(p1[0] - p0[0], p1[1] - p0[1])
+            if length < self.minBoom or length > self.maxBoom:
+                return(False)
+        return(True)
+
+    def isConvex(self, points):
+        """
+            PathChecks.convexMask for a single config
+        """
+        k = len(points)
+        edges = [(points[(i + 1) % k][0] - points[i][0], points[(i + 1) % k][1] - points[i][1]) for i in range(k)]
+        signs = set()
+        advance = 0
+        for i in range(k):
+            e0 = edges[i]
+            e1 = edges[(i + 1) % k]
+            cross = e0[0] * e1[1] - e0[1] * e1[0]
+            dot = e0[0] * e1[0] + e0[1] * e1[1]
+            straight = cross * cross <= self.sinError2 * (e0[0]**2 + e0[1]**2) * (e1[0]**2 + e1[1]**2)
+            if straight and dot < 0:
+                return(False)
+            if (dot < 0 or not straight) and cross != 0:
+                signs.add(cross > 0)
+
+            forward = (quadrant(e1) - quadrant(e0)) % 4
+            if cross > 0:
+                advance += forward
+            elif cross < 0 and forward != 0:
+                advance += forward - 4
+        return(len(signs) < 2 and abs(advance) // 4 < 2)
+
+    def hasEnoughArea(self, points):
+        k = len(points)
+        total = sum(points[i][0] * (points[(i + 1) % k][1] - points[i - 1][1]) for i in range(k))
+        return(abs(total) / 2 >= self.requiredArea)
+
+    def fitsBounds(self, points):
+        xMin, yMin, xMax, yMax = self.bounds
+        return(all(xMin <= x < xMax and yMin <= y < yMax for x, y in points))
+
+    def hasCollision(self, points):
+        """
+            Tester.hasLenientCollision, but only clipping booms against the obstacles
+            that overlap the config's bounding box (looked up in the ObstacleGrid once
+            there are enough obstacles for that to beat checking them all)
+        """
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        xLow, xHigh, yLow, yHigh = min(xs), max(xs), min(ys), max(ys)
+        rects = self.rects
+        if len(rects) > self.GRID_THRESHOLD:
+            rects = [rects[i] for i in self.grid.candidates(xLow, yLow, xHigh, yHigh)]
+        for r in rects:
+            if xHigh >= r[0] and xLow <= r[2] and yHigh >= r[1] and yLow <= r[3]:
+                for p0, p1 in zip(points, points[1:]):
+                    if line2D.segmentIntersectsRect(p0[0], p0[1], p1[0], p1[1], *r):
+                        return(True)
+        return(False)
+
+    def getCount(self):
+        return(self.count)
+
+    def getCost(self):
+        return(self.cost)
+
+    def getFailures(self):
+        return(dict(self.failures)) #New object
+
+    def isValid(self):
+        """
+            @return whether every config and step pushed so far passed
+        """
+        return(not any(self.failures.values()))
+
+def quadrant(vector):
+    """
+        PathChecks.quadrants for a single vector
+    """
+    dx, dy = vector
+    if dx == 0 and dy == 0:
+        return(0)
+    if dy >= 0:
+        return(0 if dx > 0 else 1)
+    return(2 if dx < 0 else 3)
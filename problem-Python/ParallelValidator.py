@@ -0,0 +1,131 @@
+"""
+    Validation of a single large solution across a pool of processes, in python.
+
+    The path is copied once into a multiprocessing.shared_memory block, which every
+    worker maps as an (N, k, 2) array when it starts; the workers also get the
+    problem once, at start up. A task is then just a (start, end) range of path
+    indices, so no coordinates are pickled per task. Each worker runs a
+    FusedValidator over its range, starting one config early so the step across
+    the boundary is checked, and sends back only its failing indices and cost.
+    The parent merges those in path order, so the report is exactly the one
+    Tester.testAll prints.
+
+    Usage:
+        failures = ParallelValidator.validate(tester, verbose, workers=32)
+
+    @author Loreith
+"""
+
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+import FusedValidator
+import ProblemSpec
+
+#Smallest range of configs given to a worker, so tiny paths aren't split needlessly
+MIN_TASK_SIZE = 16384
+#Tasks per worker; more than one evens out ranges that take longer (e.g. near obstacles)
+TASKS_PER_WORKER = 4
+
+#Set in each worker by initWorker
+workerTester = None
+workerPath = None
+workerMemory = None
+
+def initWorker(memoryName, shape, maxError, problem):
+    """
+        Runs once in each worker: maps the shared path and rebuilds the problem
+
+        @param problem (asvCount, initialState, goalState, obstacles)
+    """
+    #Tester runs this module for testAllParallel, so is only imported in the workers
+    import Tester
+    global workerTester, workerPath, workerMemory
+    #Workers share the parent's resource tracker, so the block is still unlinked
+    #exactly once, by the parent
+    workerMemory = shared_memory.SharedMemory(name=memoryName)
+    workerPath = np.ndarray(shape, dtype=np.float64, buffer=workerMemory.buf)
+    workerPath.flags.writeable = False
+
+    workerTester = Tester.Tester(maxError)
+    ps = workerTester.ps
+    ps.asvCount, ps.initialState, ps.goalState, ps.obstacles = problem
+    ps.problemLoaded = True
+
+def checkRange(task):
+    """
+        Runs in a worker: validates configs start to end of the shared path
+
+        @param task (start, end)
+
+        @return the FusedValidator's results for the range
+    """
+    start, end = task
+    validator = FusedValidator.FusedValidator(workerTester)
+    validator.startAt(start, workerPath[start - 1] if start > 0 else None)
+    validator.validate(ProblemSpec.PathArray.fromArray(workerPath[start:end]))
+    return(validator.getResults())
+
+def splitRanges(length, workers, minSize=MIN_TASK_SIZE):
+    """
+        @return (start, end) ranges covering 0 to length, in order, about
+            TASKS_PER_WORKER per worker but none shorter than minSize
+    """
+    tasks = max(1, min(workers * TASKS_PER_WORKER, length // minSize))
+    bounds = np.linspace(0, length, tasks + 1).astype(int).tolist()
+    return(list(zip(bounds[:-1], bounds[1:])))
+
+def validatePath(tester, workers=None):
+    """
+        Checks the tester's loaded solution on a pool of processes
+
+        @param tester the Tester, with its problem and solution loaded
+
+        @param workers the number of processes, by default one per CPU
+
+        @return a FusedValidator holding the merged verdicts for the whole path
+    """
+    ps = tester.ps
+    path = ps.getPath().data
+    workers = workers or os.cpu_count() or 1
+    ranges = splitRanges(len(path), workers)
+
+    merged = FusedValidator.FusedValidator(tester)
+    if len(ranges) == 1 or workers == 1:
+        merged.validate(ps.getPath())
+        return(merged)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(path.nbytes, 1))
+    try:
+        shared = np.ndarray(path.shape, dtype=np.float64, buffer=memory.buf)
+        shared[:] = path
+        problem = (ps.asvCount, ps.initialState, ps.goalState, ps.obstacles)
+        with multiprocessing.Pool(min(workers, len(ranges)), initWorker,
+                                  (memory.name, path.shape, tester.maxError, problem)) as pool:
+            for results in pool.imap(checkRange, ranges):
+                merged.merge(results)
+        del shared
+    finally:
+        memory.close()
+        memory.unlink()
+    return(merged)
+
+def validate(tester, verbose, workers=None, firstTestNo=1, solutionTests=True):
+    """
+        Runs every test against the tester's loaded solution on a pool of processes,
+        printing the same reports as Tester.testAll
+
+        @param tester the Tester, with its problem and solution loaded
+
+        @param verbose whether to output more information about the tests on failure
+
+        @param workers the number of processes, by default one per CPU
+
+        @param firstTestNo the number of the first test printed
+
+        @param solutionTests whether to include the initial, goal, steps and cost tests
+
+        @return the number of tests that failed
+    """
+    return(validatePath(tester, workers).report(verbose, firstTestNo, solutionTests=solutionTests))
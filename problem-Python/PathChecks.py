@@ -0,0 +1,145 @@
+"""
+    Whole-path versions of the Tester's per-config checks, in python.
+
+    Each check takes an (N, k, 2) path array and returns a length-N boolean mask,
+    True where the config passes, computing every config at once with numpy instead
+    of looping in python. Paths are processed CHUNK_SIZE configs at a time so the
+    temporaries stay small however long the path is.
+
+    The results agree with the scalar Tester methods to within rounding, far below
+    maxError.
+
+    @author Loreith
+"""
+
+import math
+import numpy as np
+
+#Configs processed together; bounds the size of the temporary arrays
+CHUNK_SIZE = 65536
+
+def inChunks(check, path, chunkSize, *args):
+    """
+        Runs check over path chunkSize configs at a time and joins the masks
+
+        @param check a function (chunk, *args) -> boolean mask for the chunk
+    """
+    if len(path) <= chunkSize:
+        return(check(path, *args))
+    mask = np.empty(len(path), dtype=bool)
+    for start in range(0, len(path), chunkSize):
+        mask[start:start + chunkSize] = check(path[start:start + chunkSize], *args)
+    return(mask)
+
+def minimumArea(asvCount):
+    """
+        @return the minimum area required for the given number of ASVs, as
+            Tester.getMinimumArea
+    """
+    radius = 0.007 * (asvCount - 1)
+    return(math.pi * radius**2)
+
+def boomLengths(path):
+    """
+        @return an (N, k-1) array of the length of every boom in every config
+    """
+    d = np.diff(path, axis=1)
+    return(np.hypot(d[..., 0], d[..., 1]))
+
+def validBoomMask(path, minLength, maxLength, maxError, chunkSize=CHUNK_SIZE):
+    """
+        @param path an (N, k, 2) array
+
+        @return a mask of the configs whose booms are all within
+            [minLength - maxError, maxLength + maxError]
+    """
+    def check(chunk):
+        lengths = boomLengths(chunk)
+        return(((lengths >= minLength - maxError) & (lengths <= maxLength + maxError)).all(axis=1))
+    return(inChunks(check, path, chunkSize))
+
+def areas(path):
+    """
+        @return an (N,) array of the area of every config, by the shoelace formula
+    """
+    x = path[..., 0]
+    y = path[..., 1]
+    total = (x * (np.roll(y, -1, axis=1) - np.roll(y, 1, axis=1))).sum(axis=1)
+    return(np.abs(total) / 2)
+
+def enoughAreaMask(path, maxError, chunkSize=CHUNK_SIZE):
+    """
+        @param path an (N, k, 2) array
+
+        @return a mask of the configs with at least the minimum area for k ASVs
+    """
+    required = minimumArea(path.shape[1]) - maxError
+    return(inChunks(lambda chunk: areas(chunk) >= required, path, chunkSize))
+
+def fitsBoundsMask(path, bounds, chunkSize=CHUNK_SIZE):
+    """
+        @param path an (N, k, 2) array
+
+        @param bounds the (x, y, w, h) rectangle, already grown by maxError
+
+        @return a mask of the configs with every ASV inside bounds
+    """
+    low = np.array(bounds[:2], dtype=np.float64)
+    high = low + np.array(bounds[2:], dtype=np.float64)
+    def check(chunk):
+        return(((chunk >= low) & (chunk < high)).all(axis=(1, 2)))
+    return(inChunks(check, path, chunkSize))
+
+def quadrants(vectors):
+    """
+        @return the quadrant (0-3, counter-clockwise from +x) each direction lies in,
+            from the signs of its components alone; each quadrant is half-open so
+            equal directions always share a quadrant
+    """
+    dx = vectors[..., 0]
+    dy = vectors[..., 1]
+    return(np.where(dy >= 0, np.where(dx > 0, 0, 1), np.where(dx < 0, 2, 3)) * ((dx != 0) | (dy != 0)))
+
+def convexMask(path, maxError, chunkSize=CHUNK_SIZE):
+    """
+        The Tester.isConvex test without any angles. At each vertex the turn from one
+        edge to the next is read off the cross product of the edges (its sign) and
+        their dot product, and:
+
+        - a turn within maxError of pi (edges pointing straight back) fails, where
+          isConvex only catches a turn of exactly pi, which rounding often hides,
+        - turns larger than maxError must all be in the same direction - a turn is
+          within maxError of 0 or pi when cross^2 <= sin^2(maxError) |e0|^2 |e1|^2,
+          and the sign of dot says which,
+        - the edges' direction must go round only once. isConvex adds up the turning
+          angles and fails above 3 pi; here the number of quadrant boundaries the
+          direction crosses at each turn is counted instead, which totals 4 per full
+          revolution, and two or more revolutions fail.
+
+        This agrees with isConvex except for configs with coincident ASVs, which fail
+        the boom test anyway.
+
+        @param path an (N, k, 2) array
+
+        @return a mask of the configs that are convex
+    """
+    sinError2 = math.sin(maxError) ** 2
+    def check(chunk):
+        edges = np.roll(chunk, -1, axis=1) - chunk #edges[i] runs from ASV i to i+1, wrapping round
+        nextEdges = np.roll(edges, -1, axis=1)
+        cross = edges[..., 0] * nextEdges[..., 1] - edges[..., 1] * nextEdges[..., 0]
+        dot = (edges * nextEdges).sum(axis=2)
+
+        lengths2 = (edges * edges).sum(axis=2)
+        straight = cross * cross <= sinError2 * lengths2 * np.roll(lengths2, -1, axis=1)
+        reversal = (straight & (dot < 0)).any(axis=1)
+        significant = (dot < 0) | ~straight
+        mixed = ((significant & (cross > 0)).any(axis=1)) & ((significant & (cross < 0)).any(axis=1))
+
+        q = quadrants(edges)
+        forward = (np.roll(q, -1, axis=1) - q) % 4
+        #Quadrant boundaries crossed at each turn, counted in the direction of the turn
+        advance = np.where(cross > 0, forward, np.where((cross < 0) & (forward != 0), forward - 4, 0))
+        revolutions = np.abs(advance.sum(axis=1)) // 4
+        return(~reversal & ~mixed & (revolutions < 2))
+    return(inChunks(check, path, chunkSize))
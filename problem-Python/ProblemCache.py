@@ -0,0 +1,221 @@
+"""
+    On-disk cache of parsed problem files, in python.
+
+    Each problem file is keyed by the SHA-256 of its contents, so editing the file
+    changes the key and the stale entry is simply never looked up again. An entry
+    holds the parsed problem (ASV count, initial and goal states, obstacles) and a
+    dict of derived data - anything expensive that is built from the problem alone,
+    such as grown obstacle rectangles, registered through getDerived.
+
+    Entries live in $ASV_CACHE_DIR, or ~/.cache/asv-problems if that isn't set, as
+    .npz files read with allow_pickle=False: only plain arrays, plus a small JSON
+    header (the "header" array, as UTF-8 bytes) naming what they are. Derived data
+    is saved through its class's toArrays and remade with its fromArrays, so
+    loading an entry never runs code from the file. The directory is created
+    readable by its owner only, and one writable by anyone else is not used at all.
+
+    A missing, unreadable or outdated entry is rebuilt, never an error. An entry is
+    outdated if it was written with another VERSION, or by other source for the
+    modules whose arrays it stores (SCHEMA), so changing how they are laid out
+    can't load stale arrays even if nobody remembers to bump VERSION.
+
+    @author Loreith
+"""
+
+import hashlib
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import numpy as np
+import ASVconfig
+import Obstacle
+
+CACHE_DIR = os.environ.get("ASV_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "asv-problems"))
+#Bump when the layout of an entry (or of the arrays derived data saves) changes
+VERSION = 3
+#Modules whose arrays end up in entries, directly or as derived data
+SCHEMA_MODULES = ("ProblemCache", "ObstacleSet", "ObstacleGrid", "DistanceField")
+#Entries already read by this process, by key
+entries = {}
+#Whether an unsafe CACHE_DIR has been reported yet
+warned = False
+
+def schemaHash():
+    """
+        @return the hex SHA-256 of the source of SCHEMA_MODULES
+    """
+    digest = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in SCHEMA_MODULES:
+        try:
+            with open(os.path.join(base, name + ".py"), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(name.encode())
+    return(digest.hexdigest())
+
+SCHEMA = schemaHash()
+
+def contentKey(data):
+    """
+        @param data the bytes of a file
+
+        @return their hex SHA-256
+    """
+    return(hashlib.sha256(data).hexdigest())
+
+def entryPath(key):
+    return(os.path.join(CACHE_DIR, key + ".npz"))
+
+def isSafe(directory):
+    """
+        @return whether directory is one only its owner, this user, can write to, and
+            so one whose entries can be trusted
+    """
+    try:
+        info = os.stat(directory)
+    except OSError:
+        return(False)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        return(False)
+    return(stat.S_ISDIR(info.st_mode) and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+def usable():
+    """
+        Creates CACHE_DIR, private to this user, if it doesn't exist
+
+        @return whether the cache can be used; if CACHE_DIR is writable by others it
+            isn't, and that is reported once
+    """
+    global warned
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+    except OSError:
+        return(False)
+    if isSafe(CACHE_DIR):
+        return(True)
+    if not warned:
+        warned = True
+        print("Not using the problem cache: " + CACHE_DIR + " is writable by other users.", file=sys.stderr)
+    return(False)
+
+def readEntry(key):
+    """
+        @return the cached entry for key, or None if there is no usable one
+    """
+    if key in entries:
+        return(entries[key])
+    if not usable():
+        return(None)
+    try:
+        with np.load(entryPath(key), allow_pickle=False) as data:
+            arrays = dict((name, data[name]) for name in data.files)
+        header = json.loads(arrays.pop("header").tobytes().decode("utf-8"))
+    except Exception:
+        return(None)
+    if not isinstance(header, dict) or header.get("version") != VERSION or header.get("schema") != SCHEMA:
+        return(None)
+    try:
+        entry = {"asvCount": int(header["asvCount"]), "initialState": arrays["initialState"],
+                 "goalState": arrays["goalState"], "obstacles": arrays["obstacles"].reshape(-1, 4), "derived": {}}
+        for i, name in enumerate(header["derived"]):
+            prefix = "derived%d." % i
+            entry["derived"][name] = dict((field[len(prefix):], value) for field, value in arrays.items()
+                                          if field.startswith(prefix))
+    except (KeyError, TypeError, ValueError):
+        return(None)
+    entries[key] = entry
+    return(entry)
+
+def writeEntry(key, entry):
+    """
+        Writes an entry atomically, so concurrent runs never see half an entry.
+        Failing to write (e.g. a read-only home directory) only costs the speedup.
+    """
+    entries[key] = entry
+    if not usable():
+        return
+    names = list(entry["derived"])
+    header = {"version": VERSION, "schema": SCHEMA, "asvCount": entry["asvCount"], "derived": names}
+    arrays = {"header": np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+              "initialState": entry["initialState"], "goalState": entry["goalState"],
+              "obstacles": entry["obstacles"]}
+    for i, name in enumerate(names):
+        for field, value in entry["derived"][name].items():
+            arrays["derived%d.%s" % (i, field)] = value
+    try:
+        handle, tmpName = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(handle, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmpName, entryPath(key))
+    except OSError:
+        pass
+
+def loadProblem(ps, filename):
+    """
+        Fills in the problem part of a ProblemSpec from the cache, parsing the file
+        (and caching the result) only if it hasn't been seen with these contents
+
+        @param ps the ProblemSpec to load into
+
+        @param filename the problem file
+
+        @throws IOError as ProblemSpec.loadProblem does, on a cache miss
+    """
+    #The bytes hashed are the bytes parsed, so a file changed in between can't be
+    #cached under the old contents' key
+    with open(filename, 'rb') as f:
+        data = f.read()
+    key = contentKey(data)
+    entry = readEntry(key)
+    if entry is None:
+        #Decoded as ProblemSpec.loadProblem's text mode open would
+        ps.loadProblemText(io.TextIOWrapper(io.BytesIO(data)).read())
+        entry = {"asvCount": ps.asvCount, "initialState": ps.initialState.coords,
+                 "goalState": ps.goalState.coords,
+                 "obstacles": np.array([o.getRect() for o in ps.obstacles], dtype=np.float64).reshape(-1, 4),
+                 "derived": {}}
+        writeEntry(key, entry)
+    else:
+        ps.problemLoaded = False
+        ps.solutionLoaded = False
+        ps.asvCount = entry["asvCount"]
+        ps.initialState = ASVconfig.ASVConfig(entry["initialState"])
+        ps.goalState = ASVconfig.ASVConfig(entry["goalState"])
+        ps.obstacles = [Obstacle.Obstacle(*r) for r in entry["obstacles"].tolist()]
+        ps.problemLoaded = True
+    ps.cacheKey = key
+
+def getDerived(ps, name, kind, build):
+    """
+        Returns data derived from the problem, building and caching it the first time
+
+        @param ps a ProblemSpec; if it wasn't loaded through the cache, build is just called
+
+        @param name a unique name for the data, including any parameters it depends on
+
+        @param kind the class of the data, which saves it with toArrays() and remakes
+            it with kind.fromArrays(arrays)
+
+        @param build a function of no arguments that builds the data
+
+        @return the cached or freshly built data
+    """
+    key = getattr(ps, "cacheKey", None)
+    if key is None:
+        return(build())
+    entry = readEntry(key)
+    if entry is not None and name in entry["derived"]:
+        try:
+            return(kind.fromArrays(entry["derived"][name]))
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    value = build()
+    if entry is not None:
+        entry["derived"][name] = value.toArrays()
+        writeEntry(key, entry)
+    return(value)
@@ -1,5 +1,256 @@
+import itertools
+import numpy as np
 import ASVconfig
-import obstacle
+import BulkParser
+import Obstacle
+import ProblemCache
+import SolutionFormat
+
+def spliceBuffer(buffer, length, start, end, values):
+    """
+        Replaces buffer[start:end] with values, where only buffer[:length] is in use.
+        The buffer is grown by doubling when it runs out of room (or copied if it is
+        read-only), so appends cost time proportional to what is appended; edits in
+        the middle only move the tail when their length changes.
+
+        @param buffer the array whose first axis is being edited
+
+        @param length the number of rows of buffer in use
+
+        @param values the rows to put in place of buffer[start:end]
+
+        @return (buffer, length) after the edit; buffer may be a new array
+    """
+    newLength = length - (end - start) + len(values)
+    if newLength > buffer.shape[0] or not buffer.flags.writeable:
+        grown = np.empty((max(newLength, 2 * buffer.shape[0]),) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:start] = buffer[:start]
+        grown[start + len(values):newLength] = buffer[end:length]
+        buffer = grown
+    elif len(values) != end - start:
+        buffer[start + len(values):newLength] = buffer[end:length] #numpy copes with the overlap
+    buffer[start:start + len(values)] = values
+    return(buffer, newLength)
+
+class PathArray:
+    """
+        Holds a whole solution path as a single (N, k, 2) float64 array, in python,
+        rather than a list of N separate ASVConfigs. Step distances and costs are
+        computed over the whole path at once.
+
+        Indexing with an int gives an ASVConfig sharing memory with the path,
+        indexing with a slice gives a PathArray view.
+
+        @author Loreith
+    """
+
+    def __init__(self, configs):
+        """
+            @param configs either another PathArray, an (N, k, 2) or (N, 2k) array,
+                or a list of ASVConfigs / lists of (x,y) tuples / space-separated strings
+        """
+        if isinstance(configs, PathArray):
+            data = configs.data
+        elif isinstance(configs, np.ndarray):
+            data = configs
+        else:
+            data = [ASVconfig.ASVConfig(c).coords for c in configs]
+
+        data = np.array(data, dtype=np.float64)
+        if data.ndim == 2:
+            data = data.reshape(data.shape[0], -1, 2)
+        elif data.size == 0:
+            data = data.reshape(0, 0, 2)
+        if data.ndim != 3 or data.shape[2] != 2:
+            raise ValueError("Path must have shape (N, k, 2), not " + str(data.shape))
+
+        self.data = data
+        self.buffer = data #data is always buffer[:len(self)]; splice leaves spare rows at the end
+
+    @classmethod
+    def fromArray(cls, array):
+        """
+            Wraps an existing (N, k, 2) float64 array without copying it, e.g. a
+            memory-mapped binary solution
+
+            @param array the (N, k, 2) float64 array
+
+            @return a PathArray sharing memory with array
+        """
+        path = cls.__new__(cls)
+        path.data = array
+        path.buffer = array
+        return(path)
+
+    def __len__(self):
+        return(self.data.shape[0])
+
+    def __getitem__(self, index):
+        """
+            @return an ASVConfig for an int index, or a PathArray view for a slice
+        """
+        if isinstance(index, slice):
+            return(PathArray.fromArray(self.data[index]))
+        return(ASVconfig.ASVConfig.fromArray(self.data[index]))
+
+    def __iter__(self):
+        for row in self.data:
+            yield ASVconfig.ASVConfig.fromArray(row)
+
+    def getASVCount(self):
+        return(self.data.shape[1])
+
+    def splice(self, start, end, configs):
+        """
+            Replaces configs start..end-1 with the given configs, in place. Appending
+            (start == end == len(self)) is amortised O(len(configs)).
+
+            Slices taken earlier may keep pointing at the old contents.
+
+            @param configs anything the constructor accepts, possibly empty
+        """
+        values = PathArray(configs).data
+        if len(values) == 0:
+            values = values.reshape(0, self.data.shape[1], 2)
+        elif len(self.buffer) == 0:
+            self.buffer = np.empty((0,) + values.shape[1:])
+        self.buffer, length = spliceBuffer(self.buffer, len(self), start, end, values)
+        self.data = self.buffer[:length]
+
+    def getArray(self):
+        """
+            @return a read-only (N, k, 2) view of the path, without copying
+        """
+        view = self.data.view()
+        view.flags.writeable = False
+        return(view)
+
+    def stepDistances(self):
+        """
+            Returns the straight-line distance moved by every ASV on every step
+
+            @return an (N-1, k) array, row i being the step from config i to i+1
+        """
+        d = np.diff(self.data, axis=0)
+        return(np.hypot(d[..., 0], d[..., 1]))
+
+    def maxDisplacements(self):
+        """
+            @return an (N-1,) array of the largest distance any ASV moves on each step
+        """
+        return(self.stepDistances().max(axis=1, initial=0.0))
+
+    def stepCosts(self):
+        """
+            @return an (N-1,) array of the total distance moved by all ASVs on each step
+        """
+        return(self.stepDistances().sum(axis=1))
+
+    def totalCost(self):
+        """
+            @return the total distance moved by all ASVs over the whole path
+        """
+        return(float(self.stepCosts().sum()))
+
+class SolutionStream:
+    """
+        A solution file read a config or a chunk of configs at a time, in python.
+        The header is read when the stream is made; iterating reads the rest, once.
+        Binary solution files (see SolutionFormat) are sliced straight from the
+        memory map.
+
+        Usage:
+            with ps.iterSolution(filename, chunkSize) as stream:
+                for chunk in stream:
+                    ...
+            cost = stream.cost
+
+        @author Loreith
+    """
+
+    def __init__(self, filename, chunkSize=None, asvCount=None):
+        """
+            @param filename the solution file to read
+
+            @param chunkSize None to yield one ASVConfig per line, or the number of
+                configs to yield together as each PathArray chunk
+
+            @param asvCount the number of ASVs in each config, or None to trust the
+                first config of a text file
+
+            @throws IOError if the file is missing or its header is malformed
+        """
+        self.chunkSize = chunkSize
+        self.asvCount = asvCount
+        self.array = None
+        self.inputFile = None
+        if SolutionFormat.isBinary(filename):
+            self.array, self.cost = SolutionFormat.readBinary(filename, asvCount)
+            #The number of configs the header promises
+            self.length = self.array.shape[0]
+            return
+
+        self.inputFile = SolutionFormat.openText(filename)
+        try:
+            line = self.inputFile.readline().split()
+            self.length = int(line[0]) + 1 #The header counts steps, not configs
+            self.cost = float(line[1])
+        except (IndexError, ValueError):
+            self.close()
+            raise IOError("Invalid solution header on line 1")
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *exc):
+        self.close()
+        return(False)
+
+    def close(self):
+        """
+            Closes the file; the stream yields nothing more
+        """
+        if self.inputFile is not None:
+            self.inputFile.close()
+        self.inputFile = None
+        self.array = None
+
+    def __iter__(self):
+        """
+            @throws IOError if the file ends early or a line is malformed
+        """
+        chunkSize = self.chunkSize
+        if self.array is not None:
+            array = self.array
+            for start in range(0, array.shape[0], chunkSize or 1):
+                if chunkSize is None:
+                    yield ASVconfig.ASVConfig.fromArray(array[start])
+                else:
+                    yield PathArray.fromArray(array[start:start + chunkSize])
+            return
+        if self.inputFile is None:
+            return
+
+        try:
+            lineNo = 1
+            width = self.asvCount * 2 if self.asvCount is not None else None
+            remaining = self.length
+            while remaining > 0:
+                lines = list(itertools.islice(self.inputFile, min(remaining, chunkSize or 1)))
+                if not lines:
+                    raise IOError("Line " + str(lineNo + 1) + " expected, but file ended.")
+                if width is None:
+                    width = len(lines[0].split()) #No problem to say, so trust the first config
+                chunk = BulkParser.parseLines(lines, width, lineNo + 1).reshape(len(lines), -1, 2)
+                lineNo += len(lines)
+                remaining -= len(lines)
+
+                if chunkSize is None:
+                    yield ASVconfig.ASVConfig.fromArray(chunk[0])
+                else:
+                    yield PathArray(chunk)
+        finally:
+            self.close()
 
 class ProblemSpec:
     """
@@ -26,53 +277,61 @@ class ProblemSpec:
         self.goalState = None
         self.obstacles = []
 
-        self.path = []
+        self.path = PathArray([])
         self.solutionCost = 0
-
-    def loadProblem(self, filename):
+        #Key of this problem in ProblemCache, if it was loaded through the cache
+        self.cacheKey = None
+
+        #Cost of each step of self.path, kept up to date by the edit methods, and its
+        #prefix sums: costPrefix[i] is the cost from config 0 to config i, valid for
+        #i <= prefixValid. None until first needed after the path is replaced.
+        self.stepCosts = None
+        self.pathCost = 0.0
+        self.costPrefix = None
+        self.prefixValid = 0
+
+    def loadProblem(self, filename, useCache=False):
         """
-            Loads a problem from a text file
+            Loads a problem from a text file, parsing all of its numbers in bulk
+            (see BulkParser)
 
             @param filename the path of the file to load
 
+            @param useCache reuse the parsed problem from the on-disk cache if this file
+                has been loaded before with the same contents (see ProblemCache)
+
             @throws IOError if the text file doesn't exist or meet specifications
         """
-        self.problemLoaded = False
-        self.solutionLoaded = False
-        inputData = open(filename, 'r').read().split('\n')
-
-        i = 0
-
-        try:
-            self.asvCount = inputData[i]
-            i += 1
+        if useCache:
+            ProblemCache.loadProblem(self, filename)
+            return(None)
 
-            self.initialState = ASVconfig.ASVConfig(inputData[i])
-            i += 1
+        with open(filename, 'r') as inputFile:
+            self.loadProblemText(inputFile.read())
 
-            self.goalState = ASVconfig.ASVConfig(inputData[i])
-            i += 1
+    def loadProblemText(self, text):
+        """
+            Loads a problem from the contents of a problem file
 
-            numObstacles = inputData[i]
-            i += 1
+            @param text the whole file, as loadProblem reads it
 
-            self.obstacles = [None] * numObstacles
-            for _ in range(numObstacles):
-                self.obstacles[_] = obstacle.Obstacle().construct(inputData[i]) #TODO: Swap the contructors
-                i += 1
+            @throws IOError if the text doesn't meet specifications
+        """
+        self.problemLoaded = False
+        self.solutionLoaded = False
+        self.cacheKey = None
+        self.asvCount, initial, goal, rects = BulkParser.parseProblem(text)
+        self.initialState = ASVconfig.ASVConfig(initial)
+        self.goalState = ASVconfig.ASVConfig(goal)
+        self.obstacles = [Obstacle.Obstacle(*r) for r in rects.tolist()]
 
-            self.problemLoaded = True
-        except IndexError:
-            print("Index out of range in input " + i )
-            raise IOError("Index out of range in input " + i)
-        except IOError:
-            print("Input file not found")
-            raise IOError("Input file not found")
-        #TODO: Input varification error
+        self.problemLoaded = True
 
     def loadSolution(self, filename):
         """
-            Loads a solution from a solution text file.
+            Loads a solution from a solution text file, or memory-maps a binary
+            solution file (see SolutionFormat); the format, and whether text is gzip or
+            lzma compressed, is detected from the contents.
 
             @param filename the path of the text file to loadSolution
 
@@ -82,49 +341,71 @@ class ProblemSpec:
             return(None)
 
         self.solutionLoaded = False
-        inputData = open(filename, 'r').read().split('\n')
+        if SolutionFormat.isBinary(filename):
+            array, self.solutionCost = SolutionFormat.readBinary(filename, self.asvCount)
+            self.path = PathArray.fromArray(array)
+            self.stepCosts = None
+            self.solutionLoaded = True
+            return(None)
 
-        i = 0
-        line = ""
+        with SolutionFormat.openText(filename) as inputFile:
+            text = inputFile.read()
 
-        try:
-            line = inputData[i].split(' ')
-            i += 1
-            pathLength = line[0]
-            self.solutionCost = line[1]
+        _, self.solutionCost, array = BulkParser.parseSolution(text, self.asvCount)
+        self.path = PathArray.fromArray(array)
+        self.stepCosts = None
+        self.solutionLoaded = True
+
+    def iterSolution(self, filename, chunkSize=None):
+        """
+            Reads a solution file lazily instead of materialising the whole path, so
+            only one config (or one chunk) is held in memory at a time (see
+            SolutionStream). The header is read straight away; its cost and length are
+            attributes of the stream, not of this ProblemSpec.
 
-            self.path = [None]*pathLength
-            for it in range(pathLength):
-                self.path[it] = ASVconfig.ASVConfig(inputData[i])
-                i += 1
+            Does not touch self.path, solutionCost or solutionLoaded.
 
-            self.solutionLoaded = True
+            @param filename the path of the solution file to read
 
-        except IndexError:
-            print("Index out of range in solution loading")
-            raise IOError("Index out of range in solution loading")
-        except IOError:
-            print("Solution file not found")
-            raise IOError("Solution file not found")
-        #TODO: Input varificaiton error.
+            @param chunkSize None to yield one ASVConfig per line, or the number of
+                configs to yield together as each PathArray chunk
 
-    def saveSolution(self, filename):
+            @return a SolutionStream over the file
+
+            @throws IOError if the file is missing or its header is malformed
+        """
+        return(SolutionStream(filename, chunkSize, self.asvCount if self.problemLoaded else None))
+
+    def saveSolution(self, filename, binary=False, precision=None, compression="auto"):
         """
-            Saves the current solution to a text file
+            Saves the current solution to a text file, a chunk of configs per write
+            (see SolutionWriter)
 
             @param filename the path of the text file to save to
 
+            @param binary write the binary format (see SolutionFormat) instead of text
+
+            @param precision the number of decimal places written for each coordinate,
+                by default SolutionWriter.DEFAULT_PRECISION
+
+            @param compression None, "gzip", "lzma", or "auto" to go by the extension
+
             No need for Exception here, we should overwrite if there exists a text file
         """
         if (not self.problemLoaded or not self.solutionLoaded):
             return(None)
 
-        outputFile = open(filename, 'w+')
+        if binary:
+            SolutionFormat.writeBinary(filename, self.path, self.solutionCost)
+            return(None)
 
-        outputFile.write(len(self.path) + " " + self.solutionCost + '\n') #If you are on windows this will need to be \r\n but moss and unix will need \n only. \r\n will display as two line breaks
-        for i in self.path:
-            outputFile.write(str(i) + '\n')
-        outputFile.close()
+        #SolutionWriter builds on PathArray, so is only imported here
+        import SolutionWriter
+        if precision is None:
+            precision = SolutionWriter.DEFAULT_PRECISION
+        #Always \n: moss and unix need \n only, and \r\n would display as two line breaks
+        SolutionWriter.writeSolution(filename, self.path, self.solutionCost, len(self.path) - 1,
+                                     precision=precision, compression=compression)
 
     def calculateTotalCost(self):
         """
@@ -132,14 +413,95 @@ class ProblemSpec:
 
             @return The true total cost of the currently loaded solution
         """
-        cost = 0
-        c0 = ASVconfig.ASVConfig(self.path[0])
-        for i in range(1, len(self.path)):
-            c1 = ASVconfig.ASVConfig(self.path[i])
-            cost += c0.totalDistance(c1)
-            c0 = c1
+        if self.stepCosts is None:
+            self.rebuildCosts()
+        return(self.pathCost)
 
-        return cost
+    def rebuildCosts(self):
+        """
+            Recomputes the per-step costs of the whole path from scratch
+        """
+        self.stepCosts = self.path.stepCosts()
+        self.pathCost = float(self.stepCosts.sum())
+        self.costPrefix = np.zeros(max(len(self.path), 1))
+        self.prefixValid = 0
+
+    def costBetween(self, i, j):
+        """
+            Returns the cost of the sub-path from config i to config j, in O(1) from the
+            prefix sums. After an edit, the first query past the edit point extends the
+            prefix sums from there in one vectorised pass.
+
+            @param i the index of the first config
+
+            @param j the index of the last config, i <= j
+
+            @return the total distance moved by all ASVs between configs i and j
+        """
+        if self.stepCosts is None:
+            self.rebuildCosts()
+        if j > self.prefixValid:
+            v = self.prefixValid
+            steps = self.stepCosts[:len(self.path) - 1]
+            if len(self.costPrefix) < len(self.path):
+                grown = np.empty(max(len(self.path), 2 * len(self.costPrefix)))
+                grown[:v + 1] = self.costPrefix[:v + 1]
+                self.costPrefix = grown
+            self.costPrefix[v + 1:len(self.path)] = self.costPrefix[v] + np.cumsum(steps[v:])
+            self.prefixValid = len(self.path) - 1
+        return(float(self.costPrefix[j] - self.costPrefix[i]))
+
+    def splicePath(self, start, end, configs):
+        """
+            Replaces configs start..end-1 of the path with the given configs and updates
+            the solution cost. Only the steps touching the edit are recomputed, so the
+            cost update takes time proportional to the edit.
+
+            @param start the index of the first config to replace
+
+            @param end one past the index of the last config to replace (start to insert)
+
+            @param configs a PathArray, (m, k, 2) array or list of ASVConfigs
+        """
+        if (not self.problemLoaded):
+            return(None)
+        if self.stepCosts is None:
+            self.rebuildCosts()
+
+        oldLength = len(self.path)
+        self.path.splice(start, end, configs)
+        newLength = len(self.path)
+
+        #Steps s run from config s to s+1; these are the ones before and after that changed
+        first = max(start - 1, 0)
+        oldLast = max(min(end, oldLength - 1), first)
+        newLast = max(min(newLength - oldLength + end, newLength - 1), first)
+        newSteps = self.path[first:newLast + 1].stepCosts()
+
+        self.pathCost += float(newSteps.sum() - self.stepCosts[first:oldLast].sum())
+        self.stepCosts, _ = spliceBuffer(self.stepCosts, max(oldLength - 1, 0), first, oldLast, newSteps)
+        self.prefixValid = min(self.prefixValid, first)
+
+        self.solutionCost = self.pathCost
+        self.solutionLoaded = True
+
+    def appendPath(self, configs):
+        """
+            Adds configs to the end of the path, in amortised time proportional to the
+            number added
+
+            @param configs a PathArray, (m, k, 2) array or list of ASVConfigs
+        """
+        self.splicePath(len(self.path), len(self.path), configs)
+
+    def replaceRange(self, start, configs):
+        """
+            Overwrites configs start..start+len(configs)-1 in place
+
+            @param configs a PathArray, (m, k, 2) array or list of ASVConfigs
+        """
+        configs = PathArray(configs)
+        self.splicePath(start, start + len(configs), configs)
 
     def assumeDirectSolution(self):
         """
@@ -149,7 +511,8 @@ class ProblemSpec:
         if (not self.problemLoaded):
             return(None)
 
-        self.path = [self.initialState, self.goalState]
+        self.path = PathArray([self.initialState, self.goalState])
+        self.stepCosts = None
         self.solutionCost = self.calculateTotalCost()
         self.solutionLoaded = True
 
@@ -166,14 +529,22 @@ class ProblemSpec:
         return(self.obstacles[:]) #New object
 
     def setPath(self, path):
+        """
+            @param path a PathArray, (N, k, 2) array or list of ASVConfigs
+        """
         if (not self.problemLoaded):
             return(None)
-        self.path = path
+        self.path = PathArray(path)
+        self.stepCosts = None
         self.solutionCost = self.calculateTotalCost()
         self.solutionLoaded = True
 
     def getPath(self):
-        return(self.path[:]) #New object
+        """
+            @return a PathArray over a read-only view of the path, so callers can't
+                change the solution without copying it (splicing the view copies it)
+        """
+        return(PathArray.fromArray(self.path.getArray()))
 
     def getSolutionCost(self):
         return(self.solutionCost)
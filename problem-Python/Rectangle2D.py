@@ -1,4 +1,7 @@
 import math
+import numpy as np
+import Obstacle
+import Stats
 
 class Rectangle2D:
     """
@@ -33,6 +36,12 @@ class Rectangle2D:
             outcode(coord) where coord = (x,y)
                 Vector (x,y,dx,dy) of mag (dx,dy) from closest point (x,y) of the obstacle
 
+            distances(points) where points is an (..., 2) array
+                distance for every point at once
+
+            outcodes(points) where points is an (..., 2) array
+                outcode for every point at once, as an (..., 4) array
+
         @Author Loreith
     """
 
@@ -81,27 +90,20 @@ class Rectangle2D:
           	    rectangle.
 
             @param string the string describing the obstacle
-        """
-        #xs = []
-        #yx = []
-
-        xMin = 0
-        xMax = 0
-        yMin = 0
-        yMax = 0
 
-        stringList = string.split(' ')
-
-        for i in range(4):
-            #xs.append(stringList[i*2])
-            #ys.append(stringList[(i*2) + 1])
+            @return self, so that Obstacle().construct(string) can be used inline
+        """
+        values = [float(v) for v in string.split()[:8]]
+        xs = values[0::2]
+        ys = values[1::2]
 
-            xMin = stringList[i*2] if stringList[i*2] < xMin else xMin
-            xMax = stringList[i*2] if stringList[i*2] > xMax else xMax
-            yMin = stringList[(i*2) + 1] if stringList[(i*2) + 1] < yMin else yMin
-            yMax = stringList[(i*2) + 1] if stringList[(i*2) + 1] > yMax else yMax
+        xMin = min(xs)
+        xMax = max(xs)
+        yMin = min(ys)
+        yMax = max(ys)
 
         self.rect = [xMin, yMin, xMax - xMin, yMax - yMin]
+        return(self)
 
     def getRect(self):
         """
@@ -128,6 +130,8 @@ class Rectangle2D:
 
             @return the minimum distance from the coordinates to the obstacle
         """
+        if Stats.enabled:
+            Stats.count("rectDistance")
         # Circles, all 4
         x = coord[0]
         y = coord[1]
@@ -143,14 +147,14 @@ class Rectangle2D:
 
         if (x > ownX and x < ownX + ownW):
             #If a perpendicular line is possible it is the shortest something something dot product
-            return( min([ abs(y-ownY), abs(y-(ownY + ownH)) ]) )
+            return( min(abs(y-ownY), abs(y-(ownY + ownH))) )
         elif (y > ownY and y < ownY + ownH):
-            return( min([ abs(x-ownX), abs(x-(ownX + ownW)) ]) )
+            return( min(abs(x-ownX), abs(x-(ownX + ownW))) )
 
         else:
             #If we are past a corner, return the pythagorean distance from said corner
-            cornerX = min([ abs(x-ownX), abs(x-(ownX + ownW)) ])
-            cornerY = min([ abs(y-ownY), abs(y-(ownY + ownH)) ])
+            cornerX = ownX if abs(x-ownX) < abs(x-(ownX + ownW)) else ownX + ownW
+            cornerY = ownY if abs(y-ownY) < abs(y-(ownY + ownH)) else ownY + ownH
 
             dx = abs(x-cornerX)
             dy = abs(y-cornerY)
@@ -165,6 +169,8 @@ class Rectangle2D:
 
             @return the vector [x,y,dx,dy] from the closest point on the rectangle to the point coord
         """
+        if Stats.enabled:
+            Stats.count("rectOutcode")
         # Circles, all 4
         x = coord[0]
         y = coord[1]
@@ -182,23 +188,53 @@ class Rectangle2D:
             #If a perpendicular line is possible it is the shortest something something dot product
 
             sideY   = ownY if abs(y-ownY) < abs(y-(ownY + ownH)) else ownY + ownH
-            dy      = min( [ abs(y-ownY), abs(y-(ownY + ownH)) ] )
+            dy      = min(abs(y-ownY), abs(y-(ownY + ownH)))
 
             return( [x, sideY, 0, dy ] )
 
         elif (y > ownY and y < ownY + ownH):
 
             sideX   = ownX if abs(x-ownX) < abs(x-(ownX + ownW)) else ownX + ownW
-            dx      = min( [ abs(x-ownX), abs(x-(ownX + ownW)) ] )
+            dx      = min(abs(x-ownX), abs(x-(ownX + ownW)))
 
             return( [sideX, y, dx, 0] )
 
         else:
             #If we are past a corner, return the pythagorean distance from said corner
-            cornerX = min([ abs(x-ownX), abs(x-(ownX + ownW)) ])
-            cornerY = min([ abs(y-ownY), abs(y-(ownY + ownH)) ])
+            cornerX = ownX if abs(x-ownX) < abs(x-(ownX + ownW)) else ownX + ownW
+            cornerY = ownY if abs(y-ownY) < abs(y-(ownY + ownH)) else ownY + ownH
 
             dx = abs(x-cornerX)
             dy = abs(y-cornerY)
 
             return( [cornerX, cornerY, dx, dy] )
+
+    def distances(self, points):
+        """
+            distance for many points at once
+
+            @param points an (..., 2) array of (x,y)
+
+            @return an array of the distance from each point to the closest point of
+                the obstacle (0 inside it)
+        """
+        if Stats.enabled:
+            Stats.count("rectDistance", int(np.size(points) // 2))
+        x, y, w, h = self.rect
+        return(Obstacle.nearestPoints(points, (x, y, x + w, y + h))[0])
+
+    def outcodes(self, points):
+        """
+            outcode for many points at once
+
+            @param points an (..., 2) array of (x,y)
+
+            @return an (..., 4) array of the closest point (x,y) of the obstacle to each
+                point and the absolute offsets (dx,dy) from it; a point inside gets
+                itself and offsets of 0
+        """
+        if Stats.enabled:
+            Stats.count("rectOutcode", int(np.size(points) // 2))
+        x, y, w, h = self.rect
+        distances, nearest, displacements = Obstacle.nearestPoints(points, (x, y, x + w, y + h))
+        return(np.concatenate((nearest, np.abs(displacements)), axis=-1))
@@ -0,0 +1,159 @@
+"""
+    Binary solution files, in python.
+
+    A binary solution is a fixed 32 byte little-endian header followed by the path
+    as one raw float64 block, config after config, x y x y ... for each ASV:
+
+        magic       8 bytes     b"ASVPATH1" (the 1 is the format version)
+        steps       uint64      number of steps (configs - 1), as in the text header
+        asvCount    uint32      number of ASVs in each config
+        reserved    uint32      0, keeps the cost and data 8-byte aligned
+        cost        float64     the claimed solution cost
+        data        float64     (steps + 1) * asvCount * 2 coordinates
+
+    The data block can be memory-mapped directly as an (N, k, 2) array, so loading
+    is zero-copy no matter how long the path is.
+
+    Run as a script to convert between the formats:
+        python SolutionFormat.py input-file output-file
+    converts text to binary, or binary to text, depending on the input.
+
+    @author Loreith
+"""
+
+import gzip
+import lzma
+import sys
+import numpy as np
+
+MAGIC = b"ASVPATH1"
+HEADER = np.dtype([("magic", "S8"), ("steps", "<u8"), ("asvCount", "<u4"),
+                   ("reserved", "<u4"), ("cost", "<f8")])
+DATA_TYPE = np.dtype("<f8")
+#Compressed text solutions, see SolutionWriter
+GZIP_MAGIC = b"\x1f\x8b"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+#Configs converted at a time by textToBinary / binaryToText
+CONVERT_CHUNK_SIZE = 65536
+
+def isBinary(filename):
+    """
+        Detects the format from the file contents rather than its name
+
+        @param filename the solution file to inspect
+
+        @return true if the file starts with the binary magic number
+    """
+    with open(filename, 'rb') as f:
+        return(f.read(len(MAGIC)) == MAGIC)
+
+def openText(filename):
+    """
+        Opens a text solution for reading, decompressing it on the fly if it is gzip
+        or lzma compressed (detected from the contents, not the name)
+
+        @param filename the text solution file
+
+        @return a text-mode file object
+    """
+    with open(filename, 'rb') as f:
+        start = f.read(len(XZ_MAGIC))
+    if start.startswith(GZIP_MAGIC):
+        return(gzip.open(filename, 'rt'))
+    elif start.startswith(XZ_MAGIC):
+        return(lzma.open(filename, 'rt'))
+    return(open(filename, 'r'))
+
+def readHeader(filename):
+    """
+        @param filename a binary solution file
+
+        @return (steps, asvCount, cost) from its header
+
+        @throws IOError if the file isn't a binary solution
+    """
+    header = np.fromfile(filename, dtype=HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != MAGIC:
+        raise IOError("Not a binary solution file: " + str(filename))
+    return(int(header["steps"][0]), int(header["asvCount"][0]), float(header["cost"][0]))
+
+def readBinary(filename, expectedASVCount=None):
+    """
+        Memory-maps a binary solution. Nothing is read until the array is used.
+
+        @param filename the binary solution file
+
+        @param expectedASVCount the number of ASVs the problem has, or None to accept
+            whatever the header says
+
+        @return (array, cost) where array is a read-only (N, k, 2) memmap of the path
+
+        @throws IOError if the file isn't a binary solution, is truncated, or has a
+            different number of ASVs than expected
+    """
+    steps, asvCount, cost = readHeader(filename)
+    if expectedASVCount is not None and asvCount != expectedASVCount:
+        raise IOError("Binary solution has " + str(asvCount) + " ASVs, but the problem has "
+                      + str(expectedASVCount) + ": " + str(filename))
+    shape = (steps + 1, asvCount, 2)
+    try:
+        array = np.memmap(filename, dtype=DATA_TYPE, mode='r', offset=HEADER.itemsize, shape=shape)
+    except ValueError:
+        raise IOError("Binary solution file is shorter than its header says: " + str(filename))
+    return(array, cost)
+
+def writeHeader(outputFile, steps, asvCount, cost):
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = MAGIC
+    header["steps"] = steps
+    header["asvCount"] = asvCount
+    header["cost"] = cost
+    outputFile.write(header.tobytes())
+
+def writeBinary(filename, path, cost):
+    """
+        Saves a path in the binary format
+
+        @param filename the file to write (overwritten if it exists)
+
+        @param path a PathArray or (N, k, 2) array
+
+        @param cost the solution cost to store in the header
+    """
+    data = np.asarray(path.getArray() if hasattr(path, "getArray") else path, dtype=DATA_TYPE)
+    with open(filename, 'wb') as outputFile:
+        writeHeader(outputFile, data.shape[0] - 1, data.shape[1], cost)
+        outputFile.write(np.ascontiguousarray(data).tobytes())
+
+def textToBinary(textFile, binaryFile):
+    """
+        Converts a text solution to the binary format, a chunk at a time
+    """
+    #ProblemSpec reads binary files through this module, so is only imported here
+    import ProblemSpec
+    with ProblemSpec.ProblemSpec().iterSolution(textFile, CONVERT_CHUNK_SIZE) as stream, \
+            open(binaryFile, 'wb') as outputFile:
+        for chunk in stream:
+            if outputFile.tell() == 0:
+                writeHeader(outputFile, stream.length - 1, chunk.getASVCount(), stream.cost)
+            outputFile.write(np.ascontiguousarray(chunk.data, dtype=DATA_TYPE).tobytes())
+
+def binaryToText(binaryFile, textFile):
+    """
+        Converts a binary solution back to the text format, a chunk at a time, writing
+        exactly what ProblemSpec.saveSolution would (see SolutionWriter)
+    """
+    import SolutionWriter
+    array, cost = readBinary(binaryFile)
+    SolutionWriter.writeSolution(textFile, array, cost, len(array) - 1, compression=None,
+                                 chunkSize=CONVERT_CHUNK_SIZE)
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python SolutionFormat.py input-file output-file")
+        sys.exit(1)
+    if isBinary(sys.argv[1]):
+        binaryToText(sys.argv[1], sys.argv[2])
+    else:
+        textToBinary(sys.argv[1], sys.argv[2])
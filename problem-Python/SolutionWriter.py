@@ -0,0 +1,164 @@
+"""
+    Fast writing of solution text files, in python.
+
+    Configs are formatted a chunk at a time with a single % operation over the whole
+    chunk, at a fixed number of decimal places, and written through a large buffer -
+    one write call per chunk rather than per config. Output can be gzip or lzma
+    compressed; ProblemSpec.loadSolution detects and reads either transparently.
+
+    @author Loreith
+"""
+
+import gzip
+import lzma
+import numpy as np
+import ASVconfig
+import ProblemSpec
+
+#Decimal places written for each coordinate. 10 keeps the rounding error of the
+#recomputed cost far below the tester's maxError even over millions of steps.
+DEFAULT_PRECISION = 10
+#Configs formatted per write
+CHUNK_SIZE = 65536
+#Bytes buffered by the output file
+BUFFER_SIZE = 1 << 20
+#Width the header is padded to when it has to be filled in after the path is written
+HEADER_WIDTH = 48
+
+COMPRESSIONS = {
+    None: lambda filename: open(filename, 'w', buffering=BUFFER_SIZE),
+    "gzip": lambda filename: gzip.open(filename, 'wt', compresslevel=6),
+    "lzma": lambda filename: lzma.open(filename, 'wt', preset=1),
+}
+
+def compressionFor(filename):
+    """
+        @return the compression implied by the file extension (.gz or .xz), or None
+    """
+    if filename.endswith(".gz"):
+        return("gzip")
+    elif filename.endswith(".xz") or filename.endswith(".lzma"):
+        return("lzma")
+    return(None)
+
+def iterChunks(configs, chunkSize):
+    """
+        Turns anything path-like into a stream of (n, k, 2) float64 arrays
+
+        @param configs a PathArray, (N, k, 2) array, or any iterable (including a
+            generator) of ASVConfigs, (k, 2) arrays or PathArray chunks
+    """
+    if isinstance(configs, ProblemSpec.PathArray):
+        configs = configs.data
+    if isinstance(configs, np.ndarray):
+        for start in range(0, len(configs), chunkSize):
+            yield configs[start:start + chunkSize]
+        return
+
+    pending = []
+    for item in configs:
+        if isinstance(item, ProblemSpec.PathArray):
+            if pending:
+                yield np.array(pending)
+                pending = []
+            yield item.data
+            continue
+        pending.append(ASVconfig.ASVConfig(item).coords)
+        if len(pending) == chunkSize:
+            yield np.array(pending)
+            pending = []
+    if pending:
+        yield np.array(pending)
+
+def formatChunk(chunk, precision):
+    """
+        Formats an (n, k, 2) array as n lines of "x y x y ..." in one % operation
+
+        @return the text for the chunk, each line ending in a newline
+    """
+    values = chunk.reshape(len(chunk), -1)
+    line = " ".join(["%." + str(precision) + "f"] * values.shape[1]) + "\n"
+    return((line * len(values)) % tuple(values.ravel().tolist()))
+
+def measure(configs, chunkSize=CHUNK_SIZE):
+    """
+        Counts the steps and totals the cost of a path without writing it
+
+        @param configs anything iterChunks takes, other than a generator (it is
+            consumed)
+
+        @return (steps, cost) for the header
+    """
+    count = 0
+    total = 0.0
+    last = None
+    for chunk in iterChunks(configs, chunkSize):
+        if len(chunk) == 0:
+            continue
+        joined = chunk if last is None else np.concatenate((last, chunk))
+        total += ProblemSpec.PathArray.fromArray(joined).totalCost()
+        last = chunk[-1:].copy()
+        count += len(chunk)
+    return(count - 1, total)
+
+def writeSolution(filename, configs, cost=None, steps=None, precision=DEFAULT_PRECISION,
+                  compression="auto", chunkSize=CHUNK_SIZE):
+    """
+        Writes a solution text file
+
+        @param filename the file to write (overwritten if it exists)
+
+        @param configs a PathArray, (N, k, 2) array, or any iterable of configs or
+            chunks - a generator is consumed as it is written
+
+        @param cost the solution cost for the header, or None to total it while writing
+
+        @param steps the number of steps for the header, or None to count them while
+            writing. Needed up front for generators written compressed; anything
+            else written compressed is measured before it is written.
+
+        @param precision the number of decimal places for each coordinate
+
+        @param compression None, "gzip", "lzma", or "auto" to go by the file extension
+
+        @return (steps, cost) as written in the header
+    """
+    if compression == "auto":
+        compression = compressionFor(filename)
+    deferred = steps is None or cost is None
+    if deferred and compression is not None:
+        #A compressed header can't be filled in afterwards, so it has to be known first
+        if not hasattr(configs, "__len__"):
+            raise ValueError("steps and cost must be given to write a compressed solution from a generator")
+        measuredSteps, measuredCost = measure(configs, chunkSize)
+        steps = measuredSteps if steps is None else steps
+        cost = measuredCost if cost is None else cost
+        deferred = False
+
+    with COMPRESSIONS[compression](filename) as outputFile:
+        if deferred:
+            outputFile.write(" " * (HEADER_WIDTH - 1) + "\n") #Filled in once the path is written
+        else:
+            outputFile.write("%d %f\n" % (steps, cost))
+
+        count = 0
+        total = 0.0
+        last = None
+        for chunk in iterChunks(configs, chunkSize):
+            if len(chunk) == 0:
+                continue
+            outputFile.write(formatChunk(chunk, precision))
+            if cost is None:
+                joined = chunk if last is None else np.concatenate((last, chunk))
+                total += ProblemSpec.PathArray.fromArray(joined).totalCost()
+                last = chunk[-1:].copy()
+            count += len(chunk)
+
+        if deferred:
+            steps = count - 1 if steps is None else steps
+            cost = total if cost is None else cost
+            header = "%d %f" % (steps, cost)
+            outputFile.seek(0)
+            outputFile.write(header.ljust(HEADER_WIDTH - 1))
+
+    return(steps, cost)
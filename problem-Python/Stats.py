@@ -0,0 +1,134 @@
+"""
+    Opt-in instrumentation of the tester's hot paths, in python.
+
+    When enabled, the Tester records a timed span for every test it runs (and
+    FusedValidator one for every check of every chunk), and the geometry code counts
+    what it does: segment-rectangle tests in line2D (one per boom and obstacle pair,
+    batched or not), how many of those the bounding box check rejects before
+    clipping, and points measured by Rectangle2D.distance and outcode (one per
+    call, or one per point of distances and outcodes).
+
+    Instrumented code checks the module flag before doing anything else:
+
+        if Stats.enabled:
+            Stats.count("segmentRectTests")
+
+    so while it is disabled (the default) the cost is one attribute lookup.
+
+    The results can be written as JSON (counts, and total seconds per span name) or
+    as a Chrome trace-event file, which chrome://tracing and Perfetto can open.
+
+    Usage:
+        Stats.enable()
+        tester.testAll(verbose)
+        Stats.writeJson("stats.json")
+        Stats.writeTrace("trace.json")
+
+    @author Loreith
+"""
+
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+enabled = False
+#Counter name -> count
+counts = collections.Counter()
+#(name, start, end, thread id) for each span, in perf_counter seconds
+spans = []
+#perf_counter at enable(), the zero of the trace's timeline
+origin = 0.0
+#Handed out by span() while disabled, so the with statement costs next to nothing
+NULL_SPAN = contextlib.nullcontext()
+
+def enable():
+    """
+        Starts recording, clearing anything recorded before
+    """
+    global enabled, origin
+    reset()
+    origin = time.perf_counter()
+    enabled = True
+
+def disable():
+    """
+        Stops recording; what was recorded is kept until the next enable() or reset()
+    """
+    global enabled
+    enabled = False
+
+def reset():
+    counts.clear()
+    del spans[:]
+
+def count(name, amount=1):
+    counts[name] += amount
+
+def addSpan(name, start, end):
+    """
+        Records a span timed by the caller, e.g. from clock readings it takes anyway
+
+        @param start the perf_counter reading at the start of the span
+
+        @param end the perf_counter reading at the end
+    """
+    spans.append((name, start, end, threading.get_ident()))
+
+@contextlib.contextmanager
+def timedSpan(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        addSpan(name, start, time.perf_counter())
+
+def span(name):
+    """
+        @return a context manager that records its body as a span named name, or does
+            nothing while disabled
+    """
+    if not enabled:
+        return(NULL_SPAN)
+    return(timedSpan(name))
+
+def summary():
+    """
+        @return {"counts": {name: count}, "seconds": {span name: total seconds},
+            "spans": {span name: number of spans}}
+    """
+    seconds = collections.defaultdict(float)
+    numbers = collections.Counter()
+    for name, start, end, thread in spans:
+        seconds[name] += end - start
+        numbers[name] += 1
+    return({"counts": dict(counts), "seconds": dict(seconds), "spans": dict(numbers)})
+
+def writeJson(filename):
+    with open(filename, 'w') as outputFile:
+        json.dump(summary(), outputFile, indent=2)
+        outputFile.write("\n")
+
+def traceEvents():
+    """
+        @return the spans as Chrome complete ("X") events, and the counts as one
+            counter ("C") event at the end, with times in microseconds since enable()
+    """
+    pid = os.getpid()
+    events = []
+    last = 0.0
+    for name, start, end, thread in spans:
+        events.append({"name": name, "cat": name.split(":")[0], "ph": "X", "pid": pid, "tid": thread,
+                       "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6})
+        last = max(last, end - origin)
+    if counts:
+        events.append({"name": "geometry", "ph": "C", "pid": pid, "tid": 0, "ts": last * 1e6,
+                       "args": dict(counts)})
+    return(events)
+
+def writeTrace(filename):
+    with open(filename, 'w') as outputFile:
+        json.dump({"traceEvents": traceEvents(), "displayTimeUnit": "ms"}, outputFile)
+        outputFile.write("\n")
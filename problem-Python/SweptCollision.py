@@ -0,0 +1,185 @@
+"""
+    Continuous collision checking of the motion between consecutive configs, in python.
+
+    The tester only checks the configs themselves, so a step can cut the corner of
+    an obstacle between two valid configs. Here the whole motion is checked: every
+    ASV moves in a straight line from one config to the next, so the points a boom
+    passes through during a step form a bilinear patch
+
+        P(s, t) = (1-s)(1-t) A + s(1-t) B + (1-s)t C + st D
+
+    where A, B are the boom's ends at the start of the step and C, D at the end.
+    A patch lies inside the convex hull of its four corners, so the bounding box of
+    the corners is a conservative bound on the swept boom.
+
+    Every step's boxes are first tested against every obstacle at once with numpy;
+    in a valid path nearly all miss and the step is certified straight away. Only
+    the patches whose box touches an obstacle are subdivided, all of them together
+    a level at a time: each is halved whichever way it is longer, and only the
+    halves still touching go on to the next level. A patch collides once the boom
+    at the start or end of its piece of the motion meets the obstacle. A patch that
+    is no bigger than the resolution, or has been halved MAX_DEPTH times, and
+    still touches the obstacle without either boom meeting it is ambiguous, and
+    counts as colliding: the check never calls a motion clear that it hasn't
+    shown to be, and does at most MAX_DEPTH levels of work however long the step.
+
+    Obstacles are given as an (M, 4) array of xMin, yMin, xMax, yMax, normally the
+    tester's lenient obstacles (see ObstacleSet.bounds), so the tolerance is the
+    same maxError the collision test allows. They are closed, as in
+    line2D.segmentIntersectsRect: a boom touching an edge collides, and an obstacle
+    shrunk to nothing never does. A step between two configs that pass the
+    collision test can only fail here by passing through an obstacle on the way.
+
+    @author Loreith
+"""
+
+import numpy as np
+import line2D
+
+#Booms x obstacles tested together in the broad phase; bounds the temporary arrays
+BROAD_PHASE_SIZE = 1 << 22
+#Sweeps subdivided together in the narrow phase
+NARROW_PHASE_SIZE = 1 << 14
+#Times a sweep is halved at most; a piece still ambiguous after that collides
+MAX_DEPTH = 20
+
+def sweptBoxes(path):
+    """
+        @param path an (N, k, 2) array
+
+        @return an (N-1, k-1, 4) array of the xMin, yMin, xMax, yMax of every boom's
+            sweep over every step
+    """
+    corners = np.stack((path[:-1, :-1], path[:-1, 1:], path[1:, :-1], path[1:, 1:]))
+    return(np.concatenate((corners.min(axis=0), corners.max(axis=0)), axis=-1))
+
+def sweepsCollide(corners, rects, owners, count, resolution, maxDepth=MAX_DEPTH):
+    """
+        The narrow phase: subdivides many booms' sweeps at once, a level at a time,
+        until it is certain whether each enters its rectangle
+
+        @param corners an (P, 4, 2) array of each patch's corners A, B, C, D: the
+            boom's ends at the start of the motion, then at the end
+
+        @param rects an (P, 4) array of the xMin, yMin, xMax, yMax of the rectangle
+            each patch is checked against
+
+        @param owners a length-P integer array in [0, count), e.g. each patch's step;
+            the patches of an owner are dropped once one of them collides
+
+        @param count the number of owners
+
+        @param resolution pieces this small (in both directions) that touch a
+            rectangle's bounds without either boom meeting it count as colliding
+
+        @param maxDepth the most times a patch is halved; pieces still touching
+            after that count as colliding
+
+        @return a length-count mask, True for each owner with a patch that enters its
+            closed rectangle, or may do to within the resolution
+    """
+    hit = np.zeros(count, dtype=bool)
+    for depth in range(maxDepth + 1):
+        low = corners.min(axis=1)
+        high = corners.max(axis=1)
+        touching = ((high[:, 0] >= rects[:, 0]) & (low[:, 0] <= rects[:, 2])
+                    & (high[:, 1] >= rects[:, 1]) & (low[:, 1] <= rects[:, 3]) & ~hit[owners])
+        corners, rects, owners = corners[touching], rects[touching], owners[touching]
+        if not len(owners):
+            break
+
+        #The booms at either end of each piece of the motion, tested as the collision test does
+        meets = (line2D.segmentsIntersectRects(corners[:, 0], corners[:, 1], rects)
+                 | line2D.segmentsIntersectRects(corners[:, 2], corners[:, 3], rects))
+        hit[owners[meets]] = True
+
+        a, b, c, d = corners.transpose(1, 0, 2)
+        alongBoom = np.maximum(np.hypot(*(b - a).T), np.hypot(*(d - c).T))
+        alongStep = np.maximum(np.hypot(*(c - a).T), np.hypot(*(d - b).T))
+        ambiguous = ~meets & (np.maximum(alongBoom, alongStep) <= resolution)
+        if depth == maxDepth:
+            ambiguous = ~meets
+        hit[owners[ambiguous]] = True
+
+        split = ~hit[owners]
+        corners, rects, owners = corners[split], rects[split], owners[split]
+        a, b, c, d = corners.transpose(1, 0, 2)
+        byBoom = (alongBoom >= alongStep)[split][:, np.newaxis, np.newaxis]
+        #Halved along the boom: (a, ab, c, cd) and (ab, b, cd, d); along the step:
+        #(a, b, ac, bd) and (ac, bd, c, d)
+        ab, cd, ac, bd = (a + b) / 2, (c + d) / 2, (a + c) / 2, (b + d) / 2
+        first = np.where(byBoom, np.stack((a, ab, c, cd), axis=1), np.stack((a, b, ac, bd), axis=1))
+        second = np.where(byBoom, np.stack((ab, b, cd, d), axis=1), np.stack((ac, bd, c, d), axis=1))
+        corners = np.concatenate((first, second))
+        rects = np.concatenate((rects, rects))
+        owners = np.concatenate((owners, owners))
+    return(hit)
+
+def sweepCorners(path, steps, booms):
+    """
+        @return the (P, 4, 2) corners A, B, C, D of the given steps' and booms' sweeps
+    """
+    return(np.stack((path[steps, booms], path[steps, booms + 1], path[steps + 1, booms],
+                     path[steps + 1, booms + 1]), axis=1))
+
+def candidates(path, bounds, chunkSize=None):
+    """
+        The broad phase: finds every (step, boom, obstacle) whose swept box touches
+        the obstacle, skipping obstacles shrunk to nothing
+
+        @param path an (N, k, 2) array
+
+        @param bounds an (M, 4) array of obstacle xMin, yMin, xMax, yMax
+
+        @return three arrays of step, boom and obstacle indices, ordered by step
+    """
+    steps = len(path) - 1
+    booms = path.shape[1] - 1
+    found = ([], [], [])
+    if steps <= 0 or booms <= 0 or len(bounds) == 0:
+        return(tuple(np.zeros(0, dtype=np.intp) for i in range(3)))
+    if chunkSize is None:
+        chunkSize = max(1, BROAD_PHASE_SIZE // (booms * len(bounds)))
+    solid = (bounds[:, 2] > bounds[:, 0]) & (bounds[:, 3] > bounds[:, 1])
+
+    for start in range(0, steps, chunkSize):
+        boxes = sweptBoxes(path[start:start + chunkSize + 1])[:, :, np.newaxis, :]
+        overlap = ((boxes[..., 2] >= bounds[:, 0]) & (boxes[..., 0] <= bounds[:, 2])
+                   & (boxes[..., 3] >= bounds[:, 1]) & (boxes[..., 1] <= bounds[:, 3]) & solid)
+        step, boom, rect = np.nonzero(overlap)
+        found[0].append(step + start)
+        found[1].append(boom)
+        found[2].append(rect)
+    return(tuple(np.concatenate(f) for f in found))
+
+def stepCollides(cfg0, cfg1, bounds, resolution):
+    """
+        @param cfg0 the (k, 2) array of the config at the start of the step
+
+        @param cfg1 the (k, 2) array of the config at the end of the step
+
+        @return whether the motion from cfg0 to cfg1 passes through any obstacle
+    """
+    path = np.stack((cfg0, cfg1))
+    steps, booms, rects = candidates(path, bounds)
+    return(bool(sweepsCollide(sweepCorners(path, steps, booms), bounds[rects], steps, 1, resolution)[0]))
+
+def collidingStepMask(path, bounds, resolution, chunkSize=None):
+    """
+        @param path an (N, k, 2) array
+
+        @param bounds an (M, 4) array of obstacle xMin, yMin, xMax, yMax
+
+        @param resolution how finely sweeps that touch an obstacle are checked
+
+        @return a length N-1 mask, True for each step whose motion passes through
+            an obstacle
+    """
+    mask = np.zeros(max(len(path) - 1, 0), dtype=bool)
+    steps, booms, rects = candidates(path, bounds, chunkSize)
+    for start in range(0, len(steps), NARROW_PHASE_SIZE):
+        block = slice(start, start + NARROW_PHASE_SIZE)
+        todo = ~mask[steps[block]]
+        step, boom, rect = steps[block][todo], booms[block][todo], rects[block][todo]
+        mask |= sweepsCollide(sweepCorners(path, step, boom), bounds[rect], step, len(mask), resolution)
+    return(mask)
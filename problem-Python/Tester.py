@@ -1,8 +1,21 @@
+import json
 import math
-import problemSpec
-import obstacle
+import queue
+import sys
+import threading
+import time
+import numpy as np
+import FusedValidator
+import ParallelValidator
+import PathChecks
+import ProblemCache
+import ProblemSpec
+import Obstacle
+import ObstacleSet
 import ASVconfig
-import rectangle2D
+import DistanceField
+import Stats
+import SweptCollision
 import line2D
 
 class Tester:
@@ -15,15 +28,49 @@ class Tester:
     #Rectangle2D is defined as a tuple of x, y, w, h
     BOUNDS = (0,0,1,1)
     DEFAULT_MAX_ERROR = 1e-5
+    #Configs per chunk, and chunks buffered between the parser and checker threads, when streaming
+    STREAM_CHUNK_SIZE = 4096
+    STREAM_QUEUE_SIZE = 4
+    #Seconds the stream parser waits for room in the queue before checking it should stop
+    STREAM_PUT_TIMEOUT = 0.1
+
+    #Test name -> (title, failure message, verbose header or None)
+    #List failures format the message with (number failing, number checked)
+    REPORTS = {
+        "initial": ("Initial state", "FAILED: Solution must start at initial state.", None),
+        "goal": ("Goal state", "FAILED: Solution path must end at goal state.", None),
+        "steps": ("Step sizes", "FAILED: Distance exceeds 0.001 for {0} of {1} step(s).",
+                  "Starting line for each invalid step:"),
+        "booms": ("Boom lengths", "FAILED: Invalid boomlength for {0} of {1} state(s)",
+                  "Line for each invalid cfg:"),
+        "convexity": ("Convexity", "FAILED: {0} out of {1} state(s) are not convex.",
+                      "Line for each invalid cfg:"),
+        "areas": ("Areas", "FAILED: {0} of {1} state(s) have insufficient area.",
+                  "Line for each invalid cfg:"),
+        "bounds": ("Bounds", "FAILED: {0} of {1} state(s) go out of the workspace bounds.",
+                   "Line for each invalid cfg:"),
+        "collisions": ("Collisions", "FAILED: {0} of {1} state(s) collide with obstacles.",
+                       "Line for each invalid cfg:"),
+        "sweep": ("Swept collisions", "FAILED: {0} of {1} step(s) pass through obstacles.",
+                  "Starting line for each invalid step:"),
+        "cost": ("Solution cost", "FAILED: Incorrect solution cost; was {0} but should have been {1}", None),
+    }
+    #The order the java tester runs its tests in
+    SOLUTION_TESTS = ["initial", "goal", "steps", "cost"]
+    STATE_TESTS = ["booms", "convexity", "areas", "bounds", "collisions"]
 
     def __init__(self, maxError = DEFAULT_MAX_ERROR):
         """
             Constructor.
         """
         self.maxError = maxError
-        self.lenientBounds = grow(BOUNDS, self.maxError)
+        self.lenientBounds = self.grow(self.BOUNDS, self.maxError)
 
-        self.ps = problemSpec.ProblemSpec()
+        self.ps = ProblemSpec.ProblemSpec()
+        #(obstacle list, maxError, ObstacleSet of them shrunk by maxError), see getObstacleSet
+        self.obstacleSet = None
+        #(obstacle list, maxError, resolution, DistanceField), see getDistanceField
+        self.distanceField = None
 
     def getMinimumArea(self, asvCount):
         """
@@ -47,7 +94,7 @@ class Tester:
 
             @return a Rectangle2d expanded by delta in each direction
         """
-        return ((rect[0] - delta/2, rect[1] - delta/2, rect[2] + delta, rect[3] + delta))
+        return ((rect[0] - delta, rect[1] - delta, rect[2] + 2*delta, rect[3] + 2*delta))
 
     def hasInitialFirst(self):
         """
@@ -64,13 +111,7 @@ class Tester:
             Checks that the first configuration in the solution path is the initial
             configuration
         """
-        print("Test " + str(testNo) + ": Initial state")
-        if (not hasInitialFirst()):
-            print("FAILED: Solution must start at initial state.")
-            return (False)
-        else:
-            print("Passed.")
-            return (True)
+        return (self.report("initial", testNo, verbose, self.hasInitialFirst()))
 
     def hasGoalLast(self):
         """
@@ -88,13 +129,7 @@ class Tester:
             Checks that the last configuration in the solution path is the goal
             configuration
         """
-        print("Test " + str(testNo) + ": Goal state")
-        if (not hasGoalLast()):
-            print("FAILED: Solution path must end at goal state.")
-            return (False)
-        else:
-            print("Passed.")
-            return (True)
+        return (self.report("goal", testNo, verbose, self.hasGoalLast()))
 
     def addToAll(self, oldList, delta):
         """
@@ -106,10 +141,46 @@ class Tester:
 
             @return a copy of the list where each value is incremented by delta
         """
-        newList = oldList[:]
-        for i in newList:
-            i += delta
-        return (newList)
+        return ([i + delta for i in oldList])
+
+    def report(self, testName, testNo, verbose, passed, messageArgs=()):
+        """
+            Prints the outcome of a pass/fail test in the standard format
+
+            @param testName the key of the test in REPORTS
+
+            @param passed whether the test passed
+
+            @param messageArgs values to format into the failure message
+
+            @return passed
+        """
+        title, message, _ = self.REPORTS[testName]
+        print("Test " + str(testNo) + ": " + title)
+        if not passed:
+            print(message.format(*messageArgs))
+            return (False)
+        else:
+            print("Passed.")
+            return (True)
+
+    def reportList(self, testName, testNo, verbose, badList, total):
+        """
+            Prints the outcome of a test that checks every state (or step) in the path
+
+            @param testName the key of the test in REPORTS
+
+            @param badList the path indices that failed
+
+            @param total the number of states (or steps) checked
+
+            @return whether the test was successful or not
+        """
+        passed = self.report(testName, testNo, verbose, not badList, (len(badList), total))
+        if not passed and verbose:
+            print(self.REPORTS[testName][2])
+            print(str(self.addToAll(badList,2)))
+        return (passed)
 
     def isValidStep(self, cfg0, cfg1):
         """
@@ -121,38 +192,23 @@ class Tester:
 
             @return whether the step from s0 to s1 is a valid step
         """
-        return (cfg0.maxDistance(cfg1) <= self.maxError + MAX_STEP)
+        return (cfg0.maxDistance(cfg1) <= self.maxError + self.MAX_STEP)
 
     def getInvalidSteps(self):
         """
             @return the preceding path indices of any invalid steps.
         """
-        badSteps = []
         path = self.ps.getPath()
-        state = path[0]
-        for i in range(1,len(path)):
-            nextState = path[i]
-            if (not isValidStep(state,nextState)):
-                badSteps.append(i-1)
-            state = nextState
-        return (badSteps)
+        tooFar = path.maxDisplacements() > self.maxError + self.MAX_STEP
+        return (np.flatnonzero(tooFar).tolist())
 
     def testValidSteps(self, testNo, verbose):
         """
             Checks that the steps in between configurations do not exeed the maximum
             primitive step distance
         """
-        print("Test " + str(testNo) + ": Step sizes")
-        badSteps = getInvalidSteps()
-        if badSteps:
-            print("FAILED: Distance exceeds 0.001 for "+str(len(badSteps))+" of "+str(len(self.ps.getPath()) - 1)+" step(s).")
-            if verbose:
-                print("Starting line for each invalid step:")
-                print(str(addToAll(badSteps,2)))
-            return (False)
-        else:
-            print("Passed.")
-            return (True)
+        badSteps = self.getInvalidSteps()
+        return (self.reportList("steps", testNo, verbose, badSteps, len(self.ps.getPath()) - 1))
 
     def hasValidBoomLengths(self, cfg):
         """
@@ -163,42 +219,35 @@ class Tester:
             p0 = points[i-1]
             p1 = points[i]
             boomLength = math.sqrt(abs(p1[0]-p0[0])**2 + abs(p1[1]-p0[1])**2)
-            if boomLength < MIN_BOOM_LENGTH - maxError:
+            if boomLength < self.MIN_BOOM_LENGTH - self.maxError:
                 return (False)
-            elif boomLength > MAX_BOOM_LENGTH + maxError:
+            elif boomLength > self.MAX_BOOM_LENGTH + self.maxError:
                 return (False)
         return (True)
 
+    def validBoomMask(self, array):
+        """
+            Vectorised hasValidBoomLengths over a whole path (see PathChecks)
+
+            @param array an (N, k, 2) path array
+
+            @return a length-N boolean mask, True where the config's booms are valid
+        """
+        return (PathChecks.validBoomMask(array, self.MIN_BOOM_LENGTH, self.MAX_BOOM_LENGTH, self.maxError))
+
     def getInvalidBoomStates(self):
         """
             @return the path indices of any states with invalid booms.
         """
-        badStates = []
         path = self.ps.getPath()
-        for i in range(len(path)):
-            if not hasValidBoomLengths(path[i]):
-                badStates.append(i)
-        return (badStates)
+        return (np.flatnonzero(~self.validBoomMask(path.data)).tolist())
 
     def testBoomLengths(self, testNo, verbose):
         """
             Checks that the booms in each config have length within the allowable range
         """
-        print("Test " + str(testNo) + ": Boom lengths")
-        badStates = getInvalidBoomStates()
-        if badStates:
-            print("FAILED: Invalid boomlength for " + str(len(badStates)) + " of "
-                  + str(len(self.ps.getPath())) + " state(s)")
-
-            if verbose:
-                print ("Line for each invalid cfg:")
-                print(str(addToAll(badStates,2)))
-
-            return (False)
-        else:
-            print("Passed.")
-            return (True)
-
+        badStates = self.getInvalidBoomStates()
+        return (self.reportList("booms", testNo, verbose, badStates, len(self.ps.getPath())))
 
     def normaliseAngle(self, angle):
         """
@@ -235,7 +284,7 @@ class Tester:
         for i in range(2,len(points)):
             p2 = points[i]
             nextAngle = math.atan2(p2[1] - p1[1], p2[0] - p1[0])
-            turningAngle = normaliseAngle(nextAngle - angle)
+            turningAngle = self.normaliseAngle(nextAngle - angle)
 
             if turningAngle == math.pi:
                 return(False)
@@ -264,35 +313,31 @@ class Tester:
         return (True)
 
 
+    def convexMask(self, array):
+        """
+            isConvex over a whole path, from edge cross products rather than angles
+            (see PathChecks.convexMask)
+
+            @param array an (N, k, 2) path array
+
+            @return a length-N boolean mask, True where the config is convex
+        """
+        return (PathChecks.convexMask(array, self.maxError))
+
     def getNonConvexStates(self):
         """
             @return the path indices of any non-convex states
         """
-        badStates = []
         path = self.ps.getPath()
-        for i in range(len(path)):
-            if not isConvex(path[i]):
-                badStates.append(i)
-        return (badStates)
+        return (np.flatnonzero(~self.convexMask(path.data)).tolist())
 
     def testConvexity(self,testNo, verbose):
         """
             Checks that each config in the path is convex (and hence also
             not self intersection)
         """
-        print("Test " + str(testNo) + ": Convexity")
-        badStates = getNonConvexStates()
-        if badStates:
-            print("FAILED: " + str(len(badStates)) + " out of " + str(len(self.ps.getPath())) + " state(s) are not convex.")
-
-            if verbose:
-                print ("Line for each invalid cfg:")
-                print(str(addToAll(badStates,2)))
-
-            return(False)
-        else:
-            print("Passed.")
-            return (True)
+        badStates = self.getNonConvexStates()
+        return (self.reportList("convexity", testNo, verbose, badStates, len(self.ps.getPath())))
 
     def hasEnoughArea(self, cfg):
         """
@@ -311,38 +356,31 @@ class Tester:
             total += points[i][0] * (points[i+1][1] - points[i-1][1])
 
         area = abs(total)/2
-        return (area >= getMinimumArea(cfg.getASVCount()) - self.maxError)
+        return (area >= self.getMinimumArea(cfg.getASVCount()) - self.maxError)
+
+    def enoughAreaMask(self, array):
+        """
+            Vectorised hasEnoughArea over a whole path (see PathChecks)
+
+            @param array an (N, k, 2) path array
+
+            @return a length-N boolean mask, True where the config has enough area
+        """
+        return (PathChecks.enoughAreaMask(array, self.maxError))
 
     def getInvalidAreaStates(self):
         """
             @return the path indices of any states with insufficient area
         """
         path = self.ps.getPath()
-        badStates = []
-        for i in range(len(path)):
-            if not hasEnoughArea(path[i]):
-                badStates.append(i)
-
-        return(badStates)
+        return (np.flatnonzero(~self.enoughAreaMask(path.data)).tolist())
 
     def testAreas(self, testNo, verbose):
         """
             Checks whether each config has sufficient internal area
         """
-        print("Test " + str(testNo) + ": Areas")
-        badStates = getInvalidAreaStates()
-        if badStates:
-            print("FAILED: " + str(len(badStates)) + " of " + str(len(self.ps.getPath())) + " state(s) have insufficient area.")
-
-            if verbose:
-                print ("Line for each invalid cfg:")
-                print(str(addToAll(badStates,2)))
-
-            return (False)
-        else:
-            print("Passed.")
-            return (True)
-
+        badStates = self.getInvalidAreaStates()
+        return (self.reportList("areas", testNo, verbose, badStates, len(self.ps.getPath())))
 
     def fitsBounds(self, cfg):
         """
@@ -354,24 +392,30 @@ class Tester:
         """
         c = [False,False,False,False]
         for p in cfg.getASVPositions():
-            c[0] = p[0] > self.lenientBounds[0]
-            c[1] = p[1] > self.lenientBounds[1]
+            c[0] = p[0] >= self.lenientBounds[0]
+            c[1] = p[1] >= self.lenientBounds[1]
             c[2] = p[0] < self.lenientBounds[0] + self.lenientBounds[2]
             c[3] = p[1] < self.lenientBounds[1] + self.lenientBounds[3]
-            if c[0] and c[1] and c[2] and c[3]:
-                return (True)
-        return (False)
+            if not (c[0] and c[1] and c[2] and c[3]):
+                return (False)
+        return (True)
+
+    def fitsBoundsMask(self, array):
+        """
+            Vectorised fitsBounds over a whole path (see PathChecks)
+
+            @param array an (N, k, 2) path array
+
+            @return a length-N boolean mask, True where the config is within bounds
+        """
+        return (PathChecks.fitsBoundsMask(array, self.lenientBounds))
 
     def getOutOfBoundsStates(self):
         """
             @return the path indices of any states that are out of bounds.
         """
         path = self.ps.getPath()
-        badStates = []
-        for i in range(len(path)):
-            if (not fitsBounds(path[i])):
-                badStates.append(i)
-        return (badStates)
+        return (np.flatnonzero(~self.fitsBoundsMask(path.data)).tolist())
 
     def testBounds(self, testNo, verbose):
         """
@@ -383,21 +427,8 @@ class Tester:
 
             @return whether the test was successful or not
         """
-        print("Test " + str(testNo) + ": Bounds")
-        badStates = getOutOfBoundsStates()
-        if badStates:
-            print("FAILED: " + str(len(badStates)) + " of " + str(len(self.ps.getPath())) +
-                  " state(s) go out of the workspace bounds.")
-
-            if verbose:
-                print ("Line for each invalid cfg:")
-                print(str(addToAll(badStates,2)))
-
-            return (False)
-        else:
-            print("Passed.")
-            return (True)
-
+        badStates = self.getOutOfBoundsStates()
+        return (self.reportList("bounds", testNo, verbose, badStates, len(self.ps.getPath())))
 
     def hasCollision(self, cfg, obs):
         """
@@ -411,28 +442,112 @@ class Tester:
 
             @return whether the given config collides with the given obstacles
         """
-        points = cfg.getASVPositions()
-        for o in obs:
-            lenientParams = grow(o.getRect(), -self.maxError)
-            lenientRect = rectangle2D.Rectangle2D(lenientParams[0],lenientParams[1],lenientParams[2],lenientParams[3])
+        return (self.hasLenientCollision(cfg, ObstacleSet.ObstacleSet(obs, self.maxError)))
 
-            for i in range(1, len(points)):
-                if (line2D(points[i-1],points[i]).intersectsRect(lenientRect)):
-                    return (True)
+    def hasLenientCollision(self, cfg, lenientRects):
+        """
+            Determines whether the given config collides with any of the given
+            obstacle rectangles, which have already been shrunk by maxError
 
-        return (False)
+            @param cfg the config to test
+
+            @param lenientRects an ObstacleSet, e.g. from getObstacleSet, the (M, 4)
+                array of its bounds, or a list of Rectangle2Ds
+
+            @return whether the given config collides with any of them
+        """
+        if isinstance(lenientRects, ObstacleSet.ObstacleSet):
+            lenientRects = lenientRects.bounds
+        elif not isinstance(lenientRects, np.ndarray):
+            lenientRects = line2D.rectBounds(lenientRects)
+        points = cfg.getArray()
+        #Every boom against every rectangle at once
+        hits = line2D.segmentsIntersectRects(points[:-1, np.newaxis], points[1:, np.newaxis], lenientRects)
+        return (bool(hits.any()))
+
+    def getObstacleSet(self):
+        """
+            Returns the problem's obstacles shrunk by maxError, compiled once per
+            problem and error (and kept in the ProblemCache if the problem was loaded
+            through it)
+
+            @return an ObstacleSet
+        """
+        #Every load gives ps a new obstacle list, so identity tells us if it's still current
+        cached = self.obstacleSet
+        if cached is None or cached[0] is not self.ps.obstacles or cached[1] != self.maxError:
+            build = lambda: ObstacleSet.ObstacleSet(self.ps.getObstacles(), self.maxError)
+            name = "obstacleSet " + repr(self.maxError)
+            obstacleSet = ProblemCache.getDerived(self.ps, name, ObstacleSet.ObstacleSet, build)
+            cached = (self.ps.obstacles, self.maxError, obstacleSet)
+            self.obstacleSet = cached
+        return (cached[2])
+
+    def getLenientObstacles(self):
+        """
+            @return the problem's obstacles shrunk by maxError, as a list of Rectangle2Ds
+        """
+        return (self.getObstacleSet().getRectangles())
+
+    def getDistanceField(self, resolution=DistanceField.DistanceField.DEFAULT_RESOLUTION):
+        """
+            Returns a field of clearances from the lenient obstacles over BOUNDS, built
+            once per problem, error and resolution and kept in the ProblemCache like
+            getObstacleSet
+
+            @param resolution the number of cells along each side of the workspace
+
+            @return a DistanceField
+        """
+        cached = self.distanceField
+        if (cached is None or cached[0] is not self.ps.obstacles or cached[1] != self.maxError
+                or cached[2] != resolution):
+            build = lambda: DistanceField.DistanceField(self.getObstacleSet(), self.BOUNDS, resolution)
+            name = "distanceField " + repr(self.maxError) + " " + repr(resolution)
+            field = ProblemCache.getDerived(self.ps, name, DistanceField.DistanceField, build)
+            cached = (self.ps.obstacles, self.maxError, resolution, field)
+            self.distanceField = cached
+        return (cached[3])
+
+    def getObstacleGrid(self):
+        """
+            @return the spatial index over the lenient obstacles, so collision and
+                distance queries only visit the obstacles near them (an ObstacleGrid)
+        """
+        return (self.getObstacleSet().grid)
+
+    def firstCollisions(self, array):
+        """
+            hasLenientCollision against the lenient obstacles for a whole (N, k, 2) path
+            array at once, by the batched kernel (see ObstacleGrid.firstCollisions),
+            which also says which obstacle each config hits
+
+            @return a length-N integer array of the index (in ps.getObstacles()) of the
+                first obstacle each config collides with, or -1 where it doesn't
+        """
+        return (self.getObstacleGrid().firstCollisions(array))
+
+    def collisionFreeMask(self, array):
+        """
+            @return a boolean mask, True where the config does not collide
+        """
+        return (self.firstCollisions(array) < 0)
 
     def getCollidingStates(self):
         """
             Returns the path indices of any states that collide with obstacles
         """
-        path = self.ps.getPath
-        badStates = []
+        path = self.ps.getPath()
+        return (np.flatnonzero(~self.collisionFreeMask(path.data)).tolist())
 
-        for i in range(len(path)):
-            if (hasCollision(path[i], self.ps.getObstacles())):
-                badStates.append(i)
-        return (badStates)
+    def getCollidingObstacles(self):
+        """
+            @return a list of (path index, obstacle index) of every colliding state and
+                the first obstacle it collides with
+        """
+        first = self.firstCollisions(self.ps.getPath().data)
+        bad = np.flatnonzero(first >= 0)
+        return (list(zip(bad.tolist(), first[bad].tolist())))
 
     def testCollisions(self, testNo, verbose):
         """
@@ -444,22 +559,48 @@ class Tester:
 
             @return whether the test was successful or not
         """
-        print("Test " + str(testNo) + ": Collisions")
-        badStates = getCollidingStates()
-        if badStates:
-            print("FAILED: " + str(len(badStates)) + " of " + str(len(self.ps.getPath())) +
-                  " state(s) collide with obstacles.")
+        badStates = self.getCollidingStates()
+        return (self.reportList("collisions", testNo, verbose, badStates, len(self.ps.getPath())))
 
-            if verbose:
-                print ("Line for each invalid cfg:")
-                print(str(addToAll(badStates,2)))
+    def sweptCollisionMask(self, array, resolution=None):
+        """
+            Checks the motion between each pair of consecutive configs, not just the
+            configs themselves (see SweptCollision)
 
-            return (False)
-        else:
-            print("Passed.")
-            return (True)
+            @param array an (N, k, 2) path array
+
+            @param resolution how finely motions that come close to an obstacle are
+                checked; maxError by default
+
+            @return a length N-1 boolean mask, True where the step passes through an
+                obstacle
+        """
+        if resolution is None:
+            resolution = self.maxError
+        return (SweptCollision.collidingStepMask(array, self.getObstacleSet().bounds, resolution))
+
+    def getSweptCollidingSteps(self):
+        """
+            @return the preceding path indices of any steps that pass through obstacles
+        """
+        path = self.ps.getPath()
+        return (np.flatnonzero(self.sweptCollisionMask(path.data)).tolist())
+
+    def testSweptCollisions(self, testNo, verbose):
+        """
+            Checks that the motion between consecutive configurations does not pass
+            through obstacles. Not one of the java tests, so only run by name.
+
+            @param testNo the test number
+
+            @param verbose whether to output more information about the test on failure
+
+            @return whether the test was successful or not
+        """
+        badSteps = self.getSweptCollidingSteps()
+        return (self.reportList("sweep", testNo, verbose, badSteps, len(self.ps.getPath()) - 1))
 
-    def testTotalCost(self, testNO, verbose):
+    def testTotalCost(self, testNo, verbose):
         """
             Checks that the total cost of the solution is correctly calculated
 
@@ -469,36 +610,246 @@ class Tester:
 
             @return whether the test was successful or not
         """
-        print("Test " + str(testNo) + ": Solution cost")
         cost = self.ps.getSolutionCost()
         actualCost = self.ps.calculateTotalCost()
-        if (abs(cost - actualCost) > self.maxError):
-            print("FAILED: Incorrect solution cost; was "+str(cost)+" but should have been "+str(actualCost))
+        return (self.report("cost", testNo, verbose, abs(cost - actualCost) <= self.maxError, (cost, actualCost)))
+
+    def streamChunks(self, stream):
+        """
+            Parses a solution stream on a background thread and yields its PathArray
+            chunks, so parsing the next chunk overlaps with checking the current one. At
+            most STREAM_QUEUE_SIZE parsed chunks are buffered at once. If the caller
+            stops early (an error, or closing the generator) the thread is told to stop,
+            and the stream is closed once it has.
+
+            @param stream a SolutionStream of PathArray chunks (see ProblemSpec.iterSolution)
+        """
+        chunks = queue.Queue(maxsize=self.STREAM_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def put(item):
+            #Waits for room, but gives up as soon as the consumer has gone
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=self.STREAM_PUT_TIMEOUT)
+                    return (True)
+                except queue.Full:
+                    pass
             return (False)
-        else:
-            print("Passed.")
-            return (True)
+
+        def parse():
+            try:
+                for chunk in stream:
+                    if not put(chunk):
+                        return
+                put(None)
+            except BaseException as e:
+                put(e)
+
+        parser = threading.Thread(target=parse, daemon=True)
+        parser.start()
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                yield chunk
+        finally:
+            stop.set()
+            parser.join()
+            stream.close()
+
+    def testSolutionStream(self, filename, verbose, chunkSize=STREAM_CHUNK_SIZE, firstTestNo=1):
+        """
+            Runs every test against a solution file while it is being read, without
+            loading the whole path: memory use depends on the chunk size and the number of
+            failures, not the path length. The loaded problem is used, but the solution
+            in self.ps is left untouched.
+
+            @param filename the solution file to check
+
+            @param verbose whether to output more information about the tests on failure
+
+            @param chunkSize the number of configs parsed and checked together
+
+            @param firstTestNo the number of the first test printed
+
+            @return the number of tests that failed
+
+            @throws IOError if the solution file is missing or malformed
+        """
+        validator = FusedValidator.FusedValidator(self)
+        stream = self.ps.iterSolution(filename, chunkSize)
+        with Stats.span("test:stream"):
+            for chunk in self.streamChunks(stream):
+                validator.feed(chunk)
+        return (validator.report(verbose, firstTestNo, claimedCost=stream.cost))
+
+    def testAll(self, verbose, firstTestNo=1, solutionTests=True):
+        """
+            Runs every test against the loaded solution in a single pass over the path
+            (see FusedValidator), printing the same reports as calling testByName for
+            each test in turn
+
+            @param verbose whether to output more information about the tests on failure
+
+            @param firstTestNo the number of the first test printed
+
+            @param solutionTests whether to include the initial, goal, steps and cost tests
+
+            @return the number of tests that failed
+        """
+        validator = FusedValidator.FusedValidator(self)
+        with Stats.span("test:all"):
+            validator.validate(self.ps.getPath())
+        return (validator.report(verbose, firstTestNo, solutionTests=solutionTests))
+
+    def testAllParallel(self, verbose, workers=None, firstTestNo=1, solutionTests=True):
+        """
+            testAll split across a pool of processes sharing the path through shared
+            memory (see ParallelValidator); prints the same reports
+
+            @param workers the number of processes, by default one per CPU
+
+            @return the number of tests that failed
+        """
+        return (ParallelValidator.validate(self, verbose, workers, firstTestNo, solutionTests))
 
     def testByName(self, testName, testNo, verbose):
+        """
+            Runs a test by its name, recording it as a span if Stats is enabled
+        """
+        with Stats.span("test:" + testName):
+            return (self.runTest(testName, testNo, verbose))
+
+    def runTest(self, testName, testNo, verbose):
         """
             Runs a test by its name
         """
         if (testName == "initial"):
-            return testInitialFirst(testNo, verbose)
+            return self.testInitialFirst(testNo, verbose)
         elif (testName == "goal"):
-        	return testGoalLast(testNo, verbose)
+            return self.testGoalLast(testNo, verbose)
         elif (testName == "steps"):
-        	return testValidSteps(testNo, verbose)
+            return self.testValidSteps(testNo, verbose)
         elif (testName == "booms"):
-        	return testBoomLengths(testNo, verbose)
+            return self.testBoomLengths(testNo, verbose)
         elif (testName == "convexity"):
-        	return testConvexity(testNo, verbose)
+            return self.testConvexity(testNo, verbose)
         elif (testName == "areas"):
-        	return testAreas(testNo, verbose)
+            return self.testAreas(testNo, verbose)
         elif (testName == "bounds"):
-        	return testBounds(testNo, verbose)
+            return self.testBounds(testNo, verbose)
         elif (testName == "collisions"):
-        	return testCollisions(testNo, verbose)
+            return self.testCollisions(testNo, verbose)
         elif (testName == "cost"):
-        	return testTotalCost(testNo, verbose)
+            return self.testTotalCost(testNo, verbose)
+        elif (testName == "sweep"):
+            return self.testSweptCollisions(testNo, verbose)
         return (True)
+
+def main(args):
+    """
+        The command line tester, as the main of the java Tester:
+
+            python -m Tester [-e maxError] [-v] [-c] [-j report.json] [-p workers]
+                [-t trace.json] problem-file [solution-file]
+
+        Without a solution file, the direct path from initial to goal is checked and
+        only the state tests run. -j also writes the verdicts, failing index ranges
+        and per-test timings as JSON (see FusedValidator.summary); -p checks the path
+        on that many processes (see ParallelValidator); -t records where the time
+        goes (see Stats) and writes it as a Chrome trace, and into the JSON report;
+        -c loads the problem through the on-disk ProblemCache.
+
+        @return the number of failed tests, which is the exit status
+    """
+    maxError = Tester.DEFAULT_MAX_ERROR
+    verbose = False
+    useCache = False
+    jsonPath = None
+    tracePath = None
+    workers = 1
+    problemPath = None
+    solutionPath = None
+    i = 0
+    while i < len(args):
+        arg = args[i].strip()
+        if arg in ("-e", "-j", "-p", "-t"):
+            i += 1
+            if i < len(args):
+                if arg == "-e":
+                    maxError = float(args[i])
+                elif arg == "-j":
+                    jsonPath = args[i]
+                elif arg == "-t":
+                    tracePath = args[i]
+                else:
+                    workers = int(args[i])
+        elif arg == "-v":
+            verbose = True
+        elif arg == "-c":
+            useCache = True
+        elif problemPath is None:
+            problemPath = arg
+        else:
+            solutionPath = arg
+        i += 1
+    if problemPath is None:
+        print("Usage: tester [-e maxError] [-v] [-c] [-j report.json] [-p workers] [-t trace.json] "
+              + "problem-file [solution-file]")
+        return (1)
+
+    if tracePath is not None:
+        Stats.enable()
+    print("Test #0: Loading files")
+    started = time.perf_counter()
+    tester = Tester(maxError)
+    try:
+        with Stats.span("load:problem"):
+            tester.ps.loadProblem(problemPath, useCache=useCache)
+    except IOError as e:
+        print("FAILED: Invalid problem file")
+        print(e)
+        return (1)
+
+    if solutionPath is not None:
+        try:
+            with Stats.span("load:solution"):
+                tester.ps.loadSolution(solutionPath)
+        except IOError as e:
+            print("FAILED: Invalid solution file")
+            print(e)
+            return (1)
+    else:
+        tester.ps.assumeDirectSolution()
+    print("Passed.")
+    loaded = time.perf_counter()
+
+    solutionTests = solutionPath is not None
+    with Stats.span("test:all"):
+        if workers == 1:
+            validator = FusedValidator.FusedValidator(tester)
+            validator.validate(tester.ps.getPath())
+        else:
+            validator = ParallelValidator.validatePath(tester, workers)
+    numFailures = validator.report(verbose, solutionTests=solutionTests)
+
+    if jsonPath is not None:
+        summary = validator.summary(solutionTests=solutionTests)
+        summary.update({"problem": problemPath, "solution": solutionPath, "maxError": maxError,
+                        "workers": workers, "loadSeconds": loaded - started,
+                        "validateSeconds": time.perf_counter() - loaded})
+        if tracePath is not None:
+            summary["stats"] = Stats.summary()
+        with open(jsonPath, 'w') as outputFile:
+            json.dump(summary, outputFile, indent=2)
+            outputFile.write("\n")
+    if tracePath is not None:
+        Stats.writeTrace(tracePath)
+    return (numFailures)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
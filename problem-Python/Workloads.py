@@ -0,0 +1,276 @@
+"""
+    Synthetic problems and solutions of any size, valid or deliberately invalid, in python.
+
+    The eight problems in testcases are too small to show how the tester scales;
+    these workloads go up to 10^7 steps and 10^5 obstacles.
+
+    Every config is a regular polygon of booms MIN_BOOM_LENGTH long, so it is convex
+    and has more than the minimum area for any ASV count. The path slides it back
+    and forth along a horizontal corridor through the middle of the workspace,
+    STEP_SIZE per step, for as many steps as asked; the initial and goal states are
+    simply the ends of that path. The obstacles are random rectangles kept clear of
+    the corridor, so the path is valid.
+
+    An invalid workload breaks some configs on purpose, each one in a way that
+    fails the named test (it may fail others as well): "steps", "booms",
+    "convexity", "areas", "bounds" or "collisions"; "cost" writes a wrong cost in
+    the header instead.
+
+    Paths are generated and written a chunk at a time, so the largest workloads
+    never have to fit in memory.
+
+    Run as a script:
+        python -m Workloads [-k asvCount] [-n steps] [-m obstacles] [-s seed] [-b]
+            [-i test,test...] [-f failures] output-directory name
+
+    @author Loreith
+"""
+
+import math
+import os
+import sys
+import numpy as np
+import ProblemSpec
+import SolutionFormat
+import SolutionWriter
+import Tester
+import line2D
+
+#Distance every ASV moves per step; below MAX_STEP with room for rounding
+STEP_SIZE = 0.0009
+#Configs generated together
+CHUNK_SIZE = 65536
+#Space left between the corridor (and the workspace edges) and anything else
+MARGIN = 0.01
+INVALID_TESTS = ["steps", "booms", "convexity", "areas", "bounds", "collisions", "cost"]
+
+def polygonRadius(asvCount):
+    """
+        @return the radius of the regular polygon whose sides are all one boom long
+    """
+    return(Tester.Tester.MIN_BOOM_LENGTH / (2 * math.sin(math.pi / asvCount)))
+
+def regularConfig(asvCount, center):
+    """
+        @return the (k, 2) array of the regular polygon config centred on center
+    """
+    angles = 2 * math.pi * np.arange(asvCount) / asvCount
+    radius = polygonRadius(asvCount)
+    return(np.stack((center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)), axis=1))
+
+def corridor(asvCount):
+    """
+        @return (y, xLow, xHigh): the line the polygon's centre moves along, and the
+            range of x it moves over
+    """
+    radius = polygonRadius(asvCount)
+    return(0.5, radius + MARGIN, 1 - radius - MARGIN)
+
+def centres(asvCount, start, end, stepSize=STEP_SIZE):
+    """
+        @return the x of the polygon's centre at path indices start to end: a triangle
+            wave between the corridor's ends
+    """
+    y, xLow, xHigh = corridor(asvCount)
+    span = xHigh - xLow
+    phase = np.mod(np.arange(start, end) * stepSize, 2 * span)
+    return(xLow + np.where(phase < span, phase, 2 * span - phase))
+
+def pathChunk(asvCount, start, end, stepSize=STEP_SIZE):
+    """
+        @return the (end - start, k, 2) array of configs start to end of the path
+    """
+    shape = regularConfig(asvCount, (0.0, corridor(asvCount)[0]))
+    x = centres(asvCount, start, end, stepSize)
+    chunk = np.repeat(shape[np.newaxis], len(x), axis=0)
+    chunk[..., 0] += x[:, np.newaxis]
+    return(chunk)
+
+def iterPath(asvCount, steps, stepSize=STEP_SIZE, chunkSize=CHUNK_SIZE):
+    """
+        Yields the steps + 1 configs of the path as (n, k, 2) chunks
+    """
+    for start in range(0, steps + 1, chunkSize):
+        yield pathChunk(asvCount, start, min(start + chunkSize, steps + 1), stepSize)
+
+def makeObstacles(asvCount, count, rng):
+    """
+        @return an (count, 4) array of x, y, w, h of random rectangles that keep clear
+            of the corridor; the more there are, the smaller they get
+    """
+    y, xLow, xHigh = corridor(asvCount)
+    gap = polygonRadius(asvCount) + MARGIN
+    size = min(0.1, 0.4 / math.sqrt(max(count, 1)))
+    w = rng.uniform(0.2, 1.0, count) * size
+    h = rng.uniform(0.2, 1.0, count) * size
+    x = rng.uniform(0, 1 - w)
+    #Each one goes in the band above or below the corridor
+    below = rng.random(count) < 0.5
+    bandLow = np.where(below, 0.0, y + gap)
+    bandHigh = np.where(below, y - gap, 1.0) - h
+    oy = bandLow + rng.random(count) * np.maximum(bandHigh - bandLow, 0)
+    return(np.stack((x, oy, w, h), axis=1))
+
+def corrupt(chunk, start, indices, test, rects):
+    """
+        Breaks the configs of chunk whose path indices are in indices, in place
+
+        @param start the path index of chunk[0]
+
+        @param test the test each broken config should fail
+
+        The same arguments always break the configs the same way, so a path can be
+        generated more than once.
+    """
+    for index in indices[(indices >= start) & (indices < start + len(chunk))]:
+        cfg = chunk[index - start]
+        centre = cfg.mean(axis=0)
+        if test == "steps":
+            cfg[:, 0] += 3 * Tester.Tester.MAX_STEP
+        elif test == "booms":
+            cfg[-1] += (cfg[-1] - cfg[-2]) * 0.5
+        elif test == "convexity":
+            #Fold ASV 1 back past ASV 2, making a turn of pi
+            cfg[1] = cfg[2] + (cfg[2] - cfg[0]) * 0.5
+        elif test == "areas":
+            cfg[:] = centre + (cfg - centre) * 0.01
+        elif test == "bounds":
+            cfg[:, 0] -= cfg[:, 0].min() + MARGIN
+        elif test == "collisions" and len(rects):
+            placeAcross(cfg, rects, index % len(rects))
+
+def placeAcross(cfg, rects, first, maxError=Tester.Tester.DEFAULT_MAX_ERROR):
+    """
+        Moves a config so its first boom runs through the centre of an obstacle, in
+        place. A polygon centred on a small obstacle can have it wholly inside, so
+        it is the boom that is put across it. The config is checked against the
+        obstacle shrunk by maxError, as the tester's collision test sees it, and
+        the next obstacle tried if they don't meet (one too small to survive the
+        shrinking).
+
+        @param rects an (M, 4) array of x, y, w, h
+
+        @param first the index of the obstacle to try first
+
+        @throws ValueError if the config can't be made to collide with any of them
+    """
+    midpoint = (cfg[0] + cfg[1]) / 2
+    for i in range(len(rects)):
+        x, y, w, h = rects[(first + i) % len(rects)].tolist()
+        moved = cfg + ((x + w / 2, y + h / 2) - midpoint)
+        bounds = (x + maxError, y + maxError, x + w - maxError, y + h - maxError)
+        if line2D.segmentIntersectsRect(*moved[0], *moved[1], *bounds):
+            cfg[:] = moved
+            return
+    raise ValueError("No obstacle survives shrinking by maxError, so no config can collide")
+
+def writeProblem(filename, initial, goal, rects):
+    """
+        Writes a problem file in the format ProblemSpec.loadProblem reads
+
+        @param rects an (M, 4) array of x, y, w, h
+    """
+    x, y, w, h = np.asarray(rects, dtype=np.float64).reshape(-1, 4).T
+    corners = np.stack((x, y, x + w, y, x + w, y + h, x, y + h), axis=1)
+    with open(filename, 'w') as outputFile:
+        outputFile.write("%d\n" % len(initial))
+        outputFile.write(SolutionWriter.formatChunk(np.stack((initial, goal)), SolutionWriter.DEFAULT_PRECISION))
+        outputFile.write("%d\n" % len(corners))
+        outputFile.write(SolutionWriter.formatChunk(corners.reshape(-1, 4, 2), SolutionWriter.DEFAULT_PRECISION))
+
+def writeWorkload(directory, name, asvCount=7, steps=10**5, obstacles=100, seed=0, binary=False,
+                  invalid=(), failures=10):
+    """
+        Generates a problem and a solution for it and writes them to directory, as
+        name.txt and name-solution.txt (or name-solution.bin with binary)
+
+        @param invalid the tests the solution should fail (see INVALID_TESTS)
+
+        @param failures how many configs to break for each of them
+
+        @return (problem file, solution file)
+    """
+    rng = np.random.default_rng(seed)
+    rects = makeObstacles(asvCount, obstacles, rng)
+    initial = pathChunk(asvCount, 0, 1)[0]
+    goal = pathChunk(asvCount, steps, steps + 1)[0]
+    os.makedirs(directory, exist_ok=True)
+    problemFile = os.path.join(directory, name + ".txt")
+    writeProblem(problemFile, initial, goal, rects)
+
+    #Never the first or last config, so the initial and goal tests still pass
+    broken = [(test, rng.choice(np.arange(1, steps), size=min(failures, max(steps - 1, 0)), replace=False))
+              for test in invalid if test != "cost"]
+
+    def chunks():
+        start = 0
+        for chunk in iterPath(asvCount, steps):
+            for test, indices in broken:
+                corrupt(chunk, start, indices, test, rects)
+            start += len(chunk)
+            yield chunk
+
+    cost = 0.0
+    last = None
+    for chunk in chunks():
+        joined = chunk if last is None else np.concatenate((last, chunk))
+        cost += ProblemSpec.PathArray.fromArray(joined).totalCost()
+        last = chunk[-1:]
+    if "cost" in invalid:
+        cost = cost * 1.01 + 1.0
+
+    if binary:
+        solutionFile = os.path.join(directory, name + "-solution.bin")
+        with open(solutionFile, 'wb') as outputFile:
+            SolutionFormat.writeHeader(outputFile, steps, asvCount, cost)
+            for chunk in chunks():
+                outputFile.write(np.ascontiguousarray(chunk, dtype=SolutionFormat.DATA_TYPE).tobytes())
+    else:
+        solutionFile = os.path.join(directory, name + "-solution.txt")
+        SolutionWriter.writeSolution(solutionFile, (ProblemSpec.PathArray.fromArray(chunk) for chunk in chunks()),
+                                     cost, steps)
+    return(problemFile, solutionFile)
+
+def main(args):
+    asvCount = 7
+    steps = 10**5
+    obstacles = 100
+    seed = 0
+    binary = False
+    invalid = []
+    failures = 10
+    positional = []
+    i = 0
+    while i < len(args):
+        arg = args[i].strip()
+        if arg in ("-k", "-n", "-m", "-s", "-i", "-f") and i + 1 < len(args):
+            i += 1
+            value = args[i]
+            if arg == "-k":
+                asvCount = int(value)
+            elif arg == "-n":
+                steps = int(float(value))
+            elif arg == "-m":
+                obstacles = int(float(value))
+            elif arg == "-s":
+                seed = int(value)
+            elif arg == "-i":
+                invalid = [test for test in value.split(",") if test]
+            else:
+                failures = int(value)
+        elif arg == "-b":
+            binary = True
+        else:
+            positional.append(arg)
+        i += 1
+    if len(positional) != 2 or any(test not in INVALID_TESTS for test in invalid):
+        print("Usage: Workloads [-k asvCount] [-n steps] [-m obstacles] [-s seed] [-b] "
+              + "[-i " + ",".join(INVALID_TESTS) + "] [-f failures] output-directory name")
+        return(1)
+    for filename in writeWorkload(positional[0], positional[1], asvCount, steps, obstacles, seed, binary,
+                                  invalid, failures):
+        print(filename)
+    return(0)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
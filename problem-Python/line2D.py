@@ -1,5 +1,10 @@
 import math
-from shapely.geometry import LineString
+import numpy as np
+import Stats
+
+#Segment and rectangle pairs clipped at once by firstCollisions; each pair takes
+#around a hundred bytes of temporaries
+COLLISION_BLOCK_SIZE = 1 << 18
 
 class Line2D:
     """
@@ -8,7 +13,9 @@ class Line2D:
         This has been stripped down to only the methods required for the supporting code
         so as to avoid collusion.
 
-        Uses the shapely library for line section collision detection.
+        Segment-rectangle intersection is done by Liang-Barsky clipping, on plain
+        floats for one segment (intersectsRect) or on numpy arrays for many at once
+        (segmentsIntersectRects).
     """
     def __init__(self, c0, c1):
         """
@@ -80,7 +87,9 @@ class Line2D:
 
     def intersectsRect(self, rect):
         """
-            Determines Whether the line intersects the rectangle or not
+            Determines Whether the line intersects the rectangle or not, as java's
+            Line2D.intersects: touching the rectangle's edge counts, and a rectangle
+            with no width or height is never intersected
 
             @param rect
                 The rectangle to compare to
@@ -88,43 +97,142 @@ class Line2D:
             @return
                 Whether the line intersects the rectangle or not
         """
-        midpoint = (self.c0[0]+0.5*self.c1[0], self.c0[1]+0.5*self.c1[1])
-        length = math.sqrt((self.c1[0]-self.c0[0])**2 + (self.c1[1]-self.c0[1])**2)
+        r = rect.getRect()
+        return (segmentIntersectsRect(self.c0[0], self.c0[1], self.c1[0], self.c1[1],
+                                      r[0], r[1], r[0] + r[2], r[1] + r[3]))
 
+def segmentIntersectsRect(x0, y0, x1, y1, xMin, yMin, xMax, yMax):
+    """
+        Liang-Barsky clipping of the segment (x0,y0)-(x1,y1) against the closed
+        rectangle [xMin, xMax] x [yMin, yMax]: the segment is P(t) = P0 + t(P1 - P0)
+        for t in [0, 1], each side of the rectangle cuts off the t where the segment is
+        outside it, and the segment intersects if any t is left.
 
-        if rect.distance(midpoint) > length:
+        @return whether the segment intersects the rectangle
+    """
+    if Stats.enabled:
+        Stats.count("segmentRectTests")
+    if xMax <= xMin or yMax <= yMin:
+        return (False)
+    if max(x0, x1) < xMin or min(x0, x1) > xMax or max(y0, y1) < yMin or min(y0, y1) > yMax:
+        if Stats.enabled:
+            Stats.count("broadPhaseRejections")
+        return (False)
+
+    tEnter = 0.0
+    tExit = 1.0
+    for p, q in ((x0 - x1, x0 - xMin), (x1 - x0, xMax - x0), (y0 - y1, y0 - yMin), (y1 - y0, yMax - y0)):
+        if p == 0:
+            if q < 0:
+                return (False) #Parallel to this side and outside it
+        elif p < 0:
+            tEnter = max(tEnter, q / p)
+        else:
+            tExit = min(tExit, q / p)
+        if tEnter > tExit:
             return (False)
-        elif rect.distance(midpoint) <= 0:
-            return (True) #Point inside rectangle
+    return (True)
 
+def rectBounds(rects):
+    """
+        @param rects a list of Rectangle2Ds (or anything with getRect() giving x, y, w, h)
 
-        vect = rect.outcode(midpoint)
-        r = rect.getRect()
+        @return an (M, 4) array of xMin, yMin, xMax, yMax
+    """
+    r = np.array([rect.getRect() for rect in rects], dtype=np.float64).reshape(-1, 4)
+    return (np.hstack((r[:, :2], r[:, :2] + r[:, 2:])))
 
-        line = LineString([self.c0,self.c1])
+def slab(start, delta, low, high):
+    """
+        @return the (entering, leaving) t at which start + t * delta crosses the slab
+            low <= x <= high along one axis; (-inf, inf) or (inf, -inf) when delta is
+            0, depending on whether start is inside the slab
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tLow = (low - start) / delta
+        tHigh = (high - start) / delta
+    moving = delta != 0
+    inside = (start >= low) & (start <= high)
+    still = np.where(inside, np.inf, -np.inf)
+    return (np.where(moving, np.minimum(tLow, tHigh), -still), np.where(moving, np.maximum(tLow, tHigh), still))
+
+def segmentsIntersectRects(starts, ends, bounds):
+    """
+        segmentIntersectsRect over arrays of segments and rectangles at once, by the
+        same clipping done one axis (slab) at a time
 
-        if vect[2] == 0:
-            #if dx is 0
-            rectLine = LineString([ (r[0],vect[1]), (r[0] + r[2],vect[1]) ])
+        @param starts an (..., 2) array of segment starts
 
-            return (line.intersects(rectLine))
-        elif vect[3] == 0:
-            #if dy is 0
-            rectLine = LineString([ (vect[0],r[1]), (vect[0],r[1] + r[3]) ])
+        @param ends an (..., 2) array of segment ends
 
-            return (line.intersects(rectLine))
-        elif vect[2] != 0 and vect[3] != 0:
-            #If we are off a corner
-            r1 = vect[0]
-            r2 = vect[1]
+        @param bounds an (..., 4) array of rectangle xMin, yMin, xMax, yMax (see rectBounds)
 
-            r1 += r[2] if vect[1] == r[1] else -r[2]
-            r2 += r[3] if vect[0] == r[0] else -r[3]
+        @return a boolean array of the broadcast shape of the three, without their
+            last axes
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    deltas = np.asarray(ends, dtype=np.float64) - starts
+    bounds = np.asarray(bounds, dtype=np.float64)
+    if Stats.enabled:
+        Stats.count("segmentRectTests", int(np.prod(np.broadcast_shapes(starts.shape[:-1], bounds.shape[:-1]))))
+    enterX, exitX = slab(starts[..., 0], deltas[..., 0], bounds[..., 0], bounds[..., 2])
+    enterY, exitY = slab(starts[..., 1], deltas[..., 1], bounds[..., 1], bounds[..., 3])
+    tEnter = np.maximum(np.maximum(enterX, enterY), 0.0)
+    tExit = np.minimum(np.minimum(exitX, exitY), 1.0)
+    return ((tEnter <= tExit) & (bounds[..., 2] > bounds[..., 0]) & (bounds[..., 3] > bounds[..., 1]))
+
+def firstCollisions(path, bounds, blockSize=COLLISION_BLOCK_SIZE):
+    """
+        Tests every boom of every config of a path against every rectangle, over
+        blocks of configs and rectangles of about blockSize boom and rectangle
+        pairs, so memory use is bounded however long the path. Each block first
+        compares every config's bounding box with every rectangle at once, then
+        clips all the booms of the overlapping pairs with one broadcast
+        segmentsIntersectRects.
 
-            rectLine1 = LineString([ (vect[0],vect[1]), (r1,vect[1]) ])
-            rectLine2 = LineString([ (vect[0],vect[1]), (vect[0],r2) ])
+        @param path an (N, k, 2) array
 
+        @param bounds an (M, 4) array of rectangle xMin, yMin, xMax, yMax
 
-            return (line.intersects(rectLine1) or line.intersects(rectLine2))
-        else:
-            return (True) #This shouldn't happen: we have already tested for this
+        @return a length-N integer array: the index of the first rectangle (in
+            bounds' order) that some boom of the config intersects, or -1 if none
+    """
+    path = np.asarray(path, dtype=np.float64)
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    first = np.full(len(path), -1, dtype=np.intp)
+    booms = path.shape[1] - 1 if path.ndim == 3 else 0
+    if booms <= 0 or len(bounds) == 0:
+        return (first)
+    rectBlock = max(1, min(len(bounds), blockSize // booms))
+    configBlock = max(1, blockSize // (booms * rectBlock))
+    for start in range(0, len(path), configBlock):
+        chunk = path[start:start + configBlock]
+        found = first[start:start + configBlock]
+        low = chunk.min(axis=1)
+        high = chunk.max(axis=1)
+        for offset in range(0, len(bounds), rectBlock):
+            b = bounds[offset:offset + rectBlock]
+            overlap = ((low[:, np.newaxis, 0] <= b[:, 2]) & (high[:, np.newaxis, 0] >= b[:, 0])
+                       & (low[:, np.newaxis, 1] <= b[:, 3]) & (high[:, np.newaxis, 1] >= b[:, 1]))
+            overlap[found >= 0] = False
+            #Row-major, so grouped by config with rectangles in order
+            config, rect = np.nonzero(overlap)
+            if Stats.enabled:
+                Stats.count("broadPhaseRejections", (overlap.size - len(config)) * booms)
+            hits = np.flatnonzero(segmentsIntersectRects(chunk[config, :-1], chunk[config, 1:],
+                                                         b[rect, np.newaxis]).any(axis=1))
+            firstHits = hits[np.r_[True, config[hits][1:] != config[hits][:-1]]] if len(hits) else hits
+            found[config[firstHits]] = offset + rect[firstHits]
+    return (first)
+    rectBlock = max(1, min(len(bounds), blockSize // booms))
+    configBlock = max(1, blockSize // (booms * rectBlock))
+    for start in range(0, len(path), configBlock):
+        chunk = path[start:start + configBlock]
+        found = first[start:start + configBlock]
+        for low in range(0, len(bounds), rectBlock):
+            #(configs, booms, rects), then whether any boom hits each rect
+            hits = segmentsIntersectRects(chunk[:, :-1, np.newaxis], chunk[:, 1:, np.newaxis],
+                                          bounds[low:low + rectBlock]).any(axis=1)
+            new = (found < 0) & hits.any(axis=1)
+            found[new] = low + hits[new].argmax(axis=1)
+    return (first)
@@ -0,0 +1,62 @@
+"""
+    Shared fixtures for the tests of the python tester. The modules are imported by
+    name, as when running python -m Tester from problem-Python.
+
+    @author Loreith
+"""
+
+import os
+import sys
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+TESTCASES = os.path.join(os.path.dirname(os.path.dirname(HERE)), "testcases")
+
+import ProblemCache
+import Tester
+import Workloads
+
+def problemFile(name):
+    """
+        @return the path of a problem in the testcases directory
+    """
+    return(os.path.join(TESTCASES, name))
+
+def loadTester(name, maxError=Tester.Tester.DEFAULT_MAX_ERROR):
+    """
+        @return a Tester with the testcase loaded and its direct path as the solution
+    """
+    tester = Tester.Tester(maxError)
+    tester.ps.loadProblem(problemFile(name))
+    tester.ps.assumeDirectSolution()
+    return(tester)
+
+def loadWorkload(workload):
+    """
+        @return a Tester with a workload's problem and solution loaded
+    """
+    tester = Tester.Tester()
+    tester.ps.loadProblem(workload[0])
+    tester.ps.loadSolution(workload[1])
+    return(tester)
+
+@pytest.fixture(scope="session")
+def workload(tmp_path_factory):
+    """
+        A problem and a solution that fails every test on a few configs, as
+        (problem file, solution file)
+    """
+    directory = str(tmp_path_factory.mktemp("workload"))
+    return(Workloads.writeWorkload(directory, "broken", steps=3000, obstacles=50, seed=1,
+                                   invalid=Workloads.INVALID_TESTS, failures=5))
+
+@pytest.fixture
+def cacheDir(tmp_path, monkeypatch):
+    """
+        Points the ProblemCache at an empty directory, with nothing held in memory
+    """
+    monkeypatch.setattr(ProblemCache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(ProblemCache, "entries", {})
+    monkeypatch.setattr(ProblemCache, "warned", False)
+    return(tmp_path / "cache")
@@ -0,0 +1,66 @@
+"""
+    Batch validation: each pair's result, in order, with one bad pair unable to
+    stop the rest, and each problem's pairs handed to one worker.
+
+    @author Loreith
+"""
+
+import BatchValidator
+import SolutionFormat
+import Tester
+from conftest import problemFile
+
+class RecordingPool:
+    """
+        Stands in for multiprocessing.Pool, running the tasks in this process and
+        keeping them
+    """
+    tasks = []
+
+    def __init__(self, workers):
+        pass
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *exc):
+        return(False)
+
+    def map(self, function, tasks, chunksize=None):
+        RecordingPool.tasks = list(tasks)
+        return([function(task) for task in tasks])
+
+def testBatchIsolatesBadPairs(workload, tmp_path):
+    junk = str(tmp_path / "junk.txt")
+    with open(junk, 'wb') as f:
+        f.write(b"\xff\xfe\x00 not a problem")
+    manifest = str(tmp_path / "manifest.txt")
+    with open(manifest, 'w') as f:
+        f.write("# problem solution\n%s\n%s %s\n%s\n" % (junk, workload[0], workload[1], problemFile("3ASV.txt")))
+
+    pairs = BatchValidator.readManifest(manifest)
+    results = BatchValidator.validateAll(pairs, workers=2)
+    assert [r["problem"] for r in results] == [p for p, s in pairs]
+    assert "error" in results[0] and results[0]["error"].startswith("Could not load problem")
+    assert not results[1]["passed"] and "error" not in results[1]
+    assert results[2]["passed"]
+
+def testBatchReportsMismatchedSolution(tmp_path):
+    seven = Tester.Tester()
+    seven.ps.loadProblem(problemFile("7ASV.txt"))
+    seven.ps.assumeDirectSolution()
+    solution = str(tmp_path / "seven.bin")
+    SolutionFormat.writeBinary(solution, seven.ps.getPath(), seven.ps.getSolutionCost())
+    result = BatchValidator.checkPair((problemFile("3ASV.txt"), solution, Tester.Tester.DEFAULT_MAX_ERROR, False))
+    assert result["error"].startswith("Invalid solution file")
+
+def testPairsAreGroupedByProblem(workload, monkeypatch):
+    monkeypatch.setattr(BatchValidator.multiprocessing, "Pool", RecordingPool)
+    three, seven = problemFile("3ASV.txt"), problemFile("7ASV.txt")
+    pairs = [(three, None), (workload[0], workload[1]), (seven, None), (workload[0], None),
+             (three, None), (workload[0], workload[1])]
+    results = BatchValidator.validateAll(pairs, workers=2)
+    assert sorted((task[0], task[1]) for task in RecordingPool.tasks) == sorted(
+        [(three, [None, None]), (workload[0], [workload[1], None, workload[1]]), (seven, [None])])
+    assert [(r["problem"], r["solution"]) for r in results] == pairs
+    assert [r["passed"] for r in results] == [True, False, True, True, True, False]
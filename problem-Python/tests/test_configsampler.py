@@ -0,0 +1,31 @@
+"""
+    Sampled configs pass every config test, and the sampler gives up on a region
+    it cannot fill.
+
+    @author Loreith
+"""
+
+import pytest
+import ConfigSampler
+import Tester
+from conftest import problemFile
+
+@pytest.mark.parametrize("name", ["3ASV.txt", "7ASV.txt", "7-ASV-x6.txt"])
+def testSampledConfigsAreValid(name):
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile(name))
+    sampler = ConfigSampler.ConfigSampler(tester, seed=0)
+    configs = sampler.sample(500, batchSize=4096)
+    assert configs.shape == (500, tester.ps.getASVCount(), 2)
+    for mask in (tester.validBoomMask, tester.convexMask, tester.enoughAreaMask, tester.fitsBoundsMask,
+                 tester.collisionFreeMask):
+        assert mask(configs).all()
+    assert 0 < sampler.getAcceptanceRate() <= 1
+
+def testSamplerGivesUpOnAFullRegion():
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile("7ASV.txt"))
+    sampler = ConfigSampler.ConfigSampler(tester, region=(-2, -2, 0.5, 0.5), seed=0)
+    sampler.MAX_BATCHES = 3
+    with pytest.raises(ValueError):
+        sampler.sample(10, batchSize=256)
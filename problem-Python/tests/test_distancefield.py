@@ -0,0 +1,46 @@
+"""
+    The DistanceField's bounds and clearances against the exact distance to every
+    obstacle.
+
+    @author Loreith
+"""
+
+import numpy as np
+import DistanceField
+import Obstacle
+import ObstacleSet
+import Tester
+from conftest import problemFile
+
+def exactClearance(points, bounds):
+    return(Obstacle.nearestPoints(points[:, np.newaxis], bounds)[0].min(axis=1))
+
+def testDistanceFieldBoundsClearance():
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile("7-ASV-x6.txt"))
+    field = tester.getDistanceField(64)
+    points = np.random.default_rng(1).uniform(0, 1, (3000, 2))
+    exact = exactClearance(points, tester.getObstacleSet().bounds)
+
+    lower, upper = field.interval(points)
+    assert (lower <= exact + 1e-12).all() and (exact <= upper + 1e-12).all()
+    assert (exact - lower <= field.errorBound + 1e-12).all()
+    clearance = field.clearance(points)
+    assert (clearance <= exact + 1e-12).all()
+    assert (exact - clearance <= field.errorBound + 1e-12).all()
+    for required in (0.0, 0.01, 0.05):
+        assert (field.isClear(points, required) == (exact >= required)).all()
+    assert tester.getDistanceField(64) is field
+
+def testDistanceFieldWithoutObstacles():
+    field = DistanceField.DistanceField(ObstacleSet.ObstacleSet([]), resolution=8)
+    assert np.isinf(field.clearance(np.array([[0.5, 0.5]]))).all()
+
+def testSavedFieldMatches():
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile("7ASV.txt"))
+    field = tester.getDistanceField(32)
+    again = DistanceField.DistanceField.fromArrays(field.toArrays())
+    points = np.random.default_rng(2).uniform(0, 1, (1000, 2))
+    assert again.errorBound == field.errorBound
+    assert (again.clearance(points) == field.clearance(points)).all()
@@ -0,0 +1,29 @@
+"""
+    The fused single pass finds exactly what the separate tests find.
+
+    @author Loreith
+"""
+
+import FusedValidator
+from conftest import loadWorkload
+
+def testFusedMatchesSeparateTests(workload):
+    tester = loadWorkload(workload)
+    validator = FusedValidator.FusedValidator(tester)
+    validator.validate(tester.ps.getPath(), chunkSize=700)
+    separate = {"steps": tester.getInvalidSteps(), "booms": tester.getInvalidBoomStates(),
+                "convexity": tester.getNonConvexStates(), "areas": tester.getInvalidAreaStates(),
+                "bounds": tester.getOutOfBoundsStates(), "collisions": tester.getCollidingStates()}
+    for name, bad in separate.items():
+        assert list(validator.getFailures(name)) == list(bad), name
+        assert bad, name
+    assert not [passed for name, passed, bad, total, args in validator.outcomes() if name == "cost"][0]
+
+def testFusedReportMatchesTestByName(workload, capsys):
+    tester = loadWorkload(workload)
+    failed = tester.testAll(True)
+    fused = capsys.readouterr().out
+    separate = [tester.testByName(name, i + 1, True)
+                for i, name in enumerate(tester.SOLUTION_TESTS + tester.STATE_TESTS)]
+    assert capsys.readouterr().out == fused
+    assert failed == separate.count(False)
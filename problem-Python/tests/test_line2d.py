@@ -0,0 +1,32 @@
+"""
+    The broadcast collision kernel against the one-segment, one-rectangle test.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import line2D
+
+def bruteFirstCollisions(path, bounds):
+    return(np.array([next((j for j in range(len(bounds)) if any(
+        line2D.segmentIntersectsRect(*cfg[b], *cfg[b + 1], *bounds[j]) for b in range(len(cfg) - 1))), -1)
+        for cfg in path.tolist()]))
+
+@pytest.mark.parametrize("blockSize", [1, 7, 64, 1 << 16])
+def testFirstCollisionsMatchOneAtATime(blockSize):
+    rng = np.random.default_rng(blockSize)
+    low = rng.uniform(0, 0.9, (40, 2))
+    bounds = np.hstack((low, low + rng.uniform(0.01, 0.1, (40, 2))))
+    #An obstacle shrunk to nothing, and one another's boom only touches
+    bounds[3, 2:] = bounds[3, :2]
+    path = rng.uniform(0, 0.1, (300, 4, 2)) + rng.uniform(0, 0.9, (300, 1, 2))
+    path[0, :2] = [[bounds[5, 0] - 0.05, bounds[5, 3]], [bounds[5, 0], bounds[5, 3]]]
+    expected = bruteFirstCollisions(path, bounds)
+    assert expected[0] >= 0 and (expected >= 0).any() and (expected < 0).any()
+    assert (line2D.firstCollisions(path, bounds, blockSize) == expected).all()
+
+def testFirstCollisionsWithoutBoomsOrRectangles():
+    path = np.full((5, 3, 2), 0.5)
+    assert (line2D.firstCollisions(path, np.zeros((0, 4))) == -1).all()
+    assert (line2D.firstCollisions(path[:, :1], np.array([[0, 0, 1, 1]])) == -1).all()
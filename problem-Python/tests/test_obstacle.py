@@ -0,0 +1,61 @@
+"""
+    Batched point queries against Obstacle's one-point distance and outcode, and
+    nearest obstacles leaving out those shrunk to nothing.
+
+    @author Loreith
+"""
+
+import math
+import numpy as np
+import pytest
+import DistanceField
+import Obstacle
+import ObstacleGrid
+import ObstacleSet
+import Rectangle2D
+
+POINTS = [(0.1, 0.1), (0.35, 0.1), (0.1, 0.6), (0.4, 0.55), (0.25, 0.3), (0.25, 0.7), (0.0, 0.35)]
+
+def testObstacleDistancePastCorner():
+    obstacle = Obstacle.Obstacle(0.2, 0.2, 0.1, 0.3)
+    rect = Rectangle2D.Rectangle2D(0.2, 0.2, 0.1, 0.3)
+    for point in POINTS:
+        expected = Obstacle.nearestPoints(point, (0.2, 0.2, 0.3, 0.5))[0]
+        assert obstacle.distance(point) == pytest.approx(expected)
+        assert rect.distance(point) == pytest.approx(expected)
+    assert obstacle.distance((0.1, 0.1)) == pytest.approx(math.hypot(0.1, 0.1))
+
+def testBatchedQueriesMatchOnePointAtATime():
+    obstacle = Obstacle.Obstacle(0.2, 0.2, 0.1, 0.3)
+    points = np.array([p for p in POINTS if p not in obstacle])
+    assert obstacle.distances(points) == pytest.approx([obstacle.distance(p) for p in points.tolist()])
+    assert np.allclose(obstacle.outcodes(points), [obstacle.outcode(p) for p in points.tolist()])
+    assert obstacle.distances(np.array([[0.25, 0.3]]))[0] == 0
+
+def testNearestLeavesOutEmptyRectangles():
+    #The first is shrunk to nothing, right where the points are
+    bounds = np.array([[0.5, 0.5, 0.5 - 1e-6, 0.5 - 1e-6], [0.8, 0.8, 0.9, 0.9]])
+    points = np.array([[0.5, 0.5], [0.49, 0.51], [1.5, -0.5]])
+    expected = Obstacle.nearestPoints(points, bounds[1])[0]
+
+    grid = ObstacleGrid.ObstacleGrid(bounds)
+    distances, indices = grid.nearestMany(points)
+    assert np.allclose(distances, expected) and (indices == 1).all()
+    for point, distance in zip(points.tolist(), expected):
+        assert grid.nearest(point) == (pytest.approx(distance), 1)
+    assert grid.candidates(0.4, 0.4, 0.6, 0.6) == []
+
+    obstacles = ObstacleSet.ObstacleSet([Obstacle.Obstacle(0.5, 0.5, 2e-4 - 1e-6, 2e-4 - 1e-6),
+                                         Obstacle.Obstacle(0.8, 0.8, 0.1, 0.1)], 1e-4)
+    assert obstacles.nearestPoints(points)[3].tolist() == [1, 1, 1]
+    field = DistanceField.DistanceField(obstacles, resolution=16)
+    assert field.isClear(points[:2], 0.1).all()
+    exact = obstacles.nearestPoints(points[:2])[0]
+    clearance = field.clearance(points[:2])
+    assert (clearance <= exact).all() and (exact - clearance <= field.errorBound).all()
+
+def testNothingButEmptyRectangles():
+    grid = ObstacleGrid.ObstacleGrid(np.array([[0.5, 0.5, 0.4, 0.6]]))
+    assert grid.nearest((0.5, 0.5)) == (math.inf, -1)
+    distances, indices = grid.nearestMany(np.array([[0.5, 0.5]]))
+    assert np.isinf(distances).all() and (indices == -1).all()
@@ -0,0 +1,77 @@
+"""
+    The grid's collisions, candidates and nearest obstacles against brute force
+    over every rectangle.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import Obstacle
+import ObstacleGrid
+import line2D
+
+def randomBounds(count, seed):
+    """
+        @return an (count, 4) array of random rectangles in the unit square
+    """
+    rng = np.random.default_rng(seed)
+    low = rng.uniform(0, 0.95, (count, 2))
+    return(np.hstack((low, low + rng.uniform(0.002, 0.05, (count, 2)))))
+
+def randomPath(count, asvCount, seed):
+    rng = np.random.default_rng(seed)
+    return(rng.uniform(0, 0.08, (count, asvCount, 2)) + rng.uniform(0, 0.9, (count, 1, 2)))
+
+def bruteNearest(points, bounds):
+    distances = Obstacle.nearestPoints(points[:, np.newaxis], bounds)[0]
+    return(distances.min(axis=1), distances.argmin(axis=1))
+
+@pytest.mark.parametrize("count", [0, 5, 300, 2000])
+def testGridCollisionsMatchBruteForce(count):
+    bounds = randomBounds(count, count)
+    path = randomPath(3000, 4, count)
+    grid = ObstacleGrid.ObstacleGrid(bounds)
+    #The grid itself, however few the rectangles
+    grid.DENSE_LIMIT = -1
+    expected = line2D.firstCollisions(path, bounds, blockSize=1 << 12)
+    assert (grid.firstCollisions(path, chunkSize=500) == expected).all()
+    if count:
+        first = np.array([next((j for j in range(count) if any(
+            line2D.segmentIntersectsRect(*cfg[b], *cfg[b + 1], *bounds[j]) for b in range(3))), -1)
+            for cfg in path[:200].tolist()])
+        assert (expected[:200] == first).all()
+
+def testGridCandidatesCoverOverlaps():
+    bounds = randomBounds(500, 3)
+    grid = ObstacleGrid.ObstacleGrid(bounds)
+    boxes = randomBounds(200, 4)
+    box, rect = grid.candidatePairs(boxes)
+    pairs = set(zip(box.tolist(), rect.tolist()))
+    assert len(pairs) == len(box)
+    for i, (x0, y0, x1, y1) in enumerate(boxes.tolist()):
+        overlapping = np.flatnonzero((bounds[:, 0] <= x1) & (bounds[:, 2] >= x0)
+                                     & (bounds[:, 1] <= y1) & (bounds[:, 3] >= y0))
+        assert set((i, j) for j in overlapping.tolist()) <= pairs
+        assert set(overlapping.tolist()) <= set(grid.candidates(x0, y0, x1, y1))
+
+@pytest.mark.parametrize("count", [1, 50, 3000])
+def testNearestMatchesBruteForce(count):
+    bounds = randomBounds(count, count)
+    grid = ObstacleGrid.ObstacleGrid(bounds)
+    points = np.random.default_rng(count).uniform(-0.2, 1.2, (400, 2))
+    expected, which = bruteNearest(points, bounds)
+    distances, indices = grid.nearestMany(points)
+    assert np.allclose(distances, expected)
+    assert (indices == which).all()
+    for point, distance, index in list(zip(points.tolist(), expected, which))[:50]:
+        assert grid.nearest(point) == (pytest.approx(distance), index)
+
+def testSavedGridAnswersTheSame():
+    bounds = randomBounds(300, 5)
+    grid = ObstacleGrid.ObstacleGrid(bounds)
+    again = ObstacleGrid.ObstacleGrid.fromArrays(bounds, grid.toArrays())
+    grid.DENSE_LIMIT = again.DENSE_LIMIT = -1
+    path = randomPath(500, 4, 5)
+    assert (again.firstCollisions(path) == grid.firstCollisions(path)).all()
+    assert again.candidates(0.2, 0.2, 0.3, 0.3) == grid.candidates(0.2, 0.2, 0.3, 0.3)
@@ -0,0 +1,41 @@
+"""
+    The compiled ObstacleSet against the Tester's own growing of each obstacle.
+
+    @author Loreith
+"""
+
+import numpy as np
+import Obstacle
+import ObstacleSet
+import Tester
+from conftest import problemFile
+
+def testObstacleSetFromTestcase():
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile("7-ASV-x6.txt"))
+    obstacles = tester.getObstacleSet()
+    expected = np.array([tester.grow(o.getRect(), -tester.maxError) for o in tester.ps.getObstacles()])
+    assert np.allclose(obstacles.bounds[:, :2], expected[:, :2])
+    assert np.allclose(obstacles.bounds[:, 2:], expected[:, :2] + expected[:, 2:])
+    assert np.allclose([r.getRect() for r in obstacles.getRectangles()], expected)
+    assert (obstacles.corners[:, 0] == obstacles.bounds[:, :2]).all()
+    assert (obstacles.corners[:, 3] == obstacles.bounds[:, 2:]).all()
+    assert obstacles.box == (obstacles.xMin.min(), obstacles.yMin.min(), obstacles.xMax.max(), obstacles.yMax.max())
+
+def testShrunkToNothingNeverCollides():
+    obstacles = ObstacleSet.ObstacleSet([Obstacle.Obstacle(0.2, 0.2, 0.1, 0.1),
+                                         Obstacle.Obstacle(0.5, 0.5, 1e-4, 1e-4)], 1e-4)
+    assert len(obstacles) == 2
+    assert obstacles.xMax[1] < obstacles.xMin[1]
+    #A boom straight through where the second obstacle was
+    path = np.array([[[0.45, 0.45], [0.55, 0.55]], [[0.15, 0.25], [0.35, 0.25]]])
+    assert obstacles.firstCollisions(path).tolist() == [-1, 0]
+
+def testSavedSetMatches():
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile("7ASV.txt"))
+    obstacles = tester.getObstacleSet()
+    again = ObstacleSet.ObstacleSet.fromArrays(obstacles.toArrays())
+    assert again.tolerance == obstacles.tolerance
+    assert (again.bounds == obstacles.bounds).all() and (again.corners == obstacles.corners).all()
+    assert again.box == obstacles.box
@@ -0,0 +1,44 @@
+"""
+    The online validator, fed a config at a time, agrees with the fused pass and
+    rejects configs of the wrong size.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import FusedValidator
+import OnlineValidator
+import Workloads
+from conftest import loadTester, loadWorkload
+
+#Every test a workload can break, apart from the header's cost
+BROKEN = [test for test in Workloads.INVALID_TESTS if test != "cost"]
+
+def testOnlineMatchesFused(workload):
+    tester = loadWorkload(workload)
+    fused = FusedValidator.FusedValidator(tester)
+    fused.validate(tester.ps.getPath())
+    online = OnlineValidator.OnlineValidator(tester)
+    failing = dict((name, []) for name in BROKEN)
+    for i, cfg in enumerate(tester.ps.getPath()):
+        for name in online.push(cfg):
+            failing[name].append(i)
+    #The online steps test reports the config a bad step arrives at
+    assert [i - 1 for i in failing.pop("steps")] == list(fused.getFailures("steps"))
+    for name, bad in failing.items():
+        assert bad == list(fused.getFailures(name)), name
+    assert online.getCost() == pytest.approx(fused.cost)
+    assert not online.isValid()
+
+def testWrongSizedConfigsAreRejected():
+    tester = loadTester("7ASV.txt")
+    online = OnlineValidator.OnlineValidator(tester, swept=True)
+    initial = tester.ps.getInitialState()
+    assert online.push(initial) == []
+    for cfg in (initial.coords[:3], np.vstack((initial.coords, initial.coords[:1])), initial.coords.ravel()):
+        with pytest.raises(ValueError):
+            online.push(cfg)
+    assert online.count == 1
+    assert online.push(initial) == []
+    assert online.getCost() == 0
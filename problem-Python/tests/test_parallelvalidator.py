@@ -0,0 +1,29 @@
+"""
+    Validating one path across processes gives the serial verdicts.
+
+    @author Loreith
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+import FusedValidator
+import ParallelValidator
+from conftest import HERE, loadWorkload
+
+def verdicts(summary):
+    return([(test["name"], test["passed"], test["checked"], test.get("failingRanges")) for test in summary["tests"]])
+
+def testParallelMatchesSerial(workload):
+    tester = loadWorkload(workload)
+    serial = FusedValidator.FusedValidator(tester)
+    serial.validate(tester.ps.getPath())
+    parallel = ParallelValidator.validatePath(tester, workers=3)
+    assert verdicts(parallel.summary()) == verdicts(serial.summary())
+    assert parallel.cost == pytest.approx(serial.cost)
+
+def testImportingDoesNotNeedTester():
+    #In a fresh interpreter, as python -m ParallelValidator would
+    code = "import sys, ParallelValidator; sys.exit('Tester' in sys.modules)"
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(HERE), check=True)
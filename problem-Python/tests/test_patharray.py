@@ -0,0 +1,34 @@
+"""
+    PathArray's whole-path metrics against the per-config ASVConfig ones, and the
+    read-only path a ProblemSpec hands out.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import ProblemSpec
+from conftest import loadTester
+
+def testMetricsMatchConfigs():
+    rng = np.random.default_rng(0)
+    path = ProblemSpec.PathArray(rng.uniform(0, 1, (20, 4, 2)))
+    configs = list(path)
+    assert path.maxDisplacements() == pytest.approx([a.maxDistance(b) for a, b in zip(configs, configs[1:])])
+    assert path.stepCosts() == pytest.approx([a.totalDistance(b) for a, b in zip(configs, configs[1:])])
+    assert path.totalCost() == pytest.approx(sum(a.totalDistance(b) for a, b in zip(configs, configs[1:])))
+    assert len(ProblemSpec.PathArray(configs[:1]).maxDisplacements()) == 0
+
+def testPathIsReadOnly():
+    tester = loadTester("3ASV.txt")
+    path = tester.ps.getPath()
+    with pytest.raises(ValueError):
+        path.data[0] = 0
+    with pytest.raises(ValueError):
+        path[0].coords[0] = 0
+    with pytest.raises(ValueError):
+        path[1:].data[0] = 0
+
+    path.splice(0, 1, [])
+    assert len(path) == 1
+    assert len(tester.ps.getPath()) == 2
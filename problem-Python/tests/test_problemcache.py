@@ -0,0 +1,141 @@
+"""
+    The on-disk ProblemCache: hits, rebuilding outdated entries, what is keyed, and
+    what it refuses to load.
+
+    @author Loreith
+"""
+
+import json
+import os
+import shutil
+import stat
+import numpy as np
+import pytest
+import DistanceField
+import ObstacleSet
+import ProblemCache
+import ProblemSpec
+import Tester
+from conftest import problemFile
+
+def loadCached(filename):
+    ps = ProblemSpec.ProblemSpec()
+    ps.loadProblem(filename, useCache=True)
+    return(ps)
+
+def entryFile(cacheDir):
+    files = os.listdir(str(cacheDir))
+    assert len(files) == 1
+    return(os.path.join(str(cacheDir), files[0]))
+
+def rewriteEntry(cacheDir, **changes):
+    """
+        Changes fields of the header of the only entry on disk and forgets it in memory
+    """
+    path = entryFile(cacheDir)
+    with np.load(path) as data:
+        arrays = dict((name, data[name]) for name in data.files)
+    header = json.loads(arrays["header"].tobytes().decode("utf-8"))
+    header.update(changes)
+    arrays["header"] = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+    ProblemCache.entries.clear()
+
+def testCacheMatchesParsing(cacheDir):
+    filename = problemFile("7-ASV-x6.txt")
+    parsed = ProblemSpec.ProblemSpec()
+    parsed.loadProblem(filename)
+    for i in range(2):
+        ps = loadCached(filename)
+        ProblemCache.entries.clear()
+        assert ps.cacheKey is not None
+        assert ps.asvCount == parsed.asvCount
+        assert ps.initialState.maxDistance(parsed.initialState) == 0
+        assert ps.goalState.maxDistance(parsed.goalState) == 0
+        assert [o.getRect() for o in ps.obstacles] == [o.getRect() for o in parsed.obstacles]
+    assert ProblemCache.entryPath(ps.cacheKey).endswith(".npz")
+    assert os.path.exists(ProblemCache.entryPath(ps.cacheKey))
+
+def testDerivedDataIsCached(cacheDir):
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile("7-ASV-x6.txt"), useCache=True)
+    built = tester.getObstacleSet()
+    field = tester.getDistanceField(32)
+    ProblemCache.entries.clear()
+
+    again = Tester.Tester()
+    again.ps.loadProblem(problemFile("7-ASV-x6.txt"), useCache=True)
+    calls = []
+    cached = ProblemCache.getDerived(again.ps, "obstacleSet " + repr(again.maxError), ObstacleSet.ObstacleSet,
+                                     lambda: calls.append(1))
+    assert not calls
+    assert (cached.bounds == built.bounds).all()
+    assert (cached.corners == built.corners).all() and cached.box == built.box
+    path = np.random.default_rng(0).uniform(0, 1, (500, 3, 2))
+    assert (cached.firstCollisions(path) == built.firstCollisions(path)).all()
+
+    cachedField = ProblemCache.getDerived(again.ps, "distanceField " + repr(again.maxError) + " 32",
+                                          DistanceField.DistanceField, lambda: calls.append(1))
+    assert not calls
+    points = path.reshape(-1, 2)
+    assert (cachedField.clearance(points) == field.clearance(points)).all()
+
+def testOutdatedEntriesAreRebuilt(cacheDir):
+    filename = problemFile("3ASV.txt")
+    for changes in ({"version": ProblemCache.VERSION - 1}, {"schema": "an older source"}):
+        loadCached(filename)
+        rewriteEntry(cacheDir, asvCount=99, **changes)
+        assert loadCached(filename).asvCount == 3
+
+    #The same entry, up to date, is trusted
+    loadCached(filename)
+    rewriteEntry(cacheDir, asvCount=99)
+    assert loadCached(filename).asvCount == 99
+
+def testPickledEntriesAreNotLoaded(cacheDir):
+    filename = problemFile("3ASV.txt")
+    loadCached(filename)
+    path = entryFile(cacheDir)
+    with np.load(path) as data:
+        arrays = dict((name, data[name]) for name in data.files)
+    arrays["obstacles"] = np.array([object()], dtype=object)
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+    ProblemCache.entries.clear()
+    assert ProblemCache.readEntry(ProblemCache.contentKey(open(filename, 'rb').read())) is None
+    assert loadCached(filename).asvCount == 3
+
+def testSharedDirectoryIsRefused(cacheDir, capsys):
+    filename = problemFile("3ASV.txt")
+    loadCached(filename)
+    assert stat.S_IMODE(os.stat(str(cacheDir)).st_mode) & 0o077 == 0
+
+    os.chmod(str(cacheDir), 0o777)
+    ProblemCache.entries.clear()
+    ps = loadCached(filename)
+    assert ProblemCache.readEntry(ps.cacheKey) is not None #Only the copy parsed just now, in memory
+    ProblemCache.entries.clear()
+    assert ProblemCache.readEntry(ps.cacheKey) is None
+    assert "writable by other users" in capsys.readouterr().err
+
+def testSchemaFollowsStoredSource():
+    assert ProblemCache.SCHEMA == ProblemCache.schemaHash()
+    assert "ObstacleSet" in ProblemCache.SCHEMA_MODULES
+
+def testKeyIsOfTheBytesParsed(cacheDir, tmp_path):
+    filename = str(tmp_path / "problem.txt")
+    shutil.copy(problemFile("3ASV.txt"), filename)
+    first = loadCached(filename)
+    shutil.copy(problemFile("7ASV.txt"), filename)
+    second = loadCached(filename)
+    assert first.cacheKey != second.cacheKey
+    assert second.asvCount == 7
+    with open(filename, 'rb') as f:
+        assert second.cacheKey == ProblemCache.contentKey(f.read())
+
+def testCacheIsOptIn(cacheDir):
+    assert Tester.main([problemFile("3ASV.txt")]) == 0
+    assert not os.path.exists(str(cacheDir))
+    assert Tester.main(["-c", problemFile("3ASV.txt")]) == 0
+    assert len(os.listdir(str(cacheDir))) == 1
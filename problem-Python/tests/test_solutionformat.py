@@ -0,0 +1,73 @@
+"""
+    Binary solution files: round trips, detecting bad files, and converting to and
+    from text.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import ProblemSpec
+import SolutionFormat
+from conftest import loadTester
+
+def longPath(tester, repeats=50):
+    """
+        @return the tester's direct path with every config repeated, as a PathArray
+    """
+    return(ProblemSpec.PathArray.fromArray(np.repeat(tester.ps.getPath().data, repeats, axis=0)))
+
+def testBinaryRoundTrip(tmp_path):
+    tester = loadTester("7ASV.txt")
+    path = longPath(tester)
+    binary = str(tmp_path / "path.bin")
+    SolutionFormat.writeBinary(binary, path, 12.5)
+    assert SolutionFormat.isBinary(binary)
+    assert SolutionFormat.readHeader(binary) == (len(path) - 1, 7, 12.5)
+
+    tester.ps.loadSolution(binary)
+    assert np.array_equal(tester.ps.getPath().data, path.data)
+    assert tester.ps.getSolutionCost() == 12.5
+
+    text = str(tmp_path / "path.txt")
+    again = str(tmp_path / "again.bin")
+    SolutionFormat.binaryToText(binary, text)
+    assert not SolutionFormat.isBinary(text)
+    SolutionFormat.textToBinary(text, again)
+    array, cost = SolutionFormat.readBinary(again)
+    assert cost == 12.5
+    assert np.allclose(array, path.data, atol=1e-9)
+
+def testConvertedTextMatchesSavedText(tmp_path):
+    tester = loadTester("7ASV.txt")
+    tester.ps.setPath(longPath(tester, 3))
+    saved = str(tmp_path / "saved.txt")
+    tester.ps.saveSolution(saved)
+    binary = str(tmp_path / "path.bin")
+    tester.ps.saveSolution(binary, binary=True)
+    converted = str(tmp_path / "converted.txt")
+    SolutionFormat.binaryToText(binary, converted)
+    with open(saved) as a, open(converted) as b:
+        assert a.read() == b.read()
+
+def testBinaryASVCountMismatch(tmp_path):
+    binary = str(tmp_path / "seven.bin")
+    seven = loadTester("7ASV.txt")
+    SolutionFormat.writeBinary(binary, seven.ps.getPath(), seven.ps.getSolutionCost())
+
+    three = loadTester("3ASV.txt")
+    with pytest.raises(IOError):
+        three.ps.loadSolution(binary)
+    with pytest.raises(IOError):
+        three.ps.iterSolution(binary, 16)
+    with pytest.raises(IOError):
+        SolutionFormat.readBinary(binary, 3)
+
+def testTruncatedBinary(tmp_path):
+    tester = loadTester("3ASV.txt")
+    binary = str(tmp_path / "short.bin")
+    SolutionFormat.writeBinary(binary, longPath(tester), 1.0)
+    with open(binary, 'r+b') as f:
+        f.truncate(SolutionFormat.HEADER.itemsize + 8)
+    with pytest.raises(IOError):
+        tester.ps.loadSolution(binary)
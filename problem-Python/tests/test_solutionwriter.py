@@ -0,0 +1,48 @@
+"""
+    Writing text solutions, plain and compressed, from paths, lists and streams of
+    chunks.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import ProblemSpec
+import SolutionWriter
+from conftest import loadTester
+
+def longPath(tester, repeats):
+    return(ProblemSpec.PathArray.fromArray(np.repeat(tester.ps.getPath().data, repeats, axis=0)))
+
+@pytest.mark.parametrize("name", ["path.txt", "path.txt.gz", "path.txt.xz"])
+@pytest.mark.parametrize("kind", ["PathArray", "list", "chunks"])
+def testWriteWithoutCost(tmp_path, name, kind):
+    tester = loadTester("7ASV.txt")
+    path = longPath(tester, 3)
+    configs = {"PathArray": path, "list": list(path), "chunks": [path[:4], path[4:]]}[kind]
+    filename = str(tmp_path / name)
+    steps, cost = SolutionWriter.writeSolution(filename, configs)
+    assert steps == len(path) - 1
+    assert cost == pytest.approx(path.totalCost())
+
+    tester.ps.loadSolution(filename)
+    assert len(tester.ps.getPath()) == len(path)
+    assert tester.ps.getSolutionCost() == pytest.approx(path.totalCost(), abs=1e-6)
+
+def testCompressedGeneratorNeedsHeader(tmp_path):
+    path = longPath(loadTester("3ASV.txt"), 2)
+    with pytest.raises(ValueError):
+        SolutionWriter.writeSolution(str(tmp_path / "path.txt.gz"), iter(path))
+    SolutionWriter.writeSolution(str(tmp_path / "path.txt.gz"), iter(path), cost=1.0, steps=len(path) - 1)
+
+def testSaveSolutionPrecision(tmp_path):
+    tester = loadTester("3ASV.txt")
+    filename = str(tmp_path / "path.txt")
+    tester.ps.saveSolution(filename)
+    with open(filename) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 3
+    assert all(len(v.split(".")[1]) == SolutionWriter.DEFAULT_PRECISION for v in lines[1].split())
+    tester.ps.saveSolution(filename, precision=3)
+    with open(filename) as f:
+        assert f.read().splitlines()[1].split()[0] == "%.3f" % tester.ps.getPath().data[0, 0, 0]
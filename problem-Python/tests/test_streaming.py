@@ -0,0 +1,49 @@
+"""
+    Streaming a solution file: the loaded solution is left alone, and closing the
+    stream early stops the parser thread.
+
+    @author Loreith
+"""
+
+import threading
+import numpy as np
+from conftest import loadTester
+
+def writeText(filename, data, cost):
+    """
+        Writes an (N, k, 2) array as a text solution file
+    """
+    with open(filename, 'w') as f:
+        f.write("%d %r\n" % (len(data) - 1, cost))
+        for row in data.reshape(len(data), -1):
+            f.write(" ".join(repr(float(v)) for v in row) + "\n")
+
+def testStreamLeavesSolutionAlone(tmp_path):
+    tester = loadTester("7ASV.txt")
+    data = np.repeat(tester.ps.getPath().data, 50, axis=0)
+    filename = str(tmp_path / "path.txt")
+    writeText(filename, data, 123.0)
+    cost = tester.ps.getSolutionCost()
+
+    with tester.ps.iterSolution(filename, 64) as stream:
+        chunks = list(stream)
+    assert (stream.length, stream.cost) == (len(data), 123.0)
+    assert np.array_equal(np.concatenate([chunk.data for chunk in chunks]), data)
+    assert tester.ps.getSolutionCost() == cost
+
+    #The direct path's one long step fails, and the cost, checked against the stream's header
+    assert tester.testSolutionStream(filename, False, chunkSize=64) == 2
+    assert tester.ps.getSolutionCost() == cost
+
+def testStreamStopsParserWhenClosedEarly(tmp_path):
+    tester = loadTester("7ASV.txt")
+    filename = str(tmp_path / "path.txt")
+    writeText(filename, np.repeat(tester.ps.getPath().data, 200, axis=0), 1.0)
+    before = threading.active_count()
+
+    stream = tester.ps.iterSolution(filename, 8)
+    chunks = tester.streamChunks(stream)
+    next(chunks)
+    chunks.close()
+    assert threading.active_count() == before
+    assert stream.inputFile is None
@@ -0,0 +1,81 @@
+"""
+    Swept collisions against the collision test and fine sampling of the motion,
+    and the narrow phase's ambiguous pieces.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import SweptCollision
+import Tester
+import line2D
+from conftest import problemFile
+
+RECT = np.array([[0.5, 0.5, 0.6, 0.6]])
+
+def sweptPath(seed, steps=500):
+    """
+        @return a small random 3-ASV shape jumping about the workspace, so some of its
+            configs and motions hit the obstacles and some don't
+    """
+    rng = np.random.default_rng(seed)
+    shape = rng.uniform(0, 0.03, (1, 3, 2))
+    return(shape + rng.uniform(0, 0.97, (steps + 1, 1, 2)))
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def testSweepAgreesWithCollisions(seed):
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile("7ASV.txt"))
+    bounds = tester.getObstacleSet().bounds
+    path = sweptPath(seed)
+    swept = tester.sweptCollisionMask(path)
+
+    #A config that fails the collision test fails the sweep on either side of it
+    colliding = np.flatnonzero(tester.firstCollisions(path) >= 0)
+    assert swept[colliding[colliding < len(swept)]].all()
+    assert swept[colliding[colliding > 0] - 1].all()
+
+    #Sampling the motion finely finds nothing the sweep misses
+    sampled = np.zeros(len(path) - 1, dtype=bool)
+    for t in np.linspace(0, 1, 101):
+        sampled |= line2D.firstCollisions((1 - t) * path[:-1] + t * path[1:], bounds) >= 0
+    assert not (sampled & ~swept).any()
+
+    #Every step at once, in blocks, as one step at a time
+    SweptCollision.NARROW_PHASE_SIZE, size = 7, SweptCollision.NARROW_PHASE_SIZE
+    try:
+        blocked = SweptCollision.collidingStepMask(path, bounds, tester.maxError)
+    finally:
+        SweptCollision.NARROW_PHASE_SIZE = size
+    assert (blocked == swept).all()
+    assert swept.tolist() == [SweptCollision.stepCollides(path[i], path[i + 1], bounds, tester.maxError)
+                              for i in range(len(path) - 1)]
+
+def testSweepTouchingCollides():
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problemFile("7ASV.txt"))
+    xMin, yMin, xMax, yMax = tester.getObstacleSet().bounds[0]
+    #A boom sliding along the top edge, as the collision test sees it: touching
+    cfg0 = np.array([[xMin - 0.05, yMax], [xMin, yMax]])
+    cfg1 = cfg0 + (0.01, 0.0)
+    assert line2D.segmentIntersectsRect(*cfg0.ravel(), xMin, yMin, xMax, yMax)
+    assert SweptCollision.stepCollides(cfg0, cfg1, np.array([[xMin, yMin, xMax, yMax]]), tester.maxError)
+    #An obstacle shrunk to nothing never collides
+    assert not SweptCollision.stepCollides(cfg0, cfg1, np.array([[xMin, yMax, xMin, yMax]]), tester.maxError)
+
+def testSweepThroughAnObstacle():
+    #Neither boom meets the obstacle; the motion in between crosses it
+    cfg0 = np.array([[0.55, 0.3], [0.55, 0.4]])
+    assert SweptCollision.stepCollides(cfg0, cfg0 + (0, 0.4), RECT, 1e-4)
+
+def testAmbiguousPiecesCollide():
+    #A diagonal boom passing below the corner: its sweep's box overlaps the obstacle, the sweep doesn't
+    cfg0 = np.array([[0.3, 0.45], [0.45, 0.3]])
+    cfg1 = cfg0 + (0.1, 0.1)
+    corners = SweptCollision.sweepCorners(np.stack((cfg0, cfg1)), np.array([0]), np.array([0]))
+    owners = np.zeros(1, dtype=np.intp)
+    assert not SweptCollision.sweepsCollide(corners, RECT, owners, 1, 1e-4)[0]
+    #Not halved at all, or at a coarse resolution, it can't be called clear
+    assert SweptCollision.sweepsCollide(corners, RECT, owners, 1, 1e-4, maxDepth=0)[0]
+    assert SweptCollision.sweepsCollide(corners, RECT, owners, 1, 0.5)[0]
@@ -0,0 +1,51 @@
+"""
+    The Tester's own checks behave as in the java tester it was ported from.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import ASVconfig
+import Tester
+from conftest import problemFile, loadTester
+
+def testGrowIsByDeltaOnEachSide():
+    tester = Tester.Tester()
+    assert tester.grow((0.2, 0.3, 0.1, 0.1), 0.01) == pytest.approx((0.19, 0.29, 0.12, 0.12))
+    assert tester.lenientBounds == pytest.approx((-tester.maxError, -tester.maxError,
+                                                  1 + 2 * tester.maxError, 1 + 2 * tester.maxError))
+
+def testFitsBoundsNeedsEveryASV():
+    tester = Tester.Tester()
+    inside = ASVconfig.ASVConfig([(0.1, 0.1), (0.15, 0.1), (0.15, 0.15)])
+    assert tester.fitsBounds(inside)
+    for outside in ([(0.1, 0.1), (0.15, 0.1), (1.05, 0.15)], [(-0.01, 0.1), (0.05, 0.1), (0.05, 0.15)]):
+        cfg = ASVconfig.ASVConfig(outside)
+        assert not tester.fitsBounds(cfg)
+        assert not tester.fitsBoundsMask(cfg.coords[np.newaxis])[0]
+
+def testAddToAllReturnsTheSums():
+    tester = Tester.Tester()
+    badList = [0, 3, 7]
+    assert tester.addToAll(badList, 2) == [2, 5, 9]
+    assert badList == [0, 3, 7]
+
+def testHeaderCountsSteps(tmp_path):
+    tester = loadTester("3ASV.txt")
+    initial, goal = tester.ps.getInitialState(), tester.ps.getGoalState()
+    filename = str(tmp_path / "solution.txt")
+    with open(filename, 'w') as f:
+        f.write("1 %r\n%s\n%s\n" % (initial.totalDistance(goal), initial, goal))
+    tester.ps.loadSolution(filename)
+    assert len(tester.ps.getPath()) == 2
+    assert tester.runTest("cost", 1, False)
+
+@pytest.mark.parametrize("name", ["3ASV.txt", "7ASV.txt"])
+def testEveryTestRuns(name, capsys):
+    #The direct path is one long step, through the obstacles in 7ASV
+    tester = loadTester(name)
+    verdicts = dict((test, tester.runTest(test, i, True)) for i, test in enumerate(Tester.Tester.SOLUTION_TESTS + Tester.Tester.STATE_TESTS))
+    assert verdicts["initial"] and verdicts["goal"] and verdicts["booms"] and verdicts["bounds"]
+    assert not verdicts["steps"]
+    assert "Starting line for each invalid step:\n[2]" in capsys.readouterr().out
@@ -0,0 +1,54 @@
+"""
+    Synthetic workloads pass when valid, and fail the tests they are broken for
+    on exactly the configs broken.
+
+    @author Loreith
+"""
+
+import numpy as np
+import pytest
+import FusedValidator
+import Tester
+import Workloads
+
+FAILURES = 10
+
+def failingTests(directory, name, invalid=(), obstacles=100, binary=False):
+    """
+        @return {test name: number of configs or steps failing it} for a new workload
+    """
+    problem, solution = Workloads.writeWorkload(str(directory), name, steps=2000, obstacles=obstacles,
+                                                binary=binary, invalid=invalid, failures=FAILURES)
+    tester = Tester.Tester()
+    tester.ps.loadProblem(problem)
+    tester.ps.loadSolution(solution)
+    validator = FusedValidator.FusedValidator(tester)
+    validator.validate(tester.ps.getPath())
+    return(dict((test["name"], test.get("failing", 1)) for test in validator.summary()["tests"]
+                if not test["passed"]))
+
+@pytest.mark.parametrize("binary", [False, True])
+def testValidWorkloadPasses(tmp_path, binary):
+    assert failingTests(tmp_path, "valid", binary=binary) == {}
+
+@pytest.mark.parametrize("test", Workloads.INVALID_TESTS)
+def testBrokenConfigsFailTheirTest(tmp_path, test):
+    failing = failingTests(tmp_path, test, [test])
+    assert test in failing
+    if test == "steps":
+        #Both steps to and from each moved config
+        assert failing[test] == 2 * FAILURES
+    elif test != "cost":
+        assert failing[test] == FAILURES
+
+@pytest.mark.parametrize("obstacles", [1, 20, 1000])
+def testEveryCorruptionCollides(tmp_path, obstacles):
+    assert failingTests(tmp_path, "collide", ["collisions"], obstacles)["collisions"] == FAILURES
+
+def testCollisionNeedsAnObstacleThatSurvivesShrinking():
+    cfg = Workloads.regularConfig(4, (0.5, 0.5))
+    tiny = np.array([[0.2, 0.2, 1e-6, 1e-6]])
+    with pytest.raises(ValueError):
+        Workloads.placeAcross(cfg, tiny, 0)
+    Workloads.placeAcross(cfg, np.vstack((tiny, [[0.3, 0.3, 0.01, 0.01]])), 0)
+    assert np.allclose((cfg[0] + cfg[1]) / 2, (0.305, 0.305))